@@ -1,10 +1,38 @@
 
 from domain.interfaces.auth import AuthInterface
+from typing import Optional
 import os
 
 JWT_SECRET = os.getenv('JWT_SECRET')
 
+# หมุน key ได้โดยไม่ทำให้ token เก่าใช้ไม่ได้ทันที:
+#   JWT_KEYS="2025-01:secret-a,2025-06:secret-b"  JWT_ACTIVE_KID="2025-06"
+# token ใหม่เซ็นด้วย key ที่ active ส่วน token เก่ายัง verify ได้ตราบที่ kid ยังอยู่ใน JWT_KEYS
+DEFAULT_KID = "default"
+
+def _load_keys() -> dict:
+    keys = {}
+    for item in os.getenv('JWT_KEYS', '').split(','):
+        if ':' in item:
+            kid, secret = item.split(':', 1)
+            keys[kid.strip()] = secret.strip()
+
+    if JWT_SECRET and DEFAULT_KID not in keys:
+        keys[DEFAULT_KID] = JWT_SECRET
+    return keys
+
+JWT_KEYS = _load_keys()
+JWT_ACTIVE_KID = os.getenv('JWT_ACTIVE_KID', DEFAULT_KID)
+
 class AuthAdapter(AuthInterface):
     @classmethod
     def get_jwt_secret(cls) -> str:
-        return JWT_SECRET
+        return JWT_KEYS.get(JWT_ACTIVE_KID, JWT_SECRET)
+
+    @classmethod
+    def get_signing_key(cls) -> tuple:
+        return JWT_ACTIVE_KID, cls.get_jwt_secret()
+
+    @classmethod
+    def get_verification_key(cls, kid: str) -> Optional[str]:
+        return JWT_KEYS.get(kid)
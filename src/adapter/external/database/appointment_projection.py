@@ -0,0 +1,80 @@
+from sqlalchemy import text
+
+# สร้างแถวของ store_appointments ใหม่จากตารางหลัก สำหรับ booking ที่เข้าเงื่อนไข {booking_filter}
+# เรียกใน transaction เดียวกับการเขียน (ก่อน commit) read model จึงไม่ค้างครึ่งๆ กลางๆ
+# booking_filter ต้องเป็น predicate ต่อท้าย "booking_id" เช่น "= ANY(:booking_ids)"
+# และต้องไม่อ้าง store_appointments เอง (แถวจะถูกลบก่อน INSERT)
+_DELETE_SQL = "DELETE FROM store_appointments WHERE booking_id {booking_filter}"
+
+# services = ทุก service ของ booking (รวมของร้านอื่น) shape เดียวกับ booking_services เดิม
+# แถวของแต่ละร้านมี services ชุดเดียวกัน
+_INSERT_SQL = """
+    WITH booking_services_json AS (
+        SELECT
+            bs.booking_id,
+            jsonb_agg(
+                jsonb_build_object(
+                    'id', s.id,
+                    'title', s.title,
+                    'duration_minutes', s.duration_minutes,
+                    'prices', s.prices,
+                    'description', s.description,
+                    'store_id', s.store_id,
+                    'store_name', st.store_name
+                )
+                ORDER BY s.id
+            ) AS services
+        FROM bookings_services bs
+        JOIN services s ON s.id = bs.service_id
+        JOIN stores st ON st.id = s.store_id
+        WHERE bs.booking_id {booking_filter}
+        GROUP BY bs.booking_id
+    )
+    INSERT INTO store_appointments (
+        store_id, booking_id, booking_time, status, note, created_at,
+        user_id, user_name, tel, store_name, services
+    )
+    SELECT DISTINCT ON (s.store_id, b.id)
+        s.store_id, b.id, b.booking_time, b.status, b.note, b.created_at,
+        b.user_id, u.user_name, u.tel, st.store_name, j.services
+    FROM bookings b
+    JOIN bookings_services bs ON bs.booking_id = b.id
+    JOIN services s ON s.id = bs.service_id
+    JOIN stores st ON st.id = s.store_id
+    JOIN booking_services_json j ON j.booking_id = b.id
+    LEFT JOIN users u ON u.id = b.user_id
+    WHERE b.id {booking_filter}
+"""
+
+async def refresh_appointments(db, booking_filter: str, params: dict):
+    # db เป็นได้ทั้ง AsyncSession และ AsyncConnection
+    await db.execute(text(_DELETE_SQL.format(booking_filter=booking_filter)), params)
+    await db.execute(text(_INSERT_SQL.format(booking_filter=booking_filter)), params)
+
+async def refresh_appointments_of_bookings(db, booking_ids: list):
+    await refresh_appointments(db, "= ANY(:booking_ids)", {"booking_ids": list(booking_ids)})
+
+async def refresh_appointments_of_service(db, service_id: str):
+    await refresh_appointments(
+        db,
+        "IN (SELECT booking_id FROM bookings_services WHERE service_id = :service_id)",
+        {"service_id": service_id}
+    )
+
+async def refresh_appointments_of_services(db, service_ids: list):
+    await refresh_appointments(
+        db,
+        "IN (SELECT booking_id FROM bookings_services WHERE service_id = ANY(:service_ids))",
+        {"service_ids": list(service_ids)}
+    )
+
+async def refresh_appointments_of_store(db, store_id: str):
+    await refresh_appointments(
+        db,
+        "IN ("
+        " SELECT bs.booking_id FROM bookings_services bs"
+        " JOIN services s ON s.id = bs.service_id"
+        " WHERE s.store_id = :store_id"
+        ")",
+        {"store_id": store_id}
+    )
@@ -0,0 +1,145 @@
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from contextlib import asynccontextmanager
+
+import asyncpg
+
+from adapter.external.database.postgres import engine as default_engine
+from adapter.external.metrics import instrument_repository
+from adapter.external.database.appointment_projection import refresh_appointments
+from adapter.external.database.store_stats import invalidate_store_stats
+from domain.interfaces.database import BulkImportRepositoryInterface
+
+
+@instrument_repository
+class BulkImportRepositoryAdapter(BulkImportRepositoryInterface):
+    # COPY ลง temp staging table ผ่าน asyncpg ตรงๆ แล้วตรวจ/merge ด้วย SQL ชุดเดียว
+    # ทุกอย่างอยู่ใน transaction เดียว staging table หายเองตอน commit
+    def __init__(self, engine: AsyncEngine = default_engine):
+        self.engine = engine
+
+    async def import_users(self, batches) -> dict:
+        async with self._transaction() as conn:
+            await conn.execute(text(
+                "CREATE TEMP TABLE import_users ("
+                " row_no integer, id text, user_name text, tel text"
+                ") ON COMMIT DROP"
+            ))
+
+            copy_conn = await self._driver_connection(conn)
+            async for batch in batches:
+                await copy_conn.copy_records_to_table(
+                    "import_users",
+                    records=batch,
+                    columns=["row_no", "id", "user_name", "tel"]
+                )
+
+            errors = await conn.execute(text("""
+                SELECT row_no, 'user_id already exists' AS error
+                FROM import_users s
+                WHERE EXISTS (SELECT 1 FROM users u WHERE u.id = s.id)
+                UNION ALL
+                SELECT row_no, 'duplicate user_id in file' AS error
+                FROM (
+                    SELECT row_no, row_number() OVER (PARTITION BY id ORDER BY row_no) AS n
+                    FROM import_users
+                ) d
+                WHERE d.n > 1
+            """))
+            errors = [{"row": row_no, "error": error} for row_no, error in errors.all()]
+
+            result = await conn.execute(text("""
+                INSERT INTO users (id, user_name, tel)
+                SELECT DISTINCT ON (id) id, user_name, tel
+                FROM import_users
+                ORDER BY id, row_no
+                ON CONFLICT (id) DO NOTHING
+            """))
+
+            return {"imported": result.rowcount, "errors": errors}
+
+    async def import_bookings(self, store_id: str, batches) -> dict:
+        async with self._transaction() as conn:
+            await conn.execute(text(
+                "CREATE TEMP TABLE import_bookings ("
+                " row_no integer, id text, user_id text, booking_time timestamp,"
+                " status text, note text, service_ids text[]"
+                ") ON COMMIT DROP"
+            ))
+
+            copy_conn = await self._driver_connection(conn)
+            async for batch in batches:
+                await copy_conn.copy_records_to_table(
+                    "import_bookings",
+                    records=batch,
+                    columns=["row_no", "id", "user_id", "booking_time", "status", "note", "service_ids"]
+                )
+
+            # ตรวจแบบ set-based ทีเดียวทั้งไฟล์ แทนการ SELECT ทีละแถว
+            errors = await conn.execute(text("""
+                SELECT row_no, 'user_id does not exist' AS error
+                FROM import_bookings s
+                WHERE NOT EXISTS (SELECT 1 FROM users u WHERE u.id = s.user_id)
+                UNION ALL
+                SELECT row_no, 'booking_id already exists' AS error
+                FROM import_bookings s
+                WHERE EXISTS (SELECT 1 FROM bookings b WHERE b.id = s.id)
+                UNION ALL
+                SELECT row_no, 'duplicate booking_id in file' AS error
+                FROM (
+                    SELECT row_no, row_number() OVER (PARTITION BY id ORDER BY row_no) AS n
+                    FROM import_bookings
+                ) d
+                WHERE d.n > 1
+                UNION ALL
+                SELECT row_no, 'service_id does not belong to this store' AS error
+                FROM import_bookings s
+                WHERE EXISTS (
+                    SELECT 1 FROM unnest(s.service_ids) AS sid
+                    WHERE NOT EXISTS (
+                        SELECT 1 FROM services sv WHERE sv.id = sid AND sv.store_id = :store_id
+                    )
+                )
+            """), {"store_id": store_id})
+            errors = [{"row": row_no, "error": error} for row_no, error in errors.all()]
+
+            if errors:
+                await conn.execute(
+                    text("DELETE FROM import_bookings WHERE row_no = ANY(:row_nos)"),
+                    {"row_nos": list({error["row"] for error in errors})}
+                )
+
+            result = await conn.execute(text("""
+                INSERT INTO bookings (id, booking_time, status, created_at, note, user_id)
+                SELECT id, booking_time, status, now(), note, user_id
+                FROM import_bookings
+            """))
+
+            await conn.execute(text("""
+                INSERT INTO bookings_services (booking_id, service_id)
+                SELECT DISTINCT s.id, sid
+                FROM import_bookings s, unnest(s.service_ids) AS sid
+            """))
+
+            await refresh_appointments(conn, "IN (SELECT id FROM import_bookings)", {})
+
+        # booking ใหม่ของร้านนี้ (commit แล้ว) ล้าง stats ที่ cache ไว้
+        if result.rowcount:
+            invalidate_store_stats([store_id])
+        return {"imported": result.rowcount, "errors": errors}
+
+    @asynccontextmanager
+    async def _transaction(self):
+        # ค่าที่ Postgres รับไม่ได้ (COPY ผ่าน asyncpg ตรงๆ หรือ merge ผ่าน SQLAlchemy) = ไฟล์ผิด ไม่ใช่ 500
+        # ทั้ง transaction rollback ไม่มีแถวไหนถูก import
+        try:
+            async with self.engine.begin() as conn:
+                yield conn
+        except (asyncpg.DataError, exc.DataError) as e:
+            raise ValueError(f"Import file contains a value the database cannot store: {getattr(e, 'orig', e)}")
+
+    @staticmethod
+    async def _driver_connection(conn):
+        # connection ของ asyncpg ตัวเดียวกับที่ SQLAlchemy เปิด transaction ไว้
+        raw_connection = await conn.get_raw_connection()
+        return raw_connection.driver_connection
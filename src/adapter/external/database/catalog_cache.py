@@ -0,0 +1,24 @@
+from utils.async_cache import AsyncTTLCache
+import os
+
+CATALOG_CACHE_SIZE = int(os.getenv('CATALOG_CACHE_SIZE', '2048'))
+CATALOG_CACHE_TTL_SECONDS = float(os.getenv('CATALOG_CACHE_TTL_SECONDS', '30'))
+CATALOG_CACHE_STALE_SECONDS = float(os.getenv('CATALOG_CACHE_STALE_SECONDS', '300'))
+
+# cache ของ stores/services ที่อ่านบ่อยแต่แทบไม่เปลี่ยน (ต่อ worker)
+# เขียนผ่าน repository ใน worker นี้จะ invalidate ทันที
+# ส่วนที่เขียนจาก worker อื่นจะเห็นภายใน CATALOG_CACHE_TTL_SECONDS
+catalog_cache = AsyncTTLCache(
+    maxsize=CATALOG_CACHE_SIZE,
+    ttl=CATALOG_CACHE_TTL_SECONDS,
+    stale_ttl=CATALOG_CACHE_STALE_SECONDS
+)
+
+def stores_key() -> tuple:
+    return ("stores",)
+
+def services_of_store_key(store_id: str) -> tuple:
+    return ("services", store_id)
+
+def service_key(service_id: str) -> tuple:
+    return ("service", service_id)
@@ -0,0 +1,240 @@
+from sqlalchemy import and_, delete, func, or_, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from datetime import timedelta
+from time import monotonic
+import asyncio
+import hashlib
+import logging
+import os
+
+import orjson
+
+from adapter.external.database.postgres import AsyncSessionLocal
+from adapter.external.metrics import instrument_repository
+from domain.interfaces.database import IdempotencyKeyRepositoryInterface
+from domain.model_entities.database import IdempotencyKey
+from utils.lru import LRUCache
+
+IDEMPOTENCY_KEY_TTL_HOURS = float(os.getenv('IDEMPOTENCY_KEY_TTL_HOURS', '24'))
+# แถวที่ยังไม่มี response เกินเวลานี้ = worker ที่ทำอยู่ตายไปแล้ว ให้ request ถัดไปทำแทนได้
+IDEMPOTENCY_LEASE_SECONDS = float(os.getenv('IDEMPOTENCY_LEASE_SECONDS', '60'))
+# worker อื่นกำลังทำ key เดียวกันอยู่: poll ตารางรอได้นานสุดเท่านี้ แล้วตอบ 409
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv('IDEMPOTENCY_WAIT_SECONDS', '30'))
+IDEMPOTENCY_POLL_INTERVAL = float(os.getenv('IDEMPOTENCY_POLL_INTERVAL', '0.2'))
+IDEMPOTENCY_CACHE_SIZE = int(os.getenv('IDEMPOTENCY_CACHE_SIZE', '10000'))
+# ลบแถวที่หมดอายุทุกๆ กี่ request ที่ได้ทำจริง (ครั้งละไม่เกิน IDEMPOTENCY_PURGE_BATCH_SIZE แถว)
+IDEMPOTENCY_PURGE_EVERY = 1000
+IDEMPOTENCY_PURGE_BATCH_SIZE = 1000
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
+
+logger = logging.getLogger(__name__)
+
+
+class IdempotencyKeyConflict(Exception):
+    def __init__(self, message: str, status_code: int):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def request_fingerprint(payload) -> str:
+    # body เดียวกันแต่ลำดับ key ต่างกันได้ค่าเดียวกัน
+    return hashlib.sha256(orjson.dumps(payload, default=str, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+
+def _not_expired():
+    return IdempotencyKey.created_at >= func.now() - timedelta(hours=IDEMPOTENCY_KEY_TTL_HOURS)
+
+
+@instrument_repository
+class IdempotencyKeyRepositoryAdapter(IdempotencyKeyRepositoryInterface):
+    # ใช้ session ของตัวเอง claim ต้อง commit ทันทีให้ worker อื่นเห็นก่อนเริ่มทำ request
+    def __init__(self, session_factory=AsyncSessionLocal):
+        self.session_factory = session_factory
+
+    async def claim(self, scope: str, idempotency_key: str, request_hash: str) -> bool:
+        # ได้สิทธิ์ทำ request นี้ถ้า: ยังไม่มีแถว / แถวหมดอายุ / แถวค้างไม่มี response เกิน lease
+        stmt = insert(IdempotencyKey).values(
+            scope=scope,
+            idempotency_key=idempotency_key,
+            request_hash=request_hash,
+            created_at=func.now()
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[IdempotencyKey.scope, IdempotencyKey.idempotency_key],
+            set_={"request_hash": stmt.excluded.request_hash, "response": None, "created_at": func.now()},
+            where=or_(
+                ~_not_expired(),
+                and_(
+                    IdempotencyKey.response.is_(None),
+                    IdempotencyKey.created_at < func.now() - timedelta(seconds=IDEMPOTENCY_LEASE_SECONDS)
+                )
+            )
+        ).returning(IdempotencyKey.scope)
+
+        async with self.session_factory() as db:
+            claimed = (await db.execute(stmt)).first() is not None
+            await db.commit()
+        return claimed
+
+    async def find(self, scope: str, idempotency_key: str):
+        # (request_hash, response) response = None คือยังทำไม่เสร็จ
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(IdempotencyKey.request_hash, IdempotencyKey.response)
+                .where(
+                    IdempotencyKey.scope == scope,
+                    IdempotencyKey.idempotency_key == idempotency_key,
+                    _not_expired()
+                )
+            )
+            return result.first()
+
+    async def complete(self, scope: str, idempotency_key: str, response: dict):
+        async with self.session_factory() as db:
+            await db.execute(
+                update(IdempotencyKey)
+                .where(IdempotencyKey.scope == scope, IdempotencyKey.idempotency_key == idempotency_key)
+                .values(response=response)
+            )
+            await db.commit()
+
+    async def release(self, scope: str, idempotency_key: str):
+        # request ล้มเหลว: คืน key ให้ลองใหม่ได้ทันที (ไม่เก็บ response ที่เป็น error)
+        async with self.session_factory() as db:
+            await db.execute(
+                delete(IdempotencyKey)
+                .where(
+                    IdempotencyKey.scope == scope,
+                    IdempotencyKey.idempotency_key == idempotency_key,
+                    IdempotencyKey.response.is_(None)
+                )
+            )
+            await db.commit()
+
+    async def purge_expired(self, limit: int) -> int:
+        expired = (
+            select(IdempotencyKey.scope, IdempotencyKey.idempotency_key)
+            .where(~_not_expired())
+            .limit(limit)
+        )
+        async with self.session_factory() as db:
+            result = await db.execute(
+                delete(IdempotencyKey)
+                .where(tuple_(IdempotencyKey.scope, IdempotencyKey.idempotency_key).in_(expired))
+            )
+            await db.commit()
+            return result.rowcount
+
+
+class IdempotencyStore:
+    # Idempotency-Key ของ endpoint ที่สร้างข้อมูล
+    # - key ที่ทำเสร็จแล้ว: ตอบ response เดิมจาก LRU หรือตาราง idempotency_keys ไม่เรียก create ซ้ำ
+    # - key เดียวกันเข้ามาพร้อมกันใน process เดียว: รอผลของตัวแรก (single-flight)
+    # - worker อื่นกำลังทำ key นี้อยู่: poll ตารางจนเสร็จ
+    # create กับการบันทึก response ไม่ได้อยู่ใน transaction เดียวกัน
+    # ถ้า process ตายระหว่างนั้น หลัง lease หมด request ที่ส่งซ้ำจะทำใหม่
+    def __init__(
+            self,
+            repo: IdempotencyKeyRepositoryInterface = None,
+            maxsize: int = IDEMPOTENCY_CACHE_SIZE,
+            wait_seconds: float = IDEMPOTENCY_WAIT_SECONDS,
+            poll_interval: float = IDEMPOTENCY_POLL_INTERVAL
+        ):
+        self.repo = repo or IdempotencyKeyRepositoryAdapter()
+        self.wait_seconds = wait_seconds
+        self.poll_interval = poll_interval
+        self._responses = LRUCache(maxsize) # (scope, key) -> (request_hash, response, stored_at)
+        self._inflight = {} # (scope, key) -> (request_hash, asyncio.Future)
+        self._claims = 0
+
+        self.replays = 0
+
+    async def run(self, scope: str, idempotency_key: str, request_hash: str, create) -> tuple:
+        # create: coroutine function คืน dict ที่ serialize เป็น JSON ได้
+        # คืน (response, replayed)
+        cache_key = (scope, idempotency_key)
+
+        cached = self._responses.get(cache_key)
+        if cached is not None and monotonic() - cached[2] < IDEMPOTENCY_KEY_TTL_HOURS * 3600:
+            return self._replay(cached[0], request_hash, cached[1]), True
+
+        inflight = self._inflight.get(cache_key)
+        if inflight is not None:
+            self._check_hash(inflight[0], request_hash)
+            try:
+                response = await asyncio.shield(inflight[1])
+            except asyncio.CancelledError:
+                # request แรกถูกยกเลิก (client ตัดสาย) key ถูกคืนแล้ว ทำเองแทน
+                # ตัวที่รออยู่ตัวแรกจะเป็นเจ้าของรอบใหม่ ที่เหลือรอตัวนั้นต่อ
+                if not inflight[1].cancelled():
+                    raise
+                return await self.run(scope, idempotency_key, request_hash, create)
+            self.replays += 1
+            return response, True
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[cache_key] = (request_hash, future)
+        try:
+            response, replayed = await self._run_once(scope, idempotency_key, request_hash, create)
+            future.set_result(response)
+            return response, replayed
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception() # ไม่มีใครรออยู่ก็ไม่ต้องเตือน "exception was never retrieved"
+            raise
+        finally:
+            del self._inflight[cache_key]
+
+    async def _run_once(self, scope: str, idempotency_key: str, request_hash: str, create) -> tuple:
+        deadline = monotonic() + self.wait_seconds
+        while not await self.repo.claim(scope, idempotency_key, request_hash):
+            found = await self.repo.find(scope, idempotency_key)
+            if found is not None:
+                stored_hash, response = found
+                self._check_hash(stored_hash, request_hash)
+                if response is not None:
+                    self._responses.put((scope, idempotency_key), (stored_hash, response, monotonic()))
+                    self.replays += 1
+                    return response, True
+
+            if monotonic() >= deadline:
+                raise IdempotencyKeyConflict("A request with this Idempotency-Key is still in progress", 409)
+            # found = None: ตัวที่ทำอยู่ล้มเหลวแล้วคืน key รอบหน้า claim ได้เลยไม่ต้องรอ
+            if found is not None:
+                await asyncio.sleep(self.poll_interval)
+
+        try:
+            response = await create()
+        except BaseException:
+            await self.repo.release(scope, idempotency_key)
+            raise
+
+        await self.repo.complete(scope, idempotency_key, response)
+        self._responses.put((scope, idempotency_key), (request_hash, response, monotonic()))
+        await self._maybe_purge()
+        return response, False
+
+    def _replay(self, stored_hash: str, request_hash: str, response: dict) -> dict:
+        self._check_hash(stored_hash, request_hash)
+        self.replays += 1
+        return response
+
+    @staticmethod
+    def _check_hash(stored_hash: str, request_hash: str):
+        if stored_hash != request_hash:
+            raise IdempotencyKeyConflict("Idempotency-Key was already used with a different request", 422)
+
+    async def _maybe_purge(self):
+        self._claims += 1
+        if self._claims % IDEMPOTENCY_PURGE_EVERY:
+            return
+        try:
+            await self.repo.purge_expired(IDEMPOTENCY_PURGE_BATCH_SIZE)
+        except Exception:
+            logger.exception("Idempotency key purge failed")
+
+
+idempotency_store = IdempotencyStore()
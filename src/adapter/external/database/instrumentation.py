@@ -0,0 +1,69 @@
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from time import perf_counter
+
+from adapter.external.metrics import (
+    current_repository_method,
+    db_pool_checkout_wait,
+    db_statement_duration,
+    db_statement_errors,
+    route_label
+)
+from adapter.external.database.query_budget import record_statement
+
+
+class TimedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    # pool ปกติของ asyncpg แต่จับเวลารอ connection ตอน checkout
+    metrics_name = "primary"
+
+    def _do_get(self):
+        started = perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_pool_checkout_wait.observe(perf_counter() - started, pool=self.metrics_name)
+
+
+def timed_pool_class(name: str):
+    # ตั้งชื่อผ่าน subclass เพราะ engine.dispose() สร้าง pool ใหม่จาก class เดิม
+    return type(f"TimedPool_{name}", (TimedAsyncAdaptedQueuePool,), {"metrics_name": name})
+
+
+def _operation(statement: str) -> str:
+    words = statement.lstrip().split(None, 1)
+    return words[0].upper() if words else "-"
+
+
+def _labels(statement: str) -> dict:
+    return {
+        "route": route_label(),
+        "repository_method": current_repository_method.get(),
+        "operation": _operation(statement)
+    }
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = perf_counter() - conn.info["query_started"].pop()
+    labels = _labels(statement)
+    db_statement_duration.observe(duration, **labels)
+    record_statement(statement, parameters, executemany, duration, labels)
+
+
+def _handle_error(exception_context):
+    # error ระหว่าง execute ไม่มี after_cursor_execute ต้อง pop เวลาที่ค้างไว้เอง
+    connection = exception_context.connection
+    if exception_context.cursor is not None and connection is not None and connection.info.get("query_started"):
+        connection.info["query_started"].pop()
+    db_statement_errors.inc(**_labels(exception_context.statement or ""))
+
+
+def instrument_engine(engine: AsyncEngine):
+    sync_engine = engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
@@ -0,0 +1,98 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+import logging
+
+from adapter.external.database.migrations import (
+    v0001_baseline,
+    v0002_store_business_hours,
+    v0003_payment_expiry,
+    v0004_secondary_indexes,
+    v0005_store_appointments,
+    v0006_cascade_deletes,
+    v0007_idempotency_keys,
+    v0008_revoked_tokens,
+    v0009_appointment_all_services
+)
+
+# เพิ่ม revision ใหม่ต่อท้ายเสมอ ห้ามแก้ revision ที่ deploy ไปแล้ว
+REVISIONS = [
+    v0001_baseline,
+    v0002_store_business_hours,
+    v0003_payment_expiry,
+    v0004_secondary_indexes,
+    v0005_store_appointments,
+    v0006_cascade_deletes,
+    v0007_idempotency_keys,
+    v0008_revoked_tokens,
+    v0009_appointment_all_services
+]
+HEAD_VERSION = REVISIONS[-1].revision
+
+# key ของ pg_advisory_lock ให้ migrate ได้ทีละ process
+MIGRATION_LOCK_KEY = 7_303_001
+
+MIGRATE_COMMAND = "python -m adapter.presentation.migrate_cli upgrade"
+
+logger = logging.getLogger(__name__)
+
+async def current_version(conn: AsyncConnection) -> int:
+    if await conn.scalar(text("SELECT to_regclass('schema_version')")) is None:
+        return 0
+    return await conn.scalar(text("SELECT COALESCE(MAX(version), 0) FROM schema_version"))
+
+async def upgrade(engine: AsyncEngine, target: int = HEAD_VERSION) -> list:
+    applied = []
+    async with engine.connect() as conn:
+        # session-level lock ถือไว้ทั้งรอบ ตัวอื่นที่สั่ง upgrade พร้อมกันจะรอตรงนี้
+        # พอได้ lock แล้วค่อยอ่าน version ใหม่ เลยไม่ apply ซ้ำ
+        await conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        await conn.commit()
+        try:
+            await conn.execute(text(
+                "CREATE TABLE IF NOT EXISTS schema_version ("
+                " version INTEGER PRIMARY KEY,"
+                " description VARCHAR,"
+                " applied_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now()"
+                ")"
+            ))
+            await conn.commit()
+
+            version = await current_version(conn)
+            for revision in REVISIONS:
+                if revision.revision <= version or revision.revision > target:
+                    continue
+
+                # DDL ของ Postgres อยู่ใน transaction ได้ revision หนึ่ง apply ครบหรือไม่ apply เลย
+                try:
+                    for statement in revision.statements:
+                        await conn.execute(text(statement))
+                    await conn.execute(
+                        text("INSERT INTO schema_version (version, description) VALUES (:version, :description)"),
+                        {"version": revision.revision, "description": revision.description}
+                    )
+                    await conn.commit()
+                except Exception:
+                    await conn.rollback()
+                    raise
+
+                logger.info("Applied migration %d: %s", revision.revision, revision.description)
+                applied.append(revision.revision)
+        finally:
+            await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+            await conn.commit()
+
+    return applied
+
+async def check_version(engine: AsyncEngine) -> int:
+    # ใช้ตอน startup: อ่านเลข version อย่างเดียว ไม่แตะ schema
+    async with engine.connect() as conn:
+        version = await current_version(conn)
+
+    if version < HEAD_VERSION:
+        raise RuntimeError(
+            f"Database schema is at version {version}, this build needs {HEAD_VERSION}. Run: {MIGRATE_COMMAND}"
+        )
+    if version > HEAD_VERSION:
+        # deploy แบบ rolling: DB migrate ไปก่อนแล้ว worker เก่ายังรันต่อได้
+        logger.warning("Database schema version %d is newer than this build (%d)", version, HEAD_VERSION)
+    return version
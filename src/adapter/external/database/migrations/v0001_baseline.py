@@ -0,0 +1,76 @@
+# schema เดิมตอนที่ยังใช้ Base.metadata.create_all
+# ใช้ IF NOT EXISTS ทั้งหมด DB ที่สร้างจาก create_all ไว้แล้วจะผ่าน revision นี้ไปเฉยๆ
+revision = 1
+description = "baseline schema"
+
+statements = [
+    """
+    CREATE TABLE IF NOT EXISTS stores (
+        id VARCHAR NOT NULL PRIMARY KEY,
+        store_name VARCHAR,
+        description VARCHAR,
+        created_at TIMESTAMP WITHOUT TIME ZONE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        id VARCHAR NOT NULL PRIMARY KEY,
+        user_name VARCHAR,
+        tel VARCHAR
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS admins (
+        id VARCHAR NOT NULL PRIMARY KEY,
+        email VARCHAR,
+        admin_name VARCHAR,
+        admin_password VARCHAR,
+        store_id VARCHAR NOT NULL REFERENCES stores (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS services (
+        id VARCHAR NOT NULL PRIMARY KEY,
+        title VARCHAR,
+        duration_minutes INTEGER,
+        prices FLOAT,
+        description VARCHAR,
+        store_id VARCHAR NOT NULL REFERENCES stores (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS bookings (
+        id VARCHAR NOT NULL PRIMARY KEY,
+        booking_time TIMESTAMP WITHOUT TIME ZONE,
+        status VARCHAR,
+        created_at TIMESTAMP WITHOUT TIME ZONE,
+        note VARCHAR,
+        user_id VARCHAR NOT NULL REFERENCES users (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS bookings_services (
+        booking_id VARCHAR NOT NULL REFERENCES bookings (id),
+        service_id VARCHAR NOT NULL REFERENCES services (id),
+        PRIMARY KEY (booking_id, service_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS payments (
+        id VARCHAR NOT NULL PRIMARY KEY,
+        amount FLOAT,
+        payment_status VARCHAR,
+        slip VARCHAR,
+        created_at TIMESTAMP WITHOUT TIME ZONE,
+        paid_at TIMESTAMP WITHOUT TIME ZONE,
+        booking_id VARCHAR NOT NULL REFERENCES bookings (id)
+    )
+    """,
+    # index=True บน primary key ของ model เดิม
+    "CREATE INDEX IF NOT EXISTS ix_stores_id ON stores (id)",
+    "CREATE INDEX IF NOT EXISTS ix_users_id ON users (id)",
+    "CREATE INDEX IF NOT EXISTS ix_admins_id ON admins (id)",
+    "CREATE INDEX IF NOT EXISTS ix_services_id ON services (id)",
+    "CREATE INDEX IF NOT EXISTS ix_bookings_id ON bookings (id)",
+    "CREATE INDEX IF NOT EXISTS ix_payments_id ON payments (id)",
+]
@@ -0,0 +1,15 @@
+revision = 2
+description = "store business hours"
+
+statements = [
+    """
+    CREATE TABLE IF NOT EXISTS store_business_hours (
+        store_id VARCHAR NOT NULL REFERENCES stores (id),
+        weekday INTEGER NOT NULL,
+        open_time TIME WITHOUT TIME ZONE,
+        close_time TIME WITHOUT TIME ZONE,
+        is_closed BOOLEAN,
+        PRIMARY KEY (store_id, weekday)
+    )
+    """,
+]
@@ -0,0 +1,8 @@
+revision = 3
+description = "per-store payment expiry"
+
+statements = [
+    "ALTER TABLE stores ADD COLUMN IF NOT EXISTS payment_expiry_minutes INTEGER",
+    "ALTER TABLE payments ADD COLUMN IF NOT EXISTS expires_at TIMESTAMP WITHOUT TIME ZONE",
+    "CREATE INDEX IF NOT EXISTS ix_payments_status_expires_at ON payments (payment_status, expires_at)",
+]
@@ -0,0 +1,28 @@
+revision = 4
+description = "secondary indexes and unique names"
+
+# Postgres ไม่มี ADD CONSTRAINT IF NOT EXISTS เลยเช็คจาก pg_constraint เอง
+# ถ้ามีชื่อซ้ำอยู่แล้วใน DB revision นี้จะ fail ต้องแก้ข้อมูลซ้ำก่อนแล้วรันใหม่
+def _add_unique(table: str, name: str, column: str) -> str:
+    return f"""
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = '{name}') THEN
+            ALTER TABLE {table} ADD CONSTRAINT {name} UNIQUE ({column});
+        END IF;
+    END $$
+    """
+
+statements = [
+    _add_unique("admins", "uq_admins_admin_name", "admin_name"),
+    _add_unique("stores", "uq_stores_store_name", "store_name"),
+    "CREATE INDEX IF NOT EXISTS ix_admins_store_id ON admins (store_id)",
+    "CREATE INDEX IF NOT EXISTS ix_stores_created_at_id ON stores (created_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_services_store_id_title ON services (store_id, title)",
+    "CREATE INDEX IF NOT EXISTS ix_services_title ON services (title)",
+    "CREATE INDEX IF NOT EXISTS ix_bookings_booking_time ON bookings (booking_time)",
+    "CREATE INDEX IF NOT EXISTS ix_bookings_user_id_created_at_id ON bookings (user_id, created_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_bookings_services_service_id_booking_id ON bookings_services (service_id, booking_id)",
+    "CREATE INDEX IF NOT EXISTS ix_payments_booking_id ON payments (booking_id)",
+    "CREATE INDEX IF NOT EXISTS ix_payments_created_at_id ON payments (created_at, id)",
+]
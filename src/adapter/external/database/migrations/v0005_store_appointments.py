@@ -0,0 +1,51 @@
+revision = 5
+description = "store appointment read model"
+
+statements = [
+    """
+    CREATE TABLE IF NOT EXISTS store_appointments (
+        store_id VARCHAR NOT NULL,
+        booking_id VARCHAR NOT NULL,
+        booking_time TIMESTAMP WITHOUT TIME ZONE,
+        status VARCHAR,
+        note VARCHAR,
+        created_at TIMESTAMP WITHOUT TIME ZONE,
+        user_id VARCHAR,
+        user_name VARCHAR,
+        tel VARCHAR,
+        store_name VARCHAR,
+        services JSONB,
+        PRIMARY KEY (store_id, booking_id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_store_appointments_store_id_booking_time ON store_appointments (store_id, booking_time)",
+    "CREATE INDEX IF NOT EXISTS ix_store_appointments_booking_id ON store_appointments (booking_id)",
+    # backfill จาก booking ที่มีอยู่แล้ว (รันซ้ำได้ ลบแล้วสร้างใหม่ทั้งหมด)
+    "DELETE FROM store_appointments",
+    """
+    INSERT INTO store_appointments (
+        store_id, booking_id, booking_time, status, note, created_at,
+        user_id, user_name, tel, store_name, services
+    )
+    SELECT
+        s.store_id, b.id, b.booking_time, b.status, b.note, b.created_at,
+        b.user_id, u.user_name, u.tel, st.store_name,
+        jsonb_agg(
+            jsonb_build_object(
+                'id', s.id,
+                'title', s.title,
+                'duration_minutes', s.duration_minutes,
+                'prices', s.prices,
+                'description', s.description,
+                'store_id', s.store_id
+            )
+            ORDER BY s.id
+        )
+    FROM bookings b
+    JOIN bookings_services bs ON bs.booking_id = b.id
+    JOIN services s ON s.id = bs.service_id
+    JOIN stores st ON st.id = s.store_id
+    LEFT JOIN users u ON u.id = b.user_id
+    GROUP BY s.store_id, b.id, u.id, st.id
+    """,
+]
@@ -0,0 +1,18 @@
+revision = 6
+description = "on delete cascade for owned rows"
+
+# ชื่อ constraint เป็นชื่อ default ของ Postgres (<table>_<column>_fkey) ทั้งจาก baseline และ create_all
+# drop แล้วสร้างใหม่พร้อม ON DELETE CASCADE (รันซ้ำได้)
+def _cascade(table: str, column: str, parent: str) -> list:
+    name = f"{table}_{column}_fkey"
+    return [
+        f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {name}",
+        f"ALTER TABLE {table} ADD CONSTRAINT {name} FOREIGN KEY ({column}) REFERENCES {parent} (id) ON DELETE CASCADE",
+    ]
+
+# ลบ booking = ลบรายการ service ของ booking นั้นด้วย / ลบร้าน = ลบเวลาเปิดปิดของร้านด้วย
+# payments, services, admins ยังไม่ cascade ลบแม่ที่ยังมีลูกพวกนี้อยู่ไม่ได้เหมือนเดิม
+statements = [
+    *_cascade("bookings_services", "booking_id", "bookings"),
+    *_cascade("store_business_hours", "store_id", "stores"),
+]
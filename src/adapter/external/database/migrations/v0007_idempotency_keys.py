@@ -0,0 +1,16 @@
+revision = 7
+description = "idempotency keys"
+
+statements = [
+    """
+    CREATE TABLE IF NOT EXISTS idempotency_keys (
+        scope VARCHAR NOT NULL,
+        idempotency_key VARCHAR NOT NULL,
+        request_hash VARCHAR NOT NULL,
+        response JSONB,
+        created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now(),
+        PRIMARY KEY (scope, idempotency_key)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_idempotency_keys_created_at ON idempotency_keys (created_at)",
+]
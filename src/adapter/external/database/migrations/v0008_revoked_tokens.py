@@ -0,0 +1,12 @@
+revision = 8
+description = "revoked admin tokens"
+
+statements = [
+    """
+    CREATE TABLE IF NOT EXISTS revoked_tokens (
+        jti VARCHAR PRIMARY KEY,
+        exp BIGINT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_revoked_tokens_exp ON revoked_tokens (exp)",
+]
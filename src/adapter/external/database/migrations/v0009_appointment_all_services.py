@@ -0,0 +1,42 @@
+revision = 9
+description = "store appointments keep every service of the booking"
+
+statements = [
+    # สร้าง read model ใหม่ทั้งหมด: services มีทุก service ของ booking พร้อม store_name
+    "DELETE FROM store_appointments",
+    """
+    WITH booking_services_json AS (
+        SELECT
+            bs.booking_id,
+            jsonb_agg(
+                jsonb_build_object(
+                    'id', s.id,
+                    'title', s.title,
+                    'duration_minutes', s.duration_minutes,
+                    'prices', s.prices,
+                    'description', s.description,
+                    'store_id', s.store_id,
+                    'store_name', st.store_name
+                )
+                ORDER BY s.id
+            ) AS services
+        FROM bookings_services bs
+        JOIN services s ON s.id = bs.service_id
+        JOIN stores st ON st.id = s.store_id
+        GROUP BY bs.booking_id
+    )
+    INSERT INTO store_appointments (
+        store_id, booking_id, booking_time, status, note, created_at,
+        user_id, user_name, tel, store_name, services
+    )
+    SELECT DISTINCT ON (s.store_id, b.id)
+        s.store_id, b.id, b.booking_time, b.status, b.note, b.created_at,
+        b.user_id, u.user_name, u.tel, st.store_name, j.services
+    FROM bookings b
+    JOIN bookings_services bs ON bs.booking_id = b.id
+    JOIN services s ON s.id = bs.service_id
+    JOIN stores st ON st.id = s.store_id
+    JOIN booking_services_json j ON j.booking_id = b.id
+    LEFT JOIN users u ON u.id = b.user_id
+    """,
+]
@@ -0,0 +1,50 @@
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# แก้ข้อมูลด้วย UPDATE ... RETURNING statement เดียว แทน SELECT -> setattr -> commit -> refresh
+# - แก้ได้เฉพาะ column ใน whitelist key อื่นใน request = ValueError (กันแก้ id / column ที่ไม่ควรแตะ)
+# - ไม่เจอแถว (หรือ conditions ไม่ผ่าน) ได้ None กลับมา ไม่ต้อง SELECT ก่อน
+# - previous: column ที่อยากรู้ค่าก่อนแก้ ได้มาจาก self-join ใน UPDATE ... FROM (ยังเป็น statement เดียว)
+
+
+class PartialUpdate:
+    def __init__(self, model, updatable: set, previous: tuple = ()):
+        self.model = model
+        self.table = model.__table__
+        self.primary_key = self.table.primary_key.columns[0]
+        self.updatable = frozenset(updatable)
+        self.previous = previous
+
+    def values(self, update_data: dict, ignore: tuple = ()) -> dict:
+        # ignore = key ที่มากับ request แต่ไม่ใช่ค่าที่จะแก้ (เช่น store_id ที่ใช้ระบุแถว)
+        values = {key: value for key, value in update_data.items() if key not in ignore}
+        unknown = set(values) - self.updatable
+        if unknown:
+            raise ValueError(f"Cannot update field(s): {', '.join(sorted(unknown))}")
+
+        if not values:
+            raise ValueError("No fields to update")
+        return values
+
+    async def execute(self, db: AsyncSession, key, update_data: dict, ignore: tuple = (), conditions: tuple = ()) -> tuple:
+        # คืน (object ที่แก้แล้ว, dict ค่าก่อนแก้ของ previous) หรือ (None, None)
+        # ยังไม่ commit ให้ caller เขียนอย่างอื่นต่อใน transaction เดียวกันได้
+        stmt = (
+            update(self.table)
+            .where(self.primary_key == key, *conditions)
+            .values(**self.values(update_data, ignore))
+        )
+        returning = list(self.table.c)
+        if self.previous:
+            before = self.table.alias("previous")
+            stmt = stmt.where(before.c[self.primary_key.key] == self.primary_key)
+            returning += [before.c[name].label(f"previous_{name}") for name in self.previous]
+
+        row = (await db.execute(stmt.returning(*returning))).first()
+        if row is None:
+            return None, None
+
+        mapping = row._mapping
+        # object ใหม่ไม่ผูก session ค่าเท่ากับแถวใน DB หลังแก้ (to_dict/response_model ใช้ได้)
+        entity = self.model(**{column.key: mapping[column] for column in self.table.c})
+        return entity, {name: mapping[f"previous_{name}"] for name in self.previous}
@@ -1,20 +1,88 @@
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession,async_sessionmaker
+from starlette.requests import Request
 # from sqlalchemy.orm import sessionmaker
+from hashlib import sha256
 import os
 
+from adapter.external.database.replica import ReplicaRouter, RoutingSession
+from adapter.external.database.instrumentation import instrument_engine, timed_pool_class
+from adapter.external.database.query_budget import begin_request, end_request
+
 DATABASE_URL = os.getenv('DATABASE_URL')
+# replica สำหรับอ่าน คั่นด้วย comma ไม่ตั้ง = อ่านเขียนที่ primary ทั้งหมด
+REPLICA_DATABASE_URLS = [url.strip() for url in os.getenv('REPLICA_DATABASE_URLS', '').split(',') if url.strip()]
+REPLICA_MAX_LAG_SECONDS = float(os.getenv('REPLICA_MAX_LAG_SECONDS', '5'))
+REPLICA_LAG_CHECK_INTERVAL_SECONDS = float(os.getenv('REPLICA_LAG_CHECK_INTERVAL_SECONDS', '5'))
+# client ที่เพิ่งเขียน GET ต่อจากนั้นภายในกี่วินาทีให้อ่าน primary
+# client ระบุตัวเองด้วย header นี้ (หรือ bearer token ของ admin) ไม่ส่งมา = ไม่ pin อ่าน replica ตามปกติ
+READ_YOUR_WRITES_HEADER = os.getenv('READ_YOUR_WRITES_HEADER', 'X-Session-Id')
+READ_YOUR_WRITES_SECONDS = float(os.getenv('READ_YOUR_WRITES_SECONDS', '5'))
+
+READ_METHODS = {"GET", "HEAD"}
+
+engine = create_async_engine(DATABASE_URL, poolclass=timed_pool_class("primary"))
+replica_engines = [
+    create_async_engine(url, poolclass=timed_pool_class(f"replica-{index}"))
+    for index, url in enumerate(REPLICA_DATABASE_URLS)
+]
+for instrumented_engine in [engine, *replica_engines]:
+    instrument_engine(instrumented_engine)
+
+replica_router = ReplicaRouter(
+    engine,
+    replica_engines,
+    max_lag_seconds=REPLICA_MAX_LAG_SECONDS,
+    check_interval_seconds=REPLICA_LAG_CHECK_INTERVAL_SECONDS,
+    read_your_writes_seconds=READ_YOUR_WRITES_SECONDS
+)
+
+class ReadRoutingSession(RoutingSession):
+    router = replica_router
 
-engine = create_async_engine(DATABASE_URL)
+# session ของ primary: ทุก request ที่เขียน, migration, การโหลด cache (ไม่อยาก cache ข้อมูลที่ lag)
 AsyncSessionLocal = async_sessionmaker(
-    autocommit=False, 
-    autoflush=False, 
-    bind=engine, 
-    class_=AsyncSession
+    autocommit=False,
+    autoflush=False,
+    bind=engine,
+    class_=AsyncSession,
+    expire_on_commit=False # ใช้ object ต่อหลัง commit ได้โดยไม่ต้อง refresh (async lazy load ไม่ได้)
 )
 
-async def get_db():
-    db = AsyncSessionLocal()
+# session ของ GET: SELECT ไป replica ที่ lag ไม่เกินกำหนด ไม่มีก็ primary
+ReadSessionLocal = async_sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    class_=AsyncSession,
+    sync_session_class=ReadRoutingSession,
+    expire_on_commit=False
+)
+
+def client_key(request: Request) -> str:
+    # ไม่ใช้ IP ของ client: หลัง NAT/proxy คนละคนได้ IP เดียวกัน (pin กันเองทั้งกลุ่ม)
+    session_id = request.headers.get(READ_YOUR_WRITES_HEADER)
+    if session_id:
+        return "session:" + session_id
+    authorization = request.headers.get("authorization")
+    if authorization:
+        # ไม่เก็บ token ดิบไว้ใน memory
+        return "auth:" + sha256(authorization.encode()).hexdigest()
+    return None
+
+async def get_db(request: Request):
+    key = client_key(request)
+    is_read = request.method in READ_METHODS
+
+    if is_read and not replica_router.wrote_recently(key):
+        db = ReadSessionLocal()
+    else:
+        db = AsyncSessionLocal()
+
+    # นับ statement ของ request นี้ (รวม cache loader ที่ถูกเรียกระหว่าง request) รายงานตอนจบ
+    query_stats = begin_request()
     try:
         yield db
     finally:
-        await db.close()
\ No newline at end of file
+        await db.close()
+        end_request(query_stats)
+        if not is_read:
+            replica_router.mark_write(key)
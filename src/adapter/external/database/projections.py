@@ -0,0 +1,67 @@
+from sqlalchemy import select
+
+from domain.model_entities.database import Booking, Payment, Service, Store, User
+
+# read path ของ list endpoint: SELECT เฉพาะ column ที่ response ใช้ ได้ row tuple กลับมา
+# ไม่สร้าง ORM object / instance state / ไม่ลง identity map ของ session
+# แล้ว map เป็น dict shape เดียวกับ to_dict() (ส่งเข้า json_response ได้ตรงๆ)
+
+
+class RowProjection:
+    def __init__(self, *columns):
+        self.columns = columns
+        self.fields = tuple(column.key for column in columns)
+
+    def select(self):
+        return select(*self.columns)
+
+    def to_dto(self, row) -> dict:
+        return dict(zip(self.fields, row))
+
+    def to_dtos(self, rows) -> list:
+        fields = self.fields
+        return [dict(zip(fields, row)) for row in rows]
+
+
+STORE_ROW = RowProjection(
+    Store.id,
+    Store.store_name,
+    Store.description,
+    Store.created_at,
+    Store.payment_expiry_minutes
+)
+
+SERVICE_ROW = RowProjection(
+    Service.id,
+    Service.title,
+    Service.duration_minutes,
+    Service.prices,
+    Service.description,
+    Service.store_id
+)
+
+BOOKING_ROW = RowProjection(
+    Booking.id,
+    Booking.booking_time,
+    Booking.status,
+    Booking.created_at,
+    Booking.note,
+    Booking.user_id
+)
+
+PAYMENT_ROW = RowProjection(
+    Payment.id,
+    Payment.amount,
+    Payment.payment_status,
+    Payment.slip,
+    Payment.created_at,
+    Payment.paid_at,
+    Payment.expires_at,
+    Payment.booking_id
+)
+
+USER_ROW = RowProjection(
+    User.id,
+    User.user_name,
+    User.tel
+)
@@ -0,0 +1,131 @@
+from contextvars import ContextVar
+from hashlib import sha1
+import logging
+import os
+import re
+
+from adapter.external.metrics import registry, route_label
+
+# นับ statement ต่อ request (เปิดใน get_db) เกิน budget หรือมี statement หน้าตาเดียวกันซ้ำหลายรอบ (N+1) จะ log ไว้
+# slow query log ไม่พิมพ์ค่า parameter จริง มีแค่ fingerprint (type + hash) ใช้ใน production ได้
+QUERY_INSPECTION = os.getenv('QUERY_INSPECTION', 'true').lower() in ('1', 'true', 'yes')
+QUERY_BUDGET_PER_REQUEST = int(os.getenv('QUERY_BUDGET_PER_REQUEST', '8'))
+N_PLUS_ONE_THRESHOLD = int(os.getenv('N_PLUS_ONE_THRESHOLD', '3'))
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', '200'))
+LOGGED_SQL_LENGTH = 300
+
+# ชื่อ logger แยกจาก module ปรับ level/ปิดเฉพาะ log ของ query ได้โดยไม่กระทบ log อื่น
+logger = logging.getLogger("query_budget")
+
+statements_per_request = registry.histogram(
+    "db_statements_per_request",
+    "SQL statements issued while serving one request",
+    ("route",),
+    buckets=(1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+)
+query_budget_exceeded = registry.counter(
+    "db_query_budget_exceeded_total",
+    "Requests that issued more statements than QUERY_BUDGET_PER_REQUEST",
+    ("route",)
+)
+n_plus_one_detected = registry.counter(
+    "db_n_plus_one_total",
+    "Statement shapes repeated N_PLUS_ONE_THRESHOLD or more times in one request",
+    ("route", "repository_method")
+)
+slow_queries = registry.counter(
+    "db_slow_queries_total",
+    "Statements slower than SLOW_QUERY_MS",
+    ("route", "repository_method")
+)
+
+
+class RequestQueryStats:
+    def __init__(self):
+        self.count = 0
+        self.shapes = {} # SQL (parameterized แล้ว) -> [จำนวนครั้ง, set ของ repository method]
+
+    def record(self, statement: str, repository_method: str):
+        self.count += 1
+        entry = self.shapes.get(statement)
+        if entry is None:
+            entry = self.shapes[statement] = [0, set()]
+        entry[0] += 1
+        entry[1].add(repository_method)
+
+
+current_query_stats: ContextVar = ContextVar("current_query_stats", default=None)
+
+
+def _compact_sql(statement: str) -> str:
+    sql = re.sub(r"\s+", " ", statement).strip()
+    return sql if len(sql) <= LOGGED_SQL_LENGTH else sql[:LOGGED_SQL_LENGTH] + "..."
+
+
+def statement_fingerprint(statement: str) -> str:
+    return sha1(re.sub(r"\s+", " ", statement).strip().encode()).hexdigest()[:12]
+
+
+def parameter_fingerprint(parameters, executemany: bool) -> str:
+    # type:hash ของแต่ละค่า บอกได้ว่าค่าซ้ำกันไหมโดยไม่เปิดเผยข้อมูล
+    if executemany:
+        rows = list(parameters or [])
+        return f"{len(rows)} rows, first=[{parameter_fingerprint(rows[0], False) if rows else ''}]"
+
+    values = parameters.values() if isinstance(parameters, dict) else (parameters or ())
+    return ", ".join(
+        "None" if value is None else f"{type(value).__name__}:{sha1(repr(value).encode()).hexdigest()[:8]}"
+        for value in values
+    )
+
+
+def begin_request():
+    if not QUERY_INSPECTION:
+        return None
+    stats = RequestQueryStats()
+    return current_query_stats.set(stats), stats
+
+
+def end_request(handle):
+    if handle is None:
+        return
+    token, stats = handle
+    try:
+        current_query_stats.reset(token)
+    except ValueError:
+        pass
+
+    route = route_label()
+    statements_per_request.observe(stats.count, route=route)
+
+    if stats.count > QUERY_BUDGET_PER_REQUEST:
+        query_budget_exceeded.inc(route=route)
+        logger.warning(
+            "Query budget exceeded: route=%s statements=%d budget=%d",
+            route, stats.count, QUERY_BUDGET_PER_REQUEST
+        )
+
+    for statement, (count, methods) in stats.shapes.items():
+        if count < N_PLUS_ONE_THRESHOLD:
+            continue
+        for method in methods:
+            n_plus_one_detected.inc(route=route, repository_method=method)
+        logger.warning(
+            "Possible N+1: route=%s repository_method=%s repeated=%d shape=%s sql=%s",
+            route, ",".join(sorted(methods)), count, statement_fingerprint(statement), _compact_sql(statement)
+        )
+
+
+def record_statement(statement: str, parameters, executemany: bool, duration: float, labels: dict):
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.record(statement, labels["repository_method"])
+
+    elapsed_ms = duration * 1000
+    if elapsed_ms >= SLOW_QUERY_MS:
+        slow_queries.inc(route=labels["route"], repository_method=labels["repository_method"])
+        logger.warning(
+            "Slow query: %.1fms route=%s repository_method=%s shape=%s params=[%s] sql=%s",
+            elapsed_ms, labels["route"], labels["repository_method"], statement_fingerprint(statement),
+            parameter_fingerprint(parameters, executemany), _compact_sql(statement)
+        )
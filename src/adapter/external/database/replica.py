@@ -0,0 +1,156 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+from time import monotonic
+import asyncio
+import logging
+
+from utils.lru import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# replica ที่ไม่ได้อยู่ใน recovery (เช่น Postgres อีกตัวที่ sync เอง) ถือว่า lag = 0
+# replay ทัน WAL ที่รับมาแล้ว = 0 ไม่งั้นวัดจากเวลา transaction ล่าสุดที่ replay
+REPLICA_LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+
+class ReplicaRouter:
+    # เลือก replica ให้ read session แบบ round-robin เฉพาะตัวที่ lag ไม่เกิน max_lag_seconds
+    # ไม่มีตัวไหนใช้ได้ = คืน None ให้ไปอ่านที่ primary แทน
+    def __init__(
+            self,
+            primary: AsyncEngine,
+            replicas: list,
+            max_lag_seconds: float,
+            check_interval_seconds: float,
+            read_your_writes_seconds: float
+        ):
+        self.primary = primary
+        self.replicas = replicas
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval_seconds = check_interval_seconds
+        self.read_your_writes_seconds = read_your_writes_seconds
+
+        # ยังไม่ได้เช็ค lag ถือว่าใช้ไม่ได้จนกว่ารอบแรกจะผ่าน
+        self._lag = {index: None for index in range(len(replicas))}
+        self._failing = set() # index ของ replica ที่เช็ค lag รอบล่าสุดไม่ผ่าน (log แค่ตอนเปลี่ยนสถานะ)
+        self._next = 0
+        self._task = None
+        self._recent_writers = LRUCache(10_000) # client key -> เวลาที่เขียนล่าสุด
+
+        self.replica_reads = 0
+        self.primary_fallbacks = 0
+
+    def healthy_replicas(self) -> list:
+        return [
+            replica for index, replica in enumerate(self.replicas)
+            if self._lag[index] is not None and self._lag[index] <= self.max_lag_seconds
+        ]
+
+    def pick(self):
+        healthy = self.healthy_replicas()
+        if not healthy:
+            if self.replicas:
+                self.primary_fallbacks += 1
+            return None
+
+        replica = healthy[self._next % len(healthy)]
+        self._next += 1
+        self.replica_reads += 1
+        return replica
+
+    def mark_write(self, client_key: str):
+        if client_key:
+            self._recent_writers.put(client_key, monotonic())
+
+    def wrote_recently(self, client_key: str) -> bool:
+        # read-your-writes: client ที่เพิ่งเขียนไปอ่าน primary ต่ออีกสักพัก
+        written_at = self._recent_writers.get(client_key) if client_key else None
+        return written_at is not None and monotonic() - written_at < self.read_your_writes_seconds
+
+    async def check_lag(self):
+        for index, replica in enumerate(self.replicas):
+            try:
+                async with replica.connect() as conn:
+                    lag = await asyncio.wait_for(conn.scalar(text(REPLICA_LAG_SQL)), timeout=self.check_interval_seconds)
+                self._lag[index] = float(lag)
+            except Exception as e:
+                if index not in self._failing:
+                    logger.warning("Replica %d lag check failed, reading from primary until it recovers: %s", index, e)
+                    self._failing.add(index)
+                self._lag[index] = None
+                continue
+
+            if index in self._failing:
+                logger.info("Replica %d lag check recovered (lag %.1fs)", index, self._lag[index])
+                self._failing.discard(index)
+
+    async def start(self):
+        if not self.replicas or self._task is not None:
+            return
+        await self.check_lag()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.check_interval_seconds)
+            await self.check_lag()
+
+    def pool_metrics(self) -> dict:
+        engines = [("primary", self.primary, None)] + [
+            (f"replica-{index}", replica, self._lag[index]) for index, replica in enumerate(self.replicas)
+        ]
+        return {
+            "replica_reads": self.replica_reads,
+            "primary_fallbacks": self.primary_fallbacks,
+            "engines": [
+                {
+                    "name": name,
+                    "healthy": name == "primary" or (lag is not None and lag <= self.max_lag_seconds),
+                    "lag_seconds": lag,
+                    "pool_size": engine.pool.size(),
+                    "checked_in": engine.pool.checkedin(),
+                    "checked_out": engine.pool.checkedout(),
+                    "overflow": engine.pool.overflow()
+                }
+                for name, engine, lag in engines
+            ]
+        }
+
+
+class RoutingSession(Session):
+    # session ฝั่งอ่าน: SELECT ธรรมดาไป replica (ตัวเดียวตลอด session)
+    # flush / DML / text() / SELECT ... FOR UPDATE ไป primary และหลังจากนั้นทั้ง session อยู่ primary
+    router: ReplicaRouter = None
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        is_plain_read = (
+            getattr(clause, "is_select", False)
+            and getattr(clause, "_for_update_arg", None) is None
+        )
+        if self._flushing or not is_plain_read:
+            self.info["wrote"] = True
+
+        if not self.info.get("wrote"):
+            if "replica" not in self.info:
+                self.info["replica"] = self.router.pick()
+            if self.info["replica"] is not None:
+                return self.info["replica"].sync_engine
+
+        return self.router.primary.sync_engine
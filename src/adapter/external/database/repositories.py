@@ -2,20 +2,35 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
 from sqlalchemy import delete
+from sqlalchemy import insert
+from sqlalchemy import update
 from sqlalchemy import and_
+from sqlalchemy import or_
+from sqlalchemy import func
+from sqlalchemy import tuple_
+from sqlalchemy import DateTime
+from sqlalchemy import String
+from sqlalchemy import any_
+from sqlalchemy import bindparam
+from sqlalchemy import literal
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.exc import IntegrityError
 from domain.model_entities.database import (
     Admin,
     Store,
+    StoreBusinessHour,
     Service,
     Payment,
     User,
     Booking,
-    BookingService
+    BookingService,
+    StoreAppointment
 )
 from typing import List, Optional
 from domain.interfaces.database import (
     AdminRepositoryInterface,
     StoreRepositoryInterface,
+    StoreBusinessHourRepositoryInterface,
     ServiceRepositoryInterface,
     PaymentRepositoryInterface,
     UserRepositoryInterface,
@@ -25,6 +40,113 @@ from domain.interfaces.database import (
 
 from datetime import datetime, timedelta
 
+from utils.pagination import encode_cursor, decode_cursor
+from adapter.external.database.postgres import AsyncSessionLocal
+from adapter.external.metrics import instrument_repository
+from adapter.external.database.appointment_projection import (
+    refresh_appointments_of_bookings,
+    refresh_appointments_of_service,
+    refresh_appointments_of_services,
+    refresh_appointments_of_store
+)
+from adapter.external.database.store_stats import invalidate_store_stats
+from adapter.external.database.catalog_cache import (
+    catalog_cache,
+    stores_key,
+    services_of_store_key,
+    service_key
+)
+from adapter.external.database.partial_update import PartialUpdate
+from adapter.external.database.projections import (
+    RowProjection,
+    STORE_ROW,
+    SERVICE_ROW,
+    BOOKING_ROW,
+    PAYMENT_ROW,
+    USER_ROW
+)
+import os
+
+STREAM_BATCH_SIZE = 500
+
+# เวลาหมดอายุของ payment (นาที) สำหรับร้านที่ไม่ได้ตั้ง payment_expiry_minutes เอง
+PAYMENT_EXPIRY_MINUTES = float(os.getenv('PAYMENT_EXPIRY_MINUTES', '2'))
+
+# column ที่ endpoint edit แก้ได้ (UPDATE ... RETURNING statement เดียว)
+STORE_UPDATE = PartialUpdate(Store, {"store_name", "description", "payment_expiry_minutes"})
+SERVICE_UPDATE = PartialUpdate(
+    Service,
+    {"title", "duration_minutes", "prices", "description", "store_id"},
+    previous=("store_id",) # ย้ายร้านได้ ต้องล้าง cache ของร้านเดิมด้วย
+)
+BOOKING_UPDATE = PartialUpdate(Booking, {"booking_time", "status", "note", "user_id"})
+PAYMENT_STATUS_UPDATE = PartialUpdate(Payment, {"payment_status", "paid_at"}, previous=("payment_status",))
+
+def _payment_not_expired(now: datetime):
+    # เงื่อนไขเดียวกับ is_expired แต่เป็น SQL ใช้เป็น condition ของ UPDATE
+    # payment เก่าที่ยังไม่มี expires_at ใช้ created_at + ค่า default แทน
+    deadline = func.coalesce(Payment.expires_at, Payment.created_at + timedelta(minutes=PAYMENT_EXPIRY_MINUTES))
+    return and_(
+        Payment.payment_status != "Expired",
+        or_(Payment.payment_status != "Pending", deadline > now)
+    )
+
+def _string_array(values: list):
+    # ใช้กับ column == any_(...) ส่งเป็น array parameter ตัวเดียว
+    # SQL เหมือนเดิมไม่ว่า batch จะมีกี่ตัว (ไม่ขยายเป็น IN ($1, $2, ...))
+    return bindparam(None, list(values), type_=ARRAY(String))
+
+async def _keyset_page(db: AsyncSession, projection: RowProjection, stmt, sort_columns: list, limit: int, cursor: Optional[str]) -> tuple:
+    # keyset pagination: WHERE (sort key) > (ค่าใน cursor) ORDER BY sort key LIMIT n
+    # ใช้ index ของ sort key ได้ตรงๆ ไม่ต้อง OFFSET ไล่ข้ามแถว
+    # stmt = projection.select() (+ where) sort key ต้องอยู่ใน column ของ projection
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != len(sort_columns):
+            raise ValueError("cursor is invalid")
+
+        try:
+            values = [
+                datetime.fromisoformat(value) if isinstance(column.type, DateTime) else value
+                for column, value in zip(sort_columns, values)
+            ]
+        except (TypeError, ValueError):
+            raise ValueError("cursor is invalid")
+
+        stmt = stmt.where(tuple_(*sort_columns) > tuple_(*values))
+
+    # ดึงเกินมา 1 แถวเพื่อรู้ว่ายังมีหน้าถัดไปไหม
+    result = await db.execute(stmt.order_by(*sort_columns).limit(limit + 1))
+    rows = result.all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([getattr(rows[-1], column.key) for column in sort_columns])
+
+    return projection.to_dtos(rows), next_cursor
+
+async def _load_rows(projection: RowProjection, stmt) -> list:
+    # loader ของ catalog_cache ใช้ session ของตัวเอง ไม่ผูกกับ session ของ request
+    # เก็บเป็น dict ของ projection (ไม่มี ORM state / detached object ติดไปใน cache)
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(stmt)
+        return projection.to_dtos(result.all())
+
+async def _load_row(projection: RowProjection, stmt) -> Optional[dict]:
+    async with AsyncSessionLocal() as db:
+        row = (await db.execute(stmt)).first()
+        return projection.to_dto(row) if row is not None else None
+
+async def _stream_all(db: AsyncSession, projection: RowProjection, stmt, sort_columns: list):
+    # server-side cursor ทยอยดึงทีละ STREAM_BATCH_SIZE แถว memory ไม่โตตามขนาด table
+    result = await db.stream(
+        stmt.order_by(*sort_columns).execution_options(yield_per=STREAM_BATCH_SIZE)
+    )
+    async for row in result:
+        yield projection.to_dto(row)
+
+@instrument_repository
 class AdminRepositoryAdapter(AdminRepositoryInterface):
     def __init__(self, db: AsyncSession):
         self.db = db
@@ -35,6 +157,10 @@ class AdminRepositoryAdapter(AdminRepositoryInterface):
             await self.db.commit()
             await self.db.refresh(admin)
             return admin
+        except IntegrityError:
+            # ชน uq_admins_admin_name (register พร้อมกันสองคน)
+            await self.db.rollback()
+            raise ValueError("Admin name already exists.")
         except Exception as e:
             await self.db.rollback()
             raise e
@@ -51,6 +177,11 @@ class AdminRepositoryAdapter(AdminRepositoryInterface):
         result = await self.db.execute(select(Admin))
         return result.scalars().all()
 
+    async def has_admin_for_store(self, store_id: str) -> bool:
+        result = await self.db.execute(select(Admin.id).filter(Admin.store_id == store_id).limit(1))
+        return result.first() is not None
+
+@instrument_repository
 class StoreRepositoryAdapter(StoreRepositoryInterface):
     def __init__(self, db: AsyncSession):
         self.db = db
@@ -60,7 +191,11 @@ class StoreRepositoryAdapter(StoreRepositoryInterface):
             self.db.add(store)
             await self.db.commit()
             await self.db.refresh(store)
+            catalog_cache.invalidate(stores_key())
             return store
+        except IntegrityError:
+            await self.db.rollback()
+            raise ValueError("Store already exists.")
         except Exception as e:
             await self.db.rollback()
             raise e
@@ -73,45 +208,95 @@ class StoreRepositoryAdapter(StoreRepositoryInterface):
         result = await self.db.execute(select(Store).filter(Store.id == store_id))
         return result.scalars().first()
     
-    async def get_all(self) -> List[Store]:
-        result = await self.db.execute(select(Store))
-        return result.scalars().all()
+    async def get_all(self) -> List[dict]:
+        return await catalog_cache.get_or_load(stores_key(), lambda: _load_rows(STORE_ROW, STORE_ROW.select()))
+
+    async def get_page(self, limit: int, cursor: Optional[str] = None) -> tuple:
+        return await _keyset_page(self.db, STORE_ROW, STORE_ROW.select(), [Store.created_at, Store.id], limit, cursor)
+
+    async def stream_all(self):
+        async for store in _stream_all(self.db, STORE_ROW, STORE_ROW.select(), [Store.created_at, Store.id]):
+            yield store
     
     async def update_by_id(self, store_id: str, update_data: dict) -> Store:
         try:
-            result = await self.db.execute(select(Store).filter(Store.id == store_id))
-            store = result.scalars().first()
-            if not store:
+            store, _ = await STORE_UPDATE.execute(self.db, store_id, update_data, ignore=("store_id",))
+            if store is None:
                 raise ValueError("Store not found")
 
-            for key, value in update_data.items():
-                setattr(store, key, value) #อัพเดท
-
+            await refresh_appointments_of_store(self.db, store.id)
             await self.db.commit()
-            await self.db.refresh(store)
+            catalog_cache.invalidate(stores_key())
             return store
+        except IntegrityError:
+            await self.db.rollback()
+            raise ValueError("Store already exists.")
         except Exception as e:
             await self.db.rollback()
             raise e
         
     async def delete_by_name(self, store_name: str) -> Optional[Store]:
         try:
+            # DELETE ... RETURNING statement เดียว store_business_hours ลบตามด้วย ON DELETE CASCADE
             result = await self.db.execute(
-                select(Store).filter(Store.store_name == store_name)
+                delete(Store.__table__)
+                .where(Store.store_name == store_name)
+                .returning(*Store.__table__.c)
             )
-            store = result.scalars().first()
+            row = result.first()
 
-            if not store:
+            if row is None:
                 return None  # ไม่มีให้ลบ
 
-            await self.db.delete(store)
             await self.db.commit()
+            store = Store(**row._mapping)
+            catalog_cache.invalidate(stores_key(), services_of_store_key(store.id))
 
             return store
+        except IntegrityError:
+            await self.db.rollback()
+            raise ValueError("Store still has services or admins")
+        except Exception as e:
+            await self.db.rollback()
+            raise e
+
+@instrument_repository
+class StoreBusinessHourRepositoryAdapter(StoreBusinessHourRepositoryInterface):
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def find_by_store_id(self, store_id: str) -> List[StoreBusinessHour]:
+        result = await self.db.execute(
+            select(StoreBusinessHour)
+            .where(StoreBusinessHour.store_id == store_id)
+            .order_by(StoreBusinessHour.weekday)
+        )
+        return result.scalars().all()
+
+    async def find_by_weekday(self, store_id: str, weekday: int) -> Optional[StoreBusinessHour]:
+        result = await self.db.execute(
+            select(StoreBusinessHour).filter(
+                and_(
+                    StoreBusinessHour.store_id == store_id,
+                    StoreBusinessHour.weekday == weekday,
+                )
+            )
+        )
+        return result.scalars().first()
+
+    async def replace_all(self, store_id: str, business_hours: List[StoreBusinessHour]) -> List[StoreBusinessHour]:
+        try:
+            await self.db.execute(
+                delete(StoreBusinessHour).where(StoreBusinessHour.store_id == store_id)
+            )
+            self.db.add_all(business_hours)
+            await self.db.commit()
+            return business_hours
         except Exception as e:
             await self.db.rollback()
             raise e
 
+@instrument_repository
 class ServiceRepositoryAdapter(ServiceRepositoryInterface):
     def __init__(self, db: AsyncSession):
         self.db = db
@@ -121,14 +306,18 @@ class ServiceRepositoryAdapter(ServiceRepositoryInterface):
             self.db.add(service)
             await self.db.commit()
             await self.db.refresh(service)
+            catalog_cache.invalidate(services_of_store_key(service.store_id), service_key(service.id))
             return service
         except Exception as e:
             await self.db.rollback()
             raise e
     
-    async def find_by_id(self, service_id: str) -> Service:
-        result = await self.db.execute(select(Service).filter(Service.id == service_id))
-        return result.scalars().first()
+    async def find_by_id(self, service_id: str) -> Optional[dict]:
+        # dict ของ SERVICE_ROW (shape เดียวกับ to_dict) ไม่เจอ = None และไม่ถูก cache
+        return await catalog_cache.get_or_load(
+            service_key(service_id),
+            lambda: _load_row(SERVICE_ROW, SERVICE_ROW.select().where(Service.id == service_id))
+        )
     
     async def find_services_by_booking_id(self, booking_id: str) -> List[Service]:
         stmt = (
@@ -159,45 +348,147 @@ class ServiceRepositoryAdapter(ServiceRepositoryInterface):
             "service_id":service_id
         }
     
-    async def get_all(self, store_id: str) -> List[Service]:
-        result = await self.db.execute(select(Service).where(Service.store_id == store_id))
-        return result.scalars().all()
+    async def get_all(self, store_id: str) -> List[dict]:
+        return await catalog_cache.get_or_load(
+            services_of_store_key(store_id),
+            lambda: _load_rows(SERVICE_ROW, SERVICE_ROW.select().where(Service.store_id == store_id))
+        )
+
+    async def get_page(self, store_id: str, limit: int, cursor: Optional[str] = None) -> tuple:
+        stmt = SERVICE_ROW.select().where(Service.store_id == store_id)
+        return await _keyset_page(self.db, SERVICE_ROW, stmt, [Service.id], limit, cursor)
+
+    async def stream_all(self, store_id: str):
+        stmt = SERVICE_ROW.select().where(Service.store_id == store_id)
+        async for service in _stream_all(self.db, SERVICE_ROW, stmt, [Service.id]):
+            yield service
     
     async def update_by_id(self, service_id: str, update_data: dict) -> Service:
         try:
-            result = await self.db.execute(select(Service).filter(Service.id == service_id))
-            service = result.scalars().first()
-            if not service:
+            service, previous = await SERVICE_UPDATE.execute(self.db, service_id, update_data, ignore=("service_id",))
+            if service is None:
                 raise ValueError("Service not found")
 
-            for key, value in update_data.items():
-                setattr(service, key, value) #อัพเดท
-
+            await refresh_appointments_of_service(self.db, service.id)
             await self.db.commit()
-            await self.db.refresh(service)
+            catalog_cache.invalidate(
+                services_of_store_key(previous["store_id"]),
+                services_of_store_key(service.store_id),
+                service_key(service.id)
+            )
             return service
+        except IntegrityError:
+            await self.db.rollback()
+            raise ValueError("store_id does not exist")
+        except Exception as e:
+            await self.db.rollback()
+            raise e
+
+    async def find_by_ids(self, service_ids: List[str]) -> List[dict]:
+        result = await self.db.execute(SERVICE_ROW.select().where(Service.id == any_(_string_array(service_ids))))
+        return SERVICE_ROW.to_dtos(result.all())
+
+    async def find_services_id_by_titles(self, titles: List[str]) -> dict:
+        # title ละหนึ่ง id (id น้อยสุด ให้ได้ค่าเดิมทุกครั้ง) title ที่ไม่เจอได้ None
+        result = await self.db.execute(
+            select(Service.title, Service.id)
+            .where(Service.title == any_(_string_array(titles)))
+            .distinct(Service.title)
+            .order_by(Service.title, Service.id)
+        )
+        found = dict(result.all())
+        return {title: found.get(title) for title in titles}
+
+    async def save_many(self, services: List[Service]) -> List[Service]:
+        try:
+            # insert-many ครั้งเดียวทั้ง batch store_id ผิดตัวเดียว = rollback ทั้งหมด
+            await self.db.execute(
+                insert(Service.__table__),
+                [{column.key: getattr(service, column.key) for column in Service.__table__.c} for service in services]
+            )
+            await self.db.commit()
+            catalog_cache.invalidate(
+                *{services_of_store_key(service.store_id) for service in services},
+                *(service_key(service.id) for service in services)
+            )
+            return services
+        except IntegrityError:
+            await self.db.rollback()
+            raise ValueError("store_id does not exist")
+        except Exception as e:
+            await self.db.rollback()
+            raise e
+
+    async def update_many(self, update_items: List[dict]) -> List[dict]:
+        # update_items: [{"service_id": ..., <field>: ...}] ทั้งหมดใน transaction เดียว
+        # รายการที่แก้ field ชุดเดียวกันส่งเป็น executemany ครั้งเดียว (ปกติทั้ง batch เป็นชุดเดียว)
+        try:
+            groups = {}
+            for item in update_items:
+                values = SERVICE_UPDATE.values(item, ignore=("service_id",))
+                groups.setdefault(tuple(sorted(values)), []).append({"b_service_id": item["service_id"], **values})
+            service_ids = [item["service_id"] for item in update_items]
+
+            # lock แถวที่จะแก้ และเก็บ store_id เดิมไว้ล้าง cache กรณีย้ายร้าน
+            result = await self.db.execute(
+                select(Service.id, Service.store_id)
+                .where(Service.id == any_(_string_array(service_ids)))
+                .with_for_update()
+            )
+            previous_store_ids = dict(result.all())
+            missing = [service_id for service_id in service_ids if service_id not in previous_store_ids]
+            if missing:
+                raise ValueError(f"Service not found: {', '.join(missing)}")
+
+            table = Service.__table__
+            for rows in groups.values():
+                await self.db.execute(update(table).where(table.c.id == bindparam("b_service_id")), rows)
+
+            await refresh_appointments_of_services(self.db, service_ids)
+            result = await self.db.execute(SERVICE_ROW.select().where(Service.id == any_(_string_array(service_ids))))
+            services = SERVICE_ROW.to_dtos(result.all())
+            await self.db.commit()
+
+            catalog_cache.invalidate(
+                *{services_of_store_key(store_id) for store_id in previous_store_ids.values()},
+                *{services_of_store_key(service["store_id"]) for service in services},
+                *(service_key(service_id) for service_id in service_ids)
+            )
+            return services
+        except IntegrityError:
+            await self.db.rollback()
+            raise ValueError("store_id does not exist")
         except Exception as e:
             await self.db.rollback()
             raise e
         
     async def delete_by_id(self, service_id: str) -> Optional[Service]:
         try:
+            # DELETE ... RETURNING statement เดียว
+            # service ที่ยังอยู่ใน booking ลบไม่ได้ (FK ของ bookings_services) read model จึงไม่มีอะไรต้อง refresh
             result = await self.db.execute(
-                select(Service).filter(Service.id == service_id)
+                delete(Service.__table__)
+                .where(Service.id == service_id)
+                .returning(*Service.__table__.c)
             )
-            service = result.scalars().first()
+            row = result.first()
 
-            if not service:
+            if row is None:
                 return None  # ไม่มีให้ลบ
 
-            await self.db.delete(service)
             await self.db.commit()
+            service = Service(**row._mapping)
+            catalog_cache.invalidate(services_of_store_key(service.store_id), service_key(service.id))
 
             return service
+        except IntegrityError:
+            await self.db.rollback()
+            raise ValueError("Service is used by bookings")
         except Exception as e:
             await self.db.rollback()
             raise e
         
+@instrument_repository
 class PaymentRepositoryAdapter(PaymentRepositoryInterface):
     def __init__(self, db: AsyncSession):
         self.db = db
@@ -216,43 +507,127 @@ class PaymentRepositoryAdapter(PaymentRepositoryInterface):
         result = await self.db.execute(select(Payment).filter(Payment.id == payment_id))
         return result.scalars().first()
     
-    async def get_all(self) -> List[Payment]:
-        result = await self.db.execute(select(Payment))
-        return result.scalars().all()
+    async def get_all(self) -> List[dict]:
+        result = await self.db.execute(PAYMENT_ROW.select())
+        return PAYMENT_ROW.to_dtos(result.all())
+
+    async def get_page(self, limit: int, cursor: Optional[str] = None) -> tuple:
+        return await _keyset_page(self.db, PAYMENT_ROW, PAYMENT_ROW.select(), [Payment.created_at, Payment.id], limit, cursor)
+
+    async def stream_all(self):
+        async for payment in _stream_all(self.db, PAYMENT_ROW, PAYMENT_ROW.select(), [Payment.created_at, Payment.id]):
+            yield payment
     
     async def update_status_by_id(self, payment_id: str, update_data: dict) -> Payment:
+        # เช็คหมดอายุกับเขียน status อยู่ใน UPDATE เดียวกัน payment ที่หมดอายุแล้วจะไม่ถูกแก้ (ไม่มี race กับ sweeper)
         try:
-            result = await self.db.execute(select(Payment).filter(Payment.id == payment_id))
-            payment = result.scalars().first()
-            if not payment:
-                raise ValueError("Payment not found")
-
-            for key, value in update_data.items():
-                setattr(payment, key, value) #อัพเดท
+            payment, previous = await PAYMENT_STATUS_UPDATE.execute(
+                self.db, payment_id, update_data, conditions=(_payment_not_expired(datetime.now()),)
+            )
+            if payment is None:
+                # ไม่มีแถวถูกแก้ SELECT เฉพาะกรณีนี้เพื่อบอกว่าไม่มี payment หรือหมดอายุแล้ว
+                exists = await self.db.scalar(select(Payment.id).where(Payment.id == payment_id))
+                raise ValueError("Payment has expired and cannot be processed." if exists else "Payment not found")
 
             await self.db.commit()
-            await self.db.refresh(payment)
+
+            # รายได้ของร้านเปลี่ยน ล้าง stats ที่ cache ไว้ของร้านนั้น
+            if previous["payment_status"] == "Paid" or payment.payment_status == "Paid":
+                invalidate_store_stats(await self._find_store_ids(payment.booking_id))
             return payment
         except Exception as e:
             await self.db.rollback()
             raise e
         
+    async def _find_store_ids(self, booking_id: str) -> List[str]:
+        result = await self.db.execute(
+            select(Service.store_id)
+            .join(BookingService, BookingService.service_id == Service.id)
+            .where(BookingService.booking_id == booking_id)
+            .distinct()
+        )
+        return result.scalars().all()
+
     async def is_expired(self, payment_id: str) -> bool:
         try:
-            result = await self.db.execute(select(Payment).filter(Payment.id == payment_id))
-            payment = result.scalars().first()
+            result = await self.db.execute(
+                select(Payment.payment_status, Payment.expires_at, Payment.created_at)
+                .filter(Payment.id == payment_id)
+            )
+            payment = result.first()
             if not payment:
                 raise ValueError("Payment not found")
-            
-            now = datetime.now()
-            # created_at = datetime.fromisoformat(payment.created_at)
 
-            return now >= payment.created_at + timedelta(minutes=2.00)
+            payment_status, expires_at, created_at = payment
+            if payment_status == "Expired":
+                return True
+            if payment_status != "Pending":
+                return False
+
+            # payment เก่าที่ยังไม่มี expires_at ใช้ created_at + ค่า default แทน
+            deadline = expires_at or created_at + timedelta(minutes=PAYMENT_EXPIRY_MINUTES)
+            return datetime.now() >= deadline
 
         except Exception as e:
             await self.db.rollback()
             raise e
 
+    async def find_expiry_minutes_by_booking_id(self, booking_id: str) -> float:
+        result = await self.db.execute(
+            select(Store.payment_expiry_minutes)
+            .join(Service, Service.store_id == Store.id)
+            .join(BookingService, BookingService.service_id == Service.id)
+            .where(BookingService.booking_id == booking_id)
+            .limit(1)
+        )
+        expiry_minutes = result.scalars().first()
+        return expiry_minutes if expiry_minutes is not None else PAYMENT_EXPIRY_MINUTES
+
+    async def find_pending_deadlines(self) -> list:
+        result = await self.db.execute(
+            select(Payment.id, Payment.expires_at)
+            .where(
+                and_(
+                    Payment.payment_status == "Pending",
+                    Payment.expires_at.is_not(None)
+                )
+            )
+        )
+        return result.all()
+
+    async def expire_due(self, now: datetime, batch_size: int) -> int:
+        # UPDATE ทีละ batch และ SKIP LOCKED เพื่อไม่ไปรอ row ที่ request อื่นกำลังแก้อยู่
+        try:
+            due_ids = (
+                select(Payment.id)
+                .where(
+                    and_(
+                        Payment.payment_status == "Pending",
+                        or_(
+                            Payment.expires_at <= now,
+                            and_(
+                                Payment.expires_at.is_(None),
+                                Payment.created_at <= now - timedelta(minutes=PAYMENT_EXPIRY_MINUTES)
+                            )
+                        )
+                    )
+                )
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            result = await self.db.execute(
+                update(Payment)
+                .where(Payment.id.in_(due_ids))
+                .values(payment_status="Expired")
+                .execution_options(synchronize_session=False)
+            )
+            await self.db.commit()
+            return result.rowcount
+        except Exception as e:
+            await self.db.rollback()
+            raise e
+
+@instrument_repository
 class UserRepositoryAdapter(UserRepositoryInterface):
     def __init__(self, db: AsyncSession):
         self.db = db
@@ -271,11 +646,19 @@ class UserRepositoryAdapter(UserRepositoryInterface):
         result = await self.db.execute(select(User).filter(User.id == user_id))
         return result.scalars().first()
     
-    async def get_all(self) -> List[User]:
-        result = await self.db.execute(select(User))
-        return result.scalars().all()
+    async def get_all(self) -> List[dict]:
+        result = await self.db.execute(USER_ROW.select())
+        return USER_ROW.to_dtos(result.all())
+
+    async def get_page(self, limit: int, cursor: Optional[str] = None) -> tuple:
+        return await _keyset_page(self.db, USER_ROW, USER_ROW.select(), [User.id], limit, cursor)
+
+    async def stream_all(self):
+        async for user in _stream_all(self.db, USER_ROW, USER_ROW.select(), [User.id]):
+            yield user
     
 
+@instrument_repository
 class BookingRepositoryAdapter(BookingRepositoryInterface):
     def __init__(self, db: AsyncSession):
         self.db = db
@@ -289,6 +672,46 @@ class BookingRepositoryAdapter(BookingRepositoryInterface):
         except Exception as e:
             await self.db.rollback()
             raise e
+
+    async def save_with_services(self, booking: Booking, service_ids: List[str]) -> Optional[Booking]:
+        # booking + bookings_services ทั้งหมดใน transaction เดียว commit ครั้งเดียว
+        # INSERT ... SELECT จาก users: เช็ค user กับ insert booking ใน statement เดียว
+        # ไม่มี user ตาม user_id = ไม่ได้แถวกลับมา คืน None (สัญญาเดิมของ create_booking)
+        # service_id ผิด FK ของ bookings_services จะ reject เอง
+        try:
+            result = await self.db.execute(
+                insert(Booking)
+                .from_select(
+                    ["id", "booking_time", "status", "note", "user_id"],
+                    select(
+                        literal(booking.id, Booking.id.type),
+                        literal(booking.booking_time, Booking.booking_time.type),
+                        literal(booking.status, Booking.status.type),
+                        literal(booking.note, Booking.note.type),
+                        User.id
+                    ).where(User.id == booking.user_id)
+                )
+                .returning(Booking)
+            )
+            saved_booking = result.scalars().first()
+            if saved_booking is None:
+                await self.db.rollback()
+                return None
+
+            await self.db.execute(
+                insert(BookingService),
+                [{"booking_id": booking.id, "service_id": service_id} for service_id in service_ids]
+            )
+            await refresh_appointments_of_bookings(self.db, [booking.id])
+
+            await self.db.commit()
+            return saved_booking
+        except IntegrityError:
+            await self.db.rollback()
+            raise ValueError("user_id or service_id does not exist")
+        except Exception as e:
+            await self.db.rollback()
+            raise e
     
     async def find_by_id(self, booking_id: str) -> Booking:
         result = await self.db.execute(select(Booking).filter(Booking.id == booking_id))
@@ -313,45 +736,156 @@ class BookingRepositoryAdapter(BookingRepositoryInterface):
         )
         return result.scalars().unique().all()
     
-    async def get_all(self, user_id: str) -> List[Booking]:
-        result = await self.db.execute(select(Booking).where(Booking.user_id == user_id))
+    async def find_appointments_by_store_id(
+            self,
+            store_id: str,
+            start: Optional[datetime] = None,
+            end: Optional[datetime] = None
+        ) -> List[StoreAppointment]:
+        # อ่านจาก read model: index range scan บน (store_id, booking_time) query เดียว
+        stmt = select(StoreAppointment).where(StoreAppointment.store_id == store_id)
+        if start is not None:
+            stmt = stmt.where(StoreAppointment.booking_time >= start)
+        if end is not None:
+            stmt = stmt.where(StoreAppointment.booking_time < end)
+
+        result = await self.db.execute(stmt.order_by(StoreAppointment.booking_time))
         return result.scalars().all()
+
+    async def get_all(self, user_id: str) -> List[dict]:
+        result = await self.db.execute(BOOKING_ROW.select().where(Booking.user_id == user_id))
+        return BOOKING_ROW.to_dtos(result.all())
+
+    async def get_page(self, user_id: str, limit: int, cursor: Optional[str] = None) -> tuple:
+        stmt = BOOKING_ROW.select().where(Booking.user_id == user_id)
+        return await _keyset_page(self.db, BOOKING_ROW, stmt, [Booking.created_at, Booking.id], limit, cursor)
+
+    async def stream_all(self, user_id: str):
+        stmt = BOOKING_ROW.select().where(Booking.user_id == user_id)
+        async for booking in _stream_all(self.db, BOOKING_ROW, stmt, [Booking.created_at, Booking.id]):
+            yield booking
+
+    async def find_intervals_by_store_id(self, store_id: str) -> list:
+        # (booking_id, booking_time, รวม duration ของทุก service ในร้านนี้, status)
+        result = await self.db.execute(
+            select(
+                Booking.id,
+                Booking.booking_time,
+                func.sum(Service.duration_minutes),
+                Booking.status
+            )
+            .join(BookingService, Booking.id == BookingService.booking_id)
+            .join(Service, BookingService.service_id == Service.id)
+            .where(Service.store_id == store_id)
+            .group_by(Booking.id, Booking.booking_time, Booking.status)
+        )
+        return result.all()
+
+    async def find_intervals_by_id(self, booking_id: str) -> list:
+        # (store_id, booking_time, รวม duration, status) แยกตามร้าน
+        result = await self.db.execute(
+            select(
+                Service.store_id,
+                Booking.booking_time,
+                func.sum(Service.duration_minutes),
+                Booking.status
+            )
+            .join(BookingService, Booking.id == BookingService.booking_id)
+            .join(Service, BookingService.service_id == Service.id)
+            .where(Booking.id == booking_id)
+            .group_by(Service.store_id, Booking.booking_time, Booking.status)
+        )
+        return result.all()
+
+    async def find_intervals_by_ids(self, booking_ids: List[str]) -> list:
+        # เหมือน find_intervals_by_id แต่หลาย booking ใน query เดียว มี booking_id นำหน้า
+        result = await self.db.execute(
+            select(
+                Booking.id,
+                Service.store_id,
+                Booking.booking_time,
+                func.sum(Service.duration_minutes),
+                Booking.status
+            )
+            .join(BookingService, Booking.id == BookingService.booking_id)
+            .join(Service, BookingService.service_id == Service.id)
+            .where(Booking.id == any_(_string_array(booking_ids)))
+            .group_by(Booking.id, Service.store_id, Booking.booking_time, Booking.status)
+        )
+        return result.all()
     
     async def update_by_id(self, booking_id: str, update_data: dict) -> Booking:
         try:
-            result = await self.db.execute(select(Booking).filter(Booking.id == booking_id))
-            booking = result.scalars().first()
-            if not booking:
+            booking, _ = await BOOKING_UPDATE.execute(self.db, booking_id, update_data, ignore=("booking_id",))
+            if booking is None:
                 raise ValueError("Booking not found")
 
-            for key, value in update_data.items():
-                setattr(booking, key, value) #อัพเดท
-
+            await refresh_appointments_of_bookings(self.db, [booking.id])
             await self.db.commit()
-            await self.db.refresh(booking)
             return booking
+        except IntegrityError:
+            await self.db.rollback()
+            raise ValueError("user_id does not exist")
+        except Exception as e:
+            await self.db.rollback()
+            raise e
+
+    async def update_status_by_ids(self, statuses: dict) -> List[dict]:
+        # statuses: {booking_id: status} executemany ครั้งเดียว + refresh read model ใน transaction เดียว
+        booking_ids = list(statuses)
+        try:
+            table = Booking.__table__
+            await self.db.execute(
+                update(table).where(table.c.id == bindparam("b_booking_id")),
+                [{"b_booking_id": booking_id, "status": status} for booking_id, status in statuses.items()]
+            )
+
+            result = await self.db.execute(BOOKING_ROW.select().where(Booking.id == any_(_string_array(booking_ids))))
+            bookings = BOOKING_ROW.to_dtos(result.all())
+            if len(bookings) != len(booking_ids):
+                found = {booking["id"] for booking in bookings}
+                missing = [booking_id for booking_id in booking_ids if booking_id not in found]
+                raise ValueError(f"Booking not found: {', '.join(missing)}")
+
+            await refresh_appointments_of_bookings(self.db, booking_ids)
+            await self.db.commit()
+            return bookings
         except Exception as e:
             await self.db.rollback()
             raise e
         
     async def delete_by_id(self, booking_id: str) -> Optional[Booking]:
+        bookings = await self.delete_by_ids([booking_id])
+        return bookings[0] if bookings else None  # ไม่มีให้ลบ = None
+
+    async def delete_by_ids(self, booking_ids: List[str]) -> List[Booking]:
         try:
+            # DELETE ... RETURNING statement เดียว bookings_services ลบตามด้วย ON DELETE CASCADE
             result = await self.db.execute(
-                select(Booking).filter(Booking.id == booking_id)
+                delete(Booking.__table__)
+                .where(Booking.id.in_(booking_ids))
+                .returning(*Booking.__table__.c)
             )
-            booking = result.scalars().first()
+            bookings = [Booking(**row._mapping) for row in result]
 
-            if not booking:
-                return None  # ไม่มีให้ลบ
+            if not bookings:
+                return []
 
-            await self.db.delete(booking)
+            # read model ไม่มี FK ลบใน transaction เดียวกัน
+            await self.db.execute(
+                delete(StoreAppointment).where(StoreAppointment.booking_id.in_([booking.id for booking in bookings]))
+            )
             await self.db.commit()
 
-            return booking
+            return bookings
+        except IntegrityError:
+            await self.db.rollback()
+            raise ValueError("Booking has payments and cannot be deleted")
         except Exception as e:
             await self.db.rollback()
             raise e
 
+@instrument_repository
 class BookingServiceRepositoryAdapter(BookingServiceRepositoryInterface):
     def __init__(self, db: AsyncSession):
         self.db = db
@@ -359,6 +893,8 @@ class BookingServiceRepositoryAdapter(BookingServiceRepositoryInterface):
     async def save(self, booking_service: BookingService) -> BookingService:
         try:
             self.db.add(booking_service)
+            await self.db.flush()
+            await refresh_appointments_of_bookings(self.db, [booking_service.booking_id])
             await self.db.commit()
             await self.db.refresh(booking_service)
             return booking_service
@@ -385,6 +921,7 @@ class BookingServiceRepositoryAdapter(BookingServiceRepositoryInterface):
             await self.db.execute(
                 delete(BookingService).where(BookingService.booking_id == booking_id)
             )
+            await refresh_appointments_of_bookings(self.db, [booking_id])
             await self.db.commit()
         except Exception as e:
             await self.db.rollback()
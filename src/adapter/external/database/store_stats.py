@@ -0,0 +1,111 @@
+from sqlalchemy import and_, func, select
+from datetime import datetime
+import os
+
+from adapter.external.database.postgres import AsyncSessionLocal
+from adapter.external.metrics import instrument_repository
+from domain.interfaces.database import StoreStatsRepositoryInterface
+from domain.model_entities.database import (
+    Booking,
+    BookingService,
+    Payment,
+    Service,
+    StoreBusinessHour
+)
+from utils.async_cache import AsyncTTLCache
+
+STORE_STATS_CACHE_SIZE = int(os.getenv('STORE_STATS_CACHE_SIZE', '512'))
+STORE_STATS_CACHE_TTL_SECONDS = float(os.getenv('STORE_STATS_CACHE_TTL_SECONDS', '60'))
+POPULAR_SERVICES_LIMIT = 10
+
+# key = (store_id, start, end, inactive_statuses)
+store_stats_cache = AsyncTTLCache(maxsize=STORE_STATS_CACHE_SIZE, ttl=STORE_STATS_CACHE_TTL_SECONDS)
+
+def invalidate_store_stats(store_ids):
+    store_ids = set(store_ids)
+    store_stats_cache.invalidate_where(lambda key: key[0] in store_ids)
+
+
+@instrument_repository
+class StoreStatsRepositoryAdapter(StoreStatsRepositoryInterface):
+    # aggregate ทั้งหมดคำนวณใน Postgres ส่งกลับมาแค่แถวที่ group แล้ว
+    # ผลลัพธ์ cache ต่อ (ร้าน, ช่วงวัน) โหลดด้วย session ของตัวเองเหมือน catalog_cache
+    def __init__(self, session_factory=AsyncSessionLocal, cache: AsyncTTLCache = store_stats_cache):
+        self.session_factory = session_factory
+        self.cache = cache
+
+    async def get_stats(self, store_id: str, start: datetime, end: datetime, inactive_statuses: set) -> dict:
+        inactive_statuses = tuple(sorted(inactive_statuses))
+        return await self.cache.get_or_load(
+            (store_id, start, end, inactive_statuses),
+            lambda: self._load(store_id, start, end, inactive_statuses)
+        )
+
+    async def _load(self, store_id: str, start: datetime, end: datetime, inactive_statuses: tuple) -> dict:
+        # booking ที่มี service ของร้านนี้อย่างน้อยหนึ่งตัว
+        store_bookings = (
+            select(BookingService.booking_id)
+            .join(Service, Service.id == BookingService.service_id)
+            .where(Service.store_id == store_id)
+        )
+        in_range = and_(Booking.booking_time >= start, Booking.booking_time < end)
+
+        paid_at = func.coalesce(Payment.paid_at, Payment.created_at)
+        paid_day = func.date(paid_at)
+        revenue = (
+            select(paid_day, func.sum(Payment.amount), func.count(Payment.id))
+            .where(
+                Payment.payment_status == "Paid",
+                Payment.booking_id.in_(store_bookings),
+                paid_at >= start,
+                paid_at < end
+            )
+            .group_by(paid_day)
+            .order_by(paid_day)
+        )
+
+        per_status = (
+            select(Booking.status, func.count(Booking.id))
+            .where(Booking.id.in_(store_bookings), in_range)
+            .group_by(Booking.status)
+        )
+
+        booking_count = func.count(BookingService.booking_id)
+        popular = (
+            select(Service.id, Service.title, booking_count, func.sum(Service.prices))
+            .join(BookingService, BookingService.service_id == Service.id)
+            .join(Booking, Booking.id == BookingService.booking_id)
+            .where(Service.store_id == store_id, in_range, Booking.status.not_in(inactive_statuses))
+            .group_by(Service.id, Service.title)
+            .order_by(booking_count.desc(), Service.title)
+            .limit(POPULAR_SERVICES_LIMIT)
+        )
+
+        booking_day = func.date(Booking.booking_time)
+        booked_minutes = (
+            select(booking_day, func.sum(Service.duration_minutes))
+            .select_from(Booking)
+            .join(BookingService, BookingService.booking_id == Booking.id)
+            .join(Service, Service.id == BookingService.service_id)
+            .where(Service.store_id == store_id, in_range, Booking.status.not_in(inactive_statuses))
+            .group_by(booking_day)
+        )
+
+        business_hours = (
+            select(
+                StoreBusinessHour.weekday,
+                StoreBusinessHour.open_time,
+                StoreBusinessHour.close_time,
+                StoreBusinessHour.is_closed
+            )
+            .where(StoreBusinessHour.store_id == store_id)
+        )
+
+        async with self.session_factory() as db:
+            return {
+                "revenue_per_day": [tuple(row) for row in (await db.execute(revenue)).all()],
+                "bookings_per_status": [tuple(row) for row in (await db.execute(per_status)).all()],
+                "popular_services": [tuple(row) for row in (await db.execute(popular)).all()],
+                "booked_minutes_per_day": [tuple(row) for row in (await db.execute(booked_minutes)).all()],
+                "business_hours": [tuple(row) for row in (await db.execute(business_hours)).all()]
+            }
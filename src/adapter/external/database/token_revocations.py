@@ -0,0 +1,35 @@
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+import time
+
+from adapter.external.database.postgres import AsyncSessionLocal
+from adapter.external.metrics import instrument_repository
+from domain.interfaces.database import RevokedTokenRepositoryInterface
+from domain.model_entities.database import RevokedToken
+
+
+@instrument_repository
+class RevokedTokenRepositoryAdapter(RevokedTokenRepositoryInterface):
+    # ใช้จาก TokenVerifier ซึ่งไม่มี session ของ request เลยเปิด session เอง
+    # อ่านจาก primary เสมอ ไม่ให้ replica lag มาทำให้ logout มีผลช้ากว่า refresh interval
+    def __init__(self, session_factory=AsyncSessionLocal):
+        self.session_factory = session_factory
+
+    async def revoke(self, jti: str, exp: int):
+        async with self.session_factory() as db:
+            await db.execute(
+                insert(RevokedToken)
+                .values(jti=jti, exp=int(exp))
+                .on_conflict_do_nothing(index_elements=[RevokedToken.jti])
+            )
+            # token ที่หมดอายุเองแล้วไม่ต้องจำ (logout เกิดไม่บ่อย ล้างไปพร้อมกันได้)
+            await db.execute(delete(RevokedToken).where(RevokedToken.exp < int(time.time())))
+            await db.commit()
+
+    async def find_active(self, now: int) -> dict:
+        # jti -> exp ของ token ที่ revoke แล้วแต่ยังไม่หมดอายุ (ตารางเล็ก: มีแค่ token ที่ logout)
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(RevokedToken.jti, RevokedToken.exp).where(RevokedToken.exp > int(now))
+            )
+            return {jti: exp for jti, exp in result.all()}
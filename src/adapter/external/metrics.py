@@ -0,0 +1,87 @@
+from contextvars import ContextVar
+from functools import wraps
+import inspect
+
+from utils.metrics import MetricsRegistry
+
+registry = MetricsRegistry()
+
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ("method", "route", "status")
+)
+db_statement_duration = registry.histogram(
+    "db_statement_duration_seconds",
+    "SQL statement execution time",
+    ("route", "repository_method", "operation")
+)
+db_statement_errors = registry.counter(
+    "db_statement_errors_total",
+    "SQL statements that raised an error",
+    ("route", "repository_method", "operation")
+)
+db_pool_checkout_wait = registry.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled connection",
+    ("pool",)
+)
+storage_request_duration = registry.histogram(
+    "storage_request_duration_seconds",
+    "Object storage request time",
+    ("operation", "outcome"),
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+
+# scope ของ request ที่กำลังทำงาน (ตั้งโดย MetricsMiddleware) และ repository method ที่กำลังยิง query
+current_scope: ContextVar = ContextVar("current_scope", default=None)
+current_repository_method: ContextVar = ContextVar("current_repository_method", default="-")
+
+
+def route_label() -> str:
+    # ใช้ route template (/stores/{store_id}/stats) ไม่ใช้ path จริง จะได้ไม่มี label ไม่จำกัด
+    scope = current_scope.get()
+    if scope is None:
+        return "background"
+    route = scope.get("route")
+    return getattr(route, "path", "unmatched")
+
+
+def instrument_repository(cls):
+    # ครอบทุก public async method ของ adapter ให้ query ข้างในติด label ชื่อ method
+    for name, attribute in list(vars(cls).items()):
+        if name.startswith("_"):
+            continue
+        label = f"{cls.__name__}.{name}"
+        if inspect.iscoroutinefunction(attribute):
+            setattr(cls, name, _wrap_coroutine(attribute, label))
+        elif inspect.isasyncgenfunction(attribute):
+            setattr(cls, name, _wrap_async_generator(attribute, label))
+    return cls
+
+
+def _wrap_coroutine(method, label: str):
+    @wraps(method)
+    async def wrapper(*args, **kwargs):
+        token = current_repository_method.set(label)
+        try:
+            return await method(*args, **kwargs)
+        finally:
+            current_repository_method.reset(token)
+    return wrapper
+
+
+def _wrap_async_generator(method, label: str):
+    @wraps(method)
+    async def wrapper(*args, **kwargs):
+        token = current_repository_method.set(label)
+        try:
+            async for item in method(*args, **kwargs):
+                yield item
+        finally:
+            try:
+                current_repository_method.reset(token)
+            except ValueError:
+                # generator ถูกปิดจาก context อื่น (เช่น client ตัด stream) ไม่ต้อง reset
+                pass
+    return wrapper
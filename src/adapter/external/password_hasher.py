@@ -0,0 +1,27 @@
+from domain.interfaces.password_hasher import PasswordHasherInterface
+from passlib.context import CryptContext
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import os
+
+# bcrypt ใช้ CPU ~250ms ต่อครั้ง จำกัดจำนวน thread ไว้ไม่ให้แย่ง CPU กับ request อื่นทั้งหมด
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', '2'))
+
+class PasswordHasherAdapter(PasswordHasherInterface):
+    def __init__(self, max_workers: int = PASSWORD_HASH_WORKERS):
+        # สร้าง CryptContext ครั้งเดียวใช้ทั้งแอป
+        self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+
+    async def hash(self, password: str) -> str:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.pwd_context.hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.pwd_context.verify, password, hashed_password)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+password_hasher = PasswordHasherAdapter()
@@ -0,0 +1,96 @@
+from adapter.external.database.postgres import AsyncSessionLocal
+from adapter.external.database.repositories import PaymentRepositoryAdapter
+
+from utils.get_currecnt_date import my_date_now
+
+from datetime import datetime
+import asyncio
+import heapq
+import logging
+import os
+
+PAYMENT_EXPIRY_BATCH_SIZE = int(os.getenv('PAYMENT_EXPIRY_BATCH_SIZE', '500'))
+# worker อื่นก็สร้าง payment ได้ จึงต้อง sweep ตามรอบด้วยแม้ heap ของตัวเองจะว่าง
+PAYMENT_EXPIRY_SWEEP_INTERVAL = float(os.getenv('PAYMENT_EXPIRY_SWEEP_INTERVAL', '30'))
+
+logger = logging.getLogger(__name__)
+
+
+class PaymentExpiryScheduler:
+    def __init__(
+            self,
+            session_factory=AsyncSessionLocal,
+            batch_size: int = PAYMENT_EXPIRY_BATCH_SIZE,
+            sweep_interval: float = PAYMENT_EXPIRY_SWEEP_INTERVAL
+        ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.sweep_interval = sweep_interval
+        self._deadlines = [] # min-heap ของ (expires_at, payment_id)
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+    def schedule(self, payment_id: str, expires_at: datetime):
+        heapq.heappush(self._deadlines, (expires_at, payment_id))
+        # ถ้าเป็นกำหนดที่ใกล้สุด ปลุก loop ให้คำนวณเวลานอนใหม่
+        if self._deadlines[0][1] == payment_id:
+            self._wakeup.set()
+
+    async def start(self):
+        async with self.session_factory() as db:
+            deadlines = await PaymentRepositoryAdapter(db).find_pending_deadlines()
+
+        for payment_id, expires_at in deadlines:
+            heapq.heappush(self._deadlines, (expires_at, payment_id))
+
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def sweep(self, now: datetime) -> int:
+        expired = 0
+        async with self.session_factory() as db:
+            payment_repo = PaymentRepositoryAdapter(db)
+            while True:
+                count = await payment_repo.expire_due(now, self.batch_size)
+                expired += count
+                if count < self.batch_size:
+                    break
+        return expired
+
+    async def _run(self):
+        while True:
+            timeout = self.sweep_interval
+            if self._deadlines:
+                until_next = (self._deadlines[0][0] - my_date_now()).total_seconds()
+                timeout = min(timeout, max(until_next, 0))
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+                self._wakeup.clear()
+                continue
+            except asyncio.TimeoutError:
+                pass
+
+            now = my_date_now()
+            while self._deadlines and self._deadlines[0][0] <= now:
+                heapq.heappop(self._deadlines)
+
+            try:
+                expired = await self.sweep(now)
+                if expired:
+                    logger.info("Expired %d pending payment(s)", expired)
+            except Exception:
+                logger.exception("Payment expiry sweep failed")
+
+
+payment_expiry_scheduler = PaymentExpiryScheduler()
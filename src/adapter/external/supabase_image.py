@@ -1,5 +1,11 @@
 from domain.interfaces.supabase_image import SupabaseInterface
-from supabase import create_client, Client
+from adapter.external.metrics import storage_request_duration
+from urllib.parse import quote
+from time import perf_counter
+import asyncio
+import logging
+import mimetypes
+import httpx
 import os
 
 SUPABASE_URL = os.getenv('SUPABASE_URL')
@@ -7,7 +13,19 @@ SUPABASE_ANON_KEY = os.getenv('SUPABASE_ANON_KEY')
 BUCKET_NAME = os.getenv('BUCKET_NAME')
 STORAGE_PATH = os.getenv('STORAGE_PATH')
 
+# จำนวน upload พร้อมกันสูงสุด (= ขนาด connection pool ไปหา storage)
+STORAGE_MAX_CONCURRENCY = int(os.getenv('STORAGE_MAX_CONCURRENCY', '8'))
+STORAGE_TIMEOUT_SECONDS = float(os.getenv('STORAGE_TIMEOUT_SECONDS', '30'))
+
+logger = logging.getLogger(__name__)
+
 class SupabaseAdapter(SupabaseInterface):
+    # คุยกับ Supabase Storage REST API ตรงๆ ผ่าน httpx.AsyncClient ตัวเดียวทั้งแอป
+    # (keep-alive connection pool) แทนการ create_client ใหม่ทุกครั้ง
+    def __init__(self, max_concurrency: int = STORAGE_MAX_CONCURRENCY):
+        self.max_concurrency = max_concurrency
+        self._client = None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
 
     @classmethod
     async def get_all_env(cls) -> dict:
@@ -18,6 +36,22 @@ class SupabaseAdapter(SupabaseInterface):
             "STORAGE_PATH": STORAGE_PATH
         }
 
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=STORAGE_TIMEOUT_SECONDS,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency
+                )
+            )
+        return self._client
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
     async def upload_image(
         self,
         supabase_url: str,
@@ -27,24 +61,184 @@ class SupabaseAdapter(SupabaseInterface):
         file_data: bytes,
         file_name: str
         ) -> dict:
-        
-        supabase: Client = create_client(supabase_url, supabase_anon_key)
 
+        full_path = storage_path + file_name
+        content_type = mimetypes.guess_type(file_name)[0] or "application/octet-stream"
+
+        async with self._semaphore:
+            started = perf_counter()
+            outcome = "error"
+            try:
+                response = await self._get_client().post(
+                    f"{supabase_url}/storage/v1/object/{bucket_name}/{quote(full_path)}",
+                    content=file_data,
+                    headers={
+                        "Authorization": f"Bearer {supabase_anon_key}",
+                        "apikey": supabase_anon_key,
+                        "Content-Type": content_type,
+                        "x-upsert": "true"
+                    }
+                )
+                response.raise_for_status()
+                outcome = "ok"
+            except httpx.HTTPError as e:
+                logger.warning("Upload %s failed: %s", full_path, e)
+                raise ValueError(e)
+            finally:
+                storage_request_duration.observe(perf_counter() - started, operation="upload", outcome=outcome)
+
+        logger.debug("Upload successful: %s", full_path)
+        return response.json() # type เป็น dict
+
+    async def upload_stream(
+        self,
+        supabase_url: str,
+        supabase_anon_key: str,
+        bucket_name: str,
+        storage_path: str,
+        chunks,
+        file_name: str,
+        content_type: str,
+        content_length: int = None
+        ) -> dict:
+
+        full_path = storage_path + file_name
+        headers = {
+            "Authorization": f"Bearer {supabase_anon_key}",
+            "apikey": supabase_anon_key,
+            "Content-Type": content_type or "application/octet-stream",
+            "x-upsert": "true"
+        }
+        # รู้ขนาดล่วงหน้าก็ส่ง Content-Length ไป ไม่งั้น httpx จะส่งแบบ chunked
+        if content_length is not None:
+            headers["Content-Length"] = str(content_length)
+
+        async with self._semaphore:
+            started = perf_counter()
+            outcome = "error"
+            try:
+                response = await self._get_client().post(
+                    f"{supabase_url}/storage/v1/object/{bucket_name}/{quote(full_path)}",
+                    content=chunks,
+                    headers=headers
+                )
+                response.raise_for_status()
+                outcome = "ok"
+            except httpx.HTTPError as e:
+                logger.warning("Upload %s failed: %s", full_path, e)
+                raise ValueError(e)
+            finally:
+                storage_request_duration.observe(perf_counter() - started, operation="upload", outcome=outcome)
+
+        return response.json()
+
+    async def object_exists(
+        self,
+        supabase_url: str,
+        supabase_anon_key: str,
+        bucket_name: str,
+        storage_path: str,
+        file_name: str
+        ) -> bool:
+
+        public_url = await self.get_image_url(supabase_url, supabase_anon_key, bucket_name, storage_path, file_name)
+
+        async with self._semaphore:
+            started = perf_counter()
+            outcome = "error"
+            try:
+                response = await self._get_client().head(public_url)
+                outcome = "ok"
+            except httpx.HTTPError as e:
+                # เช็คไม่ได้ก็ถือว่ายังไม่มี แล้ว upload ทับ (upsert) ไป
+                logger.warning("Check object %s failed: %s", file_name, e)
+                return False
+            finally:
+                storage_request_duration.observe(perf_counter() - started, operation="exists", outcome=outcome)
+
+        return response.status_code == 200
+
+    async def move_object(
+        self,
+        supabase_url: str,
+        supabase_anon_key: str,
+        bucket_name: str,
+        storage_path: str,
+        source_name: str,
+        file_name: str
+        ) -> bool:
+
+        # False = ปลายทางมีไฟล์อยู่แล้วเท่านั้น error อื่น (403 RLS / 404 ไม่มีต้นทาง / 5xx) raise
+        async with self._semaphore:
+            started = perf_counter()
+            outcome = "error"
+            try:
+                response = await self._get_client().post(
+                    f"{supabase_url}/storage/v1/object/move",
+                    json={
+                        "bucketId": bucket_name,
+                        "sourceKey": storage_path + source_name,
+                        "destinationKey": storage_path + file_name
+                    },
+                    headers={
+                        "Authorization": f"Bearer {supabase_anon_key}",
+                        "apikey": supabase_anon_key
+                    }
+                )
+                outcome = "ok"
+            except httpx.HTTPError as e:
+                logger.warning("Move %s failed: %s", source_name, e)
+                raise ValueError(e)
+            finally:
+                storage_request_duration.observe(perf_counter() - started, operation="move", outcome=outcome)
+
+        if response.is_success:
+            return True
+        if self._is_duplicate(response):
+            return False
+        logger.warning("Move %s failed: %s %s", source_name, response.status_code, response.text)
+        raise ValueError(f"Move {source_name} failed: {response.status_code}")
+
+    @staticmethod
+    def _is_duplicate(response: httpx.Response) -> bool:
+        # storage API บางเวอร์ชันตอบ 409 ตรงๆ บางเวอร์ชันตอบ 400 พร้อม body statusCode "409" / error "Duplicate"
+        if response.status_code == 409:
+            return True
         try:
-            full_path = storage_path + file_name
+            body = response.json()
+        except ValueError:
+            return False
+        return isinstance(body, dict) and (str(body.get("statusCode")) == "409" or body.get("error") == "Duplicate")
 
-            response = supabase.storage.from_(bucket_name).upload(
-                full_path,
-                file_data,
-                {"upsert": "true"}
-            )
-            print(f"Upload successful: {response}")
-            return response # type เป็น dict
-        except Exception as e:
-            print(f"Upload failed: {e}")
-            raise ValueError(e)
+    async def delete_object(
+        self,
+        supabase_url: str,
+        supabase_anon_key: str,
+        bucket_name: str,
+        storage_path: str,
+        file_name: str
+        ):
+
+        full_path = storage_path + file_name
 
-        
+        async with self._semaphore:
+            started = perf_counter()
+            outcome = "error"
+            try:
+                response = await self._get_client().delete(
+                    f"{supabase_url}/storage/v1/object/{bucket_name}/{quote(full_path)}",
+                    headers={
+                        "Authorization": f"Bearer {supabase_anon_key}",
+                        "apikey": supabase_anon_key
+                    }
+                )
+                response.raise_for_status()
+                outcome = "ok"
+            except httpx.HTTPError as e:
+                # ไฟล์ชั่วคราวค้างได้ ไม่ทำให้ payment ล้มเหลว
+                logger.warning("Delete %s failed: %s", full_path, e)
+            finally:
+                storage_request_duration.observe(perf_counter() - started, operation="delete", outcome=outcome)
 
     async def get_image_url(
         self,
@@ -55,11 +249,8 @@ class SupabaseAdapter(SupabaseInterface):
         file_name: str
         ) -> str:
 
-        supabase: Client = create_client(supabase_url, supabase_anon_key)
-
+        # bucket เป็น public อยู่แล้ว URL คำนวณเองได้ ไม่ต้องเรียก API
         full_path = storage_path + file_name
-        print("ของ url", full_path)
-
-        public_url = supabase.storage.from_(bucket_name).get_public_url(full_path)
+        return f"{supabase_url}/storage/v1/object/public/{bucket_name}/{quote(full_path)}"
 
-        return public_url
\ No newline at end of file
+supabase_adapter = SupabaseAdapter()
@@ -8,9 +8,13 @@ from fastapi import APIRouter, Depends, HTTPException, Request
 # from app.infrastructure.image_enhance import ImageEnhanceAdapter
 # from app.infrastructure.legal_api import LegalAdapter
 
-from adapter.external.database.postgres import get_db
+from adapter.external.database.postgres import get_db, replica_router
 from adapter.external.database.repositories import AdminRepositoryAdapter, StoreRepositoryAdapter
+from adapter.external.database.catalog_cache import catalog_cache
+from adapter.external.database.store_stats import store_stats_cache
 from adapter.external.auth import AuthAdapter
+from adapter.external.password_hasher import password_hasher
+from adapter.presentation.auth_dependency import optional_admin, require_admin, token_verifier
 
 from application.admin_service.register import RegisterService
 # from app.domain.database.models import User, Command
@@ -29,7 +33,7 @@ async def hello():
     return {"message":"Welcome to Botnoi x Bolt"}
 
 @admin_router.post("/admins/register")
-async def create_admin(request: Request, db=Depends(get_db)):
+async def create_admin(request: Request, db=Depends(get_db), caller: dict = Depends(optional_admin)):
     try:
         data = await request.json()
         # id = data.get("id") #uuid ถูกทำทีหลังใน business logic
@@ -41,9 +45,11 @@ async def create_admin(request: Request, db=Depends(get_db)):
         admin_repo = AdminRepositoryAdapter(db)
         store_repo = StoreRepositoryAdapter(db)
 
-        service = RegisterService(admin_repo, store_repo)
+        service = RegisterService(admin_repo, store_repo, password_hasher)
         
-        return await service.create_admin(email, admin_name, admin_password, store_id)
+        return await service.create_admin(email, admin_name, admin_password, store_id, caller)
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     
@@ -59,7 +65,7 @@ async def admin_login(request: Request, db=Depends(get_db)):
 
     repo = AdminRepositoryAdapter(db)
     auth_adapter_instance = AuthAdapter()
-    auth_service = LoginService(repo, jwt_secret=auth_adapter_instance)
+    auth_service = LoginService(repo, jwt_secret=auth_adapter_instance, password_hasher=password_hasher)
 
     token, store_id = await auth_service.login(admin_name, admin_password)
     print("token",token,"store_id",store_id)
@@ -70,4 +76,23 @@ async def admin_login(request: Request, db=Depends(get_db)):
         "access_token": token,
         "token_type": "bearer",
         "store_id": store_id
-    }
\ No newline at end of file
+    }
+
+@admin_router.post("/admins/logout")
+async def admin_logout(claims: dict = Depends(require_admin)):
+    try:
+        await token_verifier.revoke(claims)
+        return {"message": "logged out"}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@admin_router.get("/cache/stats", dependencies=[Depends(require_admin)])
+async def get_cache_stats():
+    return {
+        "catalog": catalog_cache.stats(),
+        "store_stats": store_stats_cache.stats()
+    }
+
+@admin_router.get("/database/pools", dependencies=[Depends(require_admin)])
+async def get_database_pools():
+    return replica_router.pool_metrics()
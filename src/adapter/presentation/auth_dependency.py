@@ -0,0 +1,40 @@
+from typing import Optional
+
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+
+from adapter.external.auth import AuthAdapter
+from adapter.external.database.token_revocations import RevokedTokenRepositoryAdapter
+
+from application.admin_service.token_verifier import TokenVerifier
+
+# ใช้ตัวเดียวทั้ง worker เพื่อให้ cache ของ token ที่ verify แล้วถูกใช้ซ้ำ
+token_verifier = TokenVerifier(AuthAdapter(), RevokedTokenRepositoryAdapter())
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+async def _verify(credentials: HTTPAuthorizationCredentials) -> dict:
+    try:
+        return await token_verifier.verify_active(credentials.credentials)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=401,
+            detail=str(e),
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+async def require_admin(credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme)) -> dict:
+    if credentials is None:
+        raise HTTPException(
+            status_code=401,
+            detail="ต้องเข้าสู่ระบบก่อน",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+    return await _verify(credentials)
+
+async def optional_admin(credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme)) -> Optional[dict]:
+    # endpoint ที่เปิดให้คนยังไม่ login ใช้ได้บางกรณี: ไม่ส่ง token = None แต่ส่ง token เสียมา = 401
+    if credentials is None:
+        return None
+    return await _verify(credentials)
@@ -0,0 +1,78 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+
+
+from adapter.external.database.postgres import get_db
+from adapter.external.database.repositories import (
+    BookingRepositoryAdapter,
+    StoreBusinessHourRepositoryAdapter,
+    ServiceRepositoryAdapter
+)
+
+from application.availability_service.availability import AvailabilityService
+from adapter.presentation.auth_dependency import require_admin
+
+
+availability_router = APIRouter()
+
+@availability_router.get("/availability")
+async def get_availability(request: Request, db=Depends(get_db)):
+    try:
+        query_params = dict(request.query_params)
+        store_id = query_params.get("store_id")
+        day = query_params.get("date")
+        service_id = query_params.get("service_id")
+        slot_minutes = query_params.get("slot_minutes")
+
+        if slot_minutes is not None and not slot_minutes.isdigit():
+            raise HTTPException(status_code=400, detail="slot_minutes ต้องเป็นตัวเลข")
+
+        booking_repo = BookingRepositoryAdapter(db)
+        business_hour_repo = StoreBusinessHourRepositoryAdapter(db)
+        service_repo = ServiceRepositoryAdapter(db)
+
+        service = AvailabilityService(booking_repo, business_hour_repo, service_repo)
+
+        return await service.get_available_slots(store_id, day, service_id, slot_minutes)
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@availability_router.get("/stores/business-hours")
+async def get_business_hours(request: Request, db=Depends(get_db)):
+    try:
+        query_params = dict(request.query_params)
+        store_id = query_params.get("store_id")
+
+        booking_repo = BookingRepositoryAdapter(db)
+        business_hour_repo = StoreBusinessHourRepositoryAdapter(db)
+        service_repo = ServiceRepositoryAdapter(db)
+
+        service = AvailabilityService(booking_repo, business_hour_repo, service_repo)
+
+        return await service.get_business_hours(store_id)
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@availability_router.put("/stores/business-hours/edit", dependencies=[Depends(require_admin)])
+async def edit_business_hours(request: Request, db=Depends(get_db)):
+    try:
+        data = await request.json()
+        store_id = data.get("store_id")
+        business_hours = data.get("business_hours")
+
+        if not store_id:
+            raise HTTPException(status_code=400, detail="ต้องระบุ store_id")
+        if not isinstance(business_hours, list):
+            raise HTTPException(status_code=400, detail="business_hours ต้องเป็น list")
+
+        booking_repo = BookingRepositoryAdapter(db)
+        business_hour_repo = StoreBusinessHourRepositoryAdapter(db)
+        service_repo = ServiceRepositoryAdapter(db)
+
+        service = AvailabilityService(booking_repo, business_hour_repo, service_repo)
+
+        return await service.set_business_hours(store_id, business_hours)
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
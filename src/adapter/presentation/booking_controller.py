@@ -1,10 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from typing import List, Optional
 
 
 from adapter.external.database.postgres import get_db
 from adapter.external.database.repositories import BookingRepositoryAdapter, UserRepositoryAdapter, BookingServiceRepositoryAdapter
 
 from application.booking_service.booking import BookingService
+from application.availability_service.availability import availability_index
+
+from adapter.presentation.listing import parse_list_params, ndjson_response, json_response
+from adapter.presentation.auth_dependency import require_admin
+from adapter.presentation.schemas import BookingOut
+from adapter.presentation.idempotency import run_idempotent
 
 
 booking_router = APIRouter()
@@ -14,18 +21,34 @@ async def get_bookings(request: Request,db=Depends(get_db)):
     try:
         query_params = dict(request.query_params)
         user_id = query_params.get("user_id")
+        limit, cursor, stream = parse_list_params(query_params)
+
+        if stream:
+            if user_id is None:
+                raise ValueError("user_id must be provided")
+            return ndjson_response(
+                lambda stream_db: BookingService(
+                    BookingRepositoryAdapter(stream_db),
+                    UserRepositoryAdapter(stream_db),
+                    BookingServiceRepositoryAdapter(stream_db)
+                ).stream_bookings(user_id)
+            )
 
         booking_repo = BookingRepositoryAdapter(db)
         user_repo = UserRepositoryAdapter(db)
         booking_service_repo = BookingServiceRepositoryAdapter(db)
 
         service = BookingService(booking_repo, user_repo, booking_service_repo)
-        return await service.get_bookings(user_id)
+
+        if limit is not None:
+            return json_response(await service.get_bookings_page(user_id, limit, cursor))
+
+        return json_response(await service.get_bookings(user_id))
     
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-@booking_router.get("/booking")
+@booking_router.get("/booking", response_model=BookingOut)
 async def get_booking(request: Request, db=Depends(get_db)):
     try:
         query_params = dict(request.query_params)
@@ -42,18 +65,21 @@ async def get_booking(request: Request, db=Depends(get_db)):
         if not booking:
             raise HTTPException(status_code=404, detail="ไม่พบข้อมูลการจอง")
 
-        return booking.to_dict() if hasattr(booking, "to_dict") else booking
+        return booking
 
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
 
-@booking_router.get("/booking-appointments")
+@booking_router.get("/booking-appointments", dependencies=[Depends(require_admin)])
 async def get_booking(request: Request, db=Depends(get_db)):
     try:
         query_params = dict(request.query_params)
         store_id = query_params.get("store_id")
+        # ช่วงเวลา [from, to) ของ booking_time ไม่ส่งมา = ทั้งหมดของร้าน
+        start = query_params.get("from")
+        end = query_params.get("to")
 
         booking_repo = BookingRepositoryAdapter(db)
         user_repo = UserRepositoryAdapter(db)
@@ -61,20 +87,22 @@ async def get_booking(request: Request, db=Depends(get_db)):
 
         service = BookingService(booking_repo, user_repo, booking_service_repo)
 
-        booking = await service.get_booking_by_store_id(store_id)
+        booking = await service.get_booking_by_store_id(store_id, start, end)
 
         if not booking:
             raise HTTPException(status_code=404, detail="ไม่พบข้อมูลการจอง")
 
-        return booking.to_dict() if hasattr(booking, "to_dict") else booking
+        return json_response(booking)
 
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
     
-@booking_router.post("/bookings/create")
-async def create_booking(request: Request, db=Depends(get_db)):
+# ส่ง Idempotency-Key มาได้ (LINE webhook retry) key เดิม = ได้ booking เดิมไม่สร้างซ้ำ
+# ไม่มี user ตาม user_id service คืน None (ตอบ null เหมือนเดิม)
+@booking_router.post("/bookings/create", response_model=Optional[BookingOut])
+async def create_booking(request: Request, response: Response, db=Depends(get_db)):
     try:
         data = await request.json()
         booking_time = data.get("booking_time")
@@ -82,28 +110,37 @@ async def create_booking(request: Request, db=Depends(get_db)):
         note = data.get("note")
 
         user_id = data.get("user_id")
-        service_id = data.get("service_id")
+        # รับได้ทั้ง service_id เดี่ยว และ service_ids เป็น list
+        service_ids = data.get("service_ids") or data.get("service_id")
 
         booking_repo = BookingRepositoryAdapter(db)
         user_repo = UserRepositoryAdapter(db)
         booking_service_repo = BookingServiceRepositoryAdapter(db)
 
-        service = BookingService(booking_repo, user_repo, booking_service_repo)
-
-        return await service.create_booking(
-            booking_time,
-            status,
-            note,
+        service = BookingService(booking_repo, user_repo, booking_service_repo, availability_index)
 
+        return await run_idempotent(
+            request,
+            response,
+            "bookings.create",
             user_id,
-            service_id
+            data,
+            BookingOut,
+            lambda: service.create_booking(
+                booking_time,
+                status,
+                note,
+
+                user_id,
+                service_ids
+            )
         )
     
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     
 
-@booking_router.put("/bookings/edit")
+@booking_router.put("/bookings/edit", response_model=BookingOut, dependencies=[Depends(require_admin)])
 async def edit_booking(request: Request, db=Depends(get_db)):
     try:
         data = await request.json()
@@ -124,21 +161,40 @@ async def edit_booking(request: Request, db=Depends(get_db)):
         user_repo = UserRepositoryAdapter(db)
         booking_service_repo = BookingServiceRepositoryAdapter(db)
 
-        service = BookingService(booking_repo, user_repo, booking_service_repo)
+        service = BookingService(booking_repo, user_repo, booking_service_repo, availability_index)
 
         updated_service = await service.edit_by_id(booking_id, update_data)
 
         if not updated_service:
             raise HTTPException(status_code=404, detail="ไม่พบ การจอง")
 
-        return updated_service.to_dict()
+        return updated_service
 
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
 
-@booking_router.delete("/bookings/delete")
+# เปลี่ยน status หลาย booking ใน transaction เดียว body: {"bookings": [{"booking_id": ..., "status": ...}]}
+@booking_router.put("/bookings/status", dependencies=[Depends(require_admin)])
+async def edit_booking_statuses(request: Request, db=Depends(get_db)):
+    try:
+        data = await request.json()
+
+        booking_repo = BookingRepositoryAdapter(db)
+        user_repo = UserRepositoryAdapter(db)
+        booking_service_repo = BookingServiceRepositoryAdapter(db)
+
+        service = BookingService(booking_repo, user_repo, booking_service_repo, availability_index)
+
+        return json_response(await service.edit_status_by_ids(data.get("bookings")))
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
+
+@booking_router.delete("/bookings/delete", response_model=BookingOut, dependencies=[Depends(require_admin)])
 async def remove_booking(request: Request, db=Depends(get_db)):
     try:
         data = await request.json()
@@ -151,7 +207,7 @@ async def remove_booking(request: Request, db=Depends(get_db)):
         user_repo = UserRepositoryAdapter(db)
         booking_service_repo = BookingServiceRepositoryAdapter(db)
 
-        service = BookingService(booking_repo, user_repo, booking_service_repo)
+        service = BookingService(booking_repo, user_repo, booking_service_repo, availability_index)
 
         
         delete_service = await service.remove_by_id(booking_id)
@@ -159,9 +215,32 @@ async def remove_booking(request: Request, db=Depends(get_db)):
         if not delete_service:
             raise HTTPException(status_code=404, detail="ไม่พบ การจอง")
 
-        return delete_service.to_dict()
+        return delete_service
     
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
+
+@booking_router.delete("/bookings/delete-many", response_model=List[BookingOut], dependencies=[Depends(require_admin)])
+async def remove_bookings(request: Request, db=Depends(get_db)):
+    try:
+        data = await request.json()
+        booking_ids = data.get("booking_ids")
+
+        if not booking_ids:
+            raise HTTPException(status_code=400, detail="ต้องระบุ booking_ids")
+
+        booking_repo = BookingRepositoryAdapter(db)
+        user_repo = UserRepositoryAdapter(db)
+        booking_service_repo = BookingServiceRepositoryAdapter(db)
+
+        service = BookingService(booking_repo, user_repo, booking_service_repo, availability_index)
+
+        # ลบทั้งหมดใน transaction เดียว คืนเฉพาะ booking ที่ลบได้จริง
+        return await service.remove_by_ids(booking_ids)
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
@@ -0,0 +1,62 @@
+from fastapi import HTTPException, Request, Response
+from fastapi.security.utils import get_authorization_scheme_param
+
+from adapter.external.database.idempotency import (
+    idempotency_store,
+    request_fingerprint,
+    IdempotencyKeyConflict,
+    MAX_IDEMPOTENCY_KEY_LENGTH
+)
+from adapter.presentation.auth_dependency import token_verifier
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+class _NothingCreated(Exception):
+    pass
+
+async def _caller(request: Request, owner) -> str:
+    # key เป็นของผู้เรียกแต่ละคน: คนอื่นส่ง key ซ้ำกันโดยบังเอิญ (หรือเดา key) ไม่ได้ response ของเรา
+    # admin = sub ของ token / ลูกค้าที่ไม่มี token = เจ้าของข้อมูลตาม body (owner)
+    scheme, token = get_authorization_scheme_param(request.headers.get("authorization"))
+    if scheme.lower() == "bearer" and token:
+        try:
+            return "admin:" + token_verifier.verify(token)["sub"]
+        except ValueError as e:
+            raise HTTPException(status_code=401, detail=str(e), headers={"WWW-Authenticate": "Bearer"})
+    if callable(owner):
+        owner = await owner()
+    return f"user:{owner}"
+
+async def run_idempotent(request: Request, response: Response, scope: str, owner, payload, schema, create):
+    # owner: user_id เจ้าของ request หรือ coroutine function ที่คืนค่านั้น (เรียกเฉพาะตอนมี header และไม่มี token)
+    # ไม่ส่ง header มา = ทำงานแบบเดิม
+    idempotency_key = request.headers.get(IDEMPOTENCY_HEADER)
+    if idempotency_key is None:
+        return await create()
+
+    if not idempotency_key or len(idempotency_key) > MAX_IDEMPOTENCY_KEY_LENGTH:
+        raise HTTPException(
+            status_code=400,
+            detail=f"{IDEMPOTENCY_HEADER} ต้องยาว 1-{MAX_IDEMPOTENCY_KEY_LENGTH} ตัวอักษร"
+        )
+
+    # เก็บเป็น JSON ตาม schema ของ response ครั้งแรกกับครั้งที่ตอบซ้ำจึงได้ body เดียวกัน
+    async def create_json():
+        created = await create()
+        if created is None:
+            # ไม่ได้สร้างอะไร (เช่นไม่มี user) ไม่เก็บผล คืน key ให้ลองใหม่ได้
+            raise _NothingCreated()
+        return schema.model_validate(created).model_dump(mode="json")
+
+    try:
+        scope = f"{scope}:{await _caller(request, owner)}"
+        body, replayed = await idempotency_store.run(scope, idempotency_key, request_fingerprint(payload), create_json)
+    except _NothingCreated:
+        return None
+    except IdempotencyKeyConflict as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+    if replayed:
+        response.headers[REPLAYED_HEADER] = "true"
+    return body
@@ -0,0 +1,53 @@
+# ใช้ตอนย้ายข้อมูลร้านใหม่เข้าระบบ รันจากโฟลเดอร์ src:
+#   python -m adapter.presentation.import_cli users users.csv
+#   python -m adapter.presentation.import_cli bookings bookings.ndjson --store-id <store_id>
+import argparse
+import asyncio
+import json
+import sys
+
+from adapter.external.database.postgres import engine
+from adapter.external.database.bulk_import import BulkImportRepositoryAdapter
+
+from application.import_service.importer import ImportService
+
+from utils.tabular_reader import detect_format, read_rows_async
+
+
+async def run(args) -> dict:
+    service = ImportService(BulkImportRepositoryAdapter(engine))
+    fmt = detect_format(args.path, args.format)
+
+    try:
+        with open(args.path, "rb") as file:
+            if args.kind == "users":
+                return await service.import_users(read_rows_async(file, fmt))
+            return await service.import_bookings(args.store_id, read_rows_async(file, fmt))
+    finally:
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import users/bookings from CSV or NDJSON")
+    parser.add_argument("kind", choices=["users", "bookings"])
+    parser.add_argument("path")
+    parser.add_argument("--store-id", dest="store_id")
+    parser.add_argument("--format", choices=["csv", "ndjson"])
+    args = parser.parse_args()
+
+    if args.kind == "bookings" and not args.store_id:
+        parser.error("--store-id is required for bookings")
+
+    try:
+        report = asyncio.run(run(args))
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        sys.exit(1)
+
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    if report["errors"]:
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
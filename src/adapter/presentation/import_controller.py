@@ -0,0 +1,52 @@
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    UploadFile,
+    File,
+    Form
+)
+
+from adapter.external.database.bulk_import import BulkImportRepositoryAdapter
+
+from application.import_service.importer import ImportService
+from application.availability_service.availability import availability_index
+
+from utils.tabular_reader import detect_format, read_rows_async
+from adapter.presentation.auth_dependency import require_admin
+
+
+import_router = APIRouter()
+
+@import_router.post("/imports/users", dependencies=[Depends(require_admin)])
+async def import_users(
+    file: UploadFile = File(...),
+    format: str = Form(None)
+    ):
+    try:
+        fmt = detect_format(file.filename, format)
+
+        import_repo = BulkImportRepositoryAdapter()
+        service = ImportService(import_repo)
+
+        return await service.import_users(read_rows_async(file.file, fmt))
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@import_router.post("/imports/bookings", dependencies=[Depends(require_admin)])
+async def import_bookings(
+    store_id: str = Form(...),
+    file: UploadFile = File(...),
+    format: str = Form(None)
+    ):
+    try:
+        fmt = detect_format(file.filename, format)
+
+        import_repo = BulkImportRepositoryAdapter()
+        service = ImportService(import_repo, availability_index)
+
+        return await service.import_bookings(store_id, read_rows_async(file.file, fmt))
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -0,0 +1,48 @@
+from fastapi import HTTPException
+from fastapi.responses import ORJSONResponse, StreamingResponse
+
+from adapter.external.database.postgres import ReadSessionLocal
+
+import orjson
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def parse_list_params(query_params: dict) -> tuple:
+    # คืน (limit, cursor, stream)
+    # ถ้าไม่ส่ง limit/cursor/stream มาเลย limit จะเป็น None = ตอบแบบ list เดิมทั้งก้อน
+    limit = query_params.get("limit")
+    cursor = query_params.get("cursor")
+    stream = query_params.get("stream", "").lower() in ("1", "true", "yes")
+
+    if limit is not None:
+        if not limit.isdigit() or int(limit) <= 0:
+            raise HTTPException(status_code=400, detail="limit ต้องเป็นจำนวนเต็มบวก")
+        limit = min(int(limit), MAX_PAGE_SIZE)
+    elif cursor:
+        limit = DEFAULT_PAGE_SIZE
+
+    return limit, cursor, stream
+
+
+def _default(value):
+    # datetime/date/time orjson ทำเองอยู่แล้ว ที่เหลือ (เช่น Decimal) เป็น string
+    return str(value)
+
+
+def json_response(content) -> ORJSONResponse:
+    # list/page ขนาดใหญ่: คืน Response เองเพื่อข้าม jsonable_encoder ของ FastAPI
+    # content ต้องเป็น dict/list ของค่าพื้นฐานที่ orjson รู้จัก
+    return ORJSONResponse(content)
+
+
+def ndjson_response(open_stream) -> StreamingResponse:
+    # open_stream(db) ต้องคืน async generator ของ dict
+    # เปิด session ของตัวเองเพราะ stream ยังวิ่งอยู่หลัง handler return ไปแล้ว (อ่านจาก replica ได้)
+    async def body():
+        async with ReadSessionLocal() as db:
+            async for item in open_stream(db):
+                yield orjson.dumps(item, default=_default, option=orjson.OPT_APPEND_NEWLINE)
+
+    return StreamingResponse(body(), media_type="application/x-ndjson")
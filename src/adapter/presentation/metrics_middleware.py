@@ -0,0 +1,45 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from time import perf_counter
+
+from adapter.external.metrics import current_scope, http_request_duration, registry, route_label
+
+
+class MetricsMiddleware:
+    # จับเวลาทั้ง request (รวม middleware ชั้นใน) แล้ว label ด้วย route template หลัง routing เสร็จ
+    # scope ถูกเก็บใน contextvar ให้ query ที่ยิงระหว่าง request รู้ route ด้วย
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started = perf_counter()
+        token = current_scope.set(scope)
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_request_duration.observe(
+                perf_counter() - started,
+                method=scope["method"],
+                route=route_label(),
+                status=str(status)
+            )
+            current_scope.reset(token)
+
+
+metrics_router = APIRouter()
+
+@metrics_router.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
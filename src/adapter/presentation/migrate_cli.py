@@ -0,0 +1,44 @@
+# migrate schema แยกจากตัว app รันจากโฟลเดอร์ src:
+#   python -m adapter.presentation.migrate_cli upgrade
+#   python -m adapter.presentation.migrate_cli upgrade --to 3
+#   python -m adapter.presentation.migrate_cli current
+import argparse
+import asyncio
+import logging
+
+from adapter.external.database.postgres import engine
+from adapter.external.database.migrations.runner import (
+    HEAD_VERSION,
+    current_version,
+    upgrade
+)
+
+
+async def run(args):
+    try:
+        if args.command == "current":
+            async with engine.connect() as conn:
+                version = await current_version(conn)
+            print(f"current: {version}, head: {HEAD_VERSION}")
+            return
+
+        applied = await upgrade(engine, args.to)
+        if not applied:
+            print(f"Already up to date (head: {HEAD_VERSION})")
+    finally:
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Database schema migrations")
+    parser.add_argument("command", choices=["upgrade", "current"])
+    parser.add_argument("--to", type=int, default=HEAD_VERSION, help="upgrade ถึง revision นี้")
+    args = parser.parse_args()
+
+    # runner log migration ที่ apply ผ่าน logger ไม่ตั้งไว้จะไม่เห็น (default แสดงแค่ WARNING)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,12 @@
+import hashlib
+
 from fastapi import (
     APIRouter,
     Depends,
     HTTPException,
     Query,
     Request,
+    Response,
     UploadFile,
     File,
     Form
@@ -12,33 +15,66 @@ from fastapi import (
 from adapter.external.database.postgres import get_db
 from adapter.external.database.repositories import PaymentRepositoryAdapter, BookingRepositoryAdapter
 
-from adapter.external.supabase_image import SupabaseAdapter
+from adapter.external.supabase_image import supabase_adapter
+from adapter.external.payment_expiry import payment_expiry_scheduler
+
+from application.payment_service.payment import PaymentService, slip_url_index, SLIP_CHUNK_SIZE
 
-from application.payment_service.payment import PaymentService
+from adapter.presentation.listing import parse_list_params, ndjson_response, json_response
+from adapter.presentation.auth_dependency import require_admin
+from adapter.presentation.schemas import PaymentOut
+from adapter.presentation.idempotency import run_idempotent
 
 
 payment_router = APIRouter()
 
-@payment_router.get("/payments/all")
-async def get_payments(db=Depends(get_db)):
+async def _slip_digest(request: Request, slip: UploadFile) -> str:
+    # UploadLimitMiddleware hash ไว้แล้วระหว่างรับ body ไม่ต้องอ่านไฟล์ซ้ำ
+    digests = getattr(request.state, "upload_digests", None) or {}
+    if "slip" in digests:
+        return digests["slip"]
+
+    digest = hashlib.sha256()
+    while chunk := await slip.read(SLIP_CHUNK_SIZE):
+        digest.update(chunk)
+    await slip.seek(0)
+    return digest.hexdigest()
+
+@payment_router.get("/payments/all", dependencies=[Depends(require_admin)])
+async def get_payments(request: Request, db=Depends(get_db)):
     try:
+        limit, cursor, stream = parse_list_params(dict(request.query_params))
+
+        if stream:
+            return ndjson_response(
+                lambda stream_db: PaymentService(
+                    PaymentRepositoryAdapter(stream_db),
+                    supabase_adapter,
+                    BookingRepositoryAdapter(stream_db)
+                ).stream_payments()
+            )
+
         payment_repo = PaymentRepositoryAdapter(db)
-        supabase_instance = SupabaseAdapter()
+        supabase_instance = supabase_adapter
         booking_repo = BookingRepositoryAdapter(db)
 
         service = PaymentService(payment_repo, supabase_instance, booking_repo)
-        return await service.get_payments()
+
+        if limit is not None:
+            return json_response(await service.get_payments_page(limit, cursor))
+
+        return json_response(await service.get_payments())
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     
-@payment_router.get("/payment")
+@payment_router.get("/payment", response_model=PaymentOut)
 async def get_payment(request: Request, db=Depends(get_db)):
     try:
         query_params = dict(request.query_params)
         payment_id = query_params.get("payment_id")
 
         payment_repo = PaymentRepositoryAdapter(db)
-        supabase_instance = SupabaseAdapter()
+        supabase_instance = supabase_adapter
         booking_repo = BookingRepositoryAdapter(db)
 
         service = PaymentService(payment_repo, supabase_instance, booking_repo)
@@ -48,15 +84,18 @@ async def get_payment(request: Request, db=Depends(get_db)):
         if not payment:
             raise HTTPException(status_code=404, detail="ไม่พบข้อมูลธุรกรรม")
 
-        return payment.to_dict() if hasattr(payment, "to_dict") else payment
+        return payment
 
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
     
-@payment_router.post("/payments/create")
+# ส่ง Idempotency-Key มาได้ key เดิม = ได้ payment เดิม ไม่อัปโหลด slip ซ้ำ
+@payment_router.post("/payments/create", response_model=PaymentOut)
 async def create_payment(
+    request: Request,
+    response: Response,
     
     amount: float = Form(...),
     # payment_status: str = Form("Pending")
@@ -68,39 +107,50 @@ async def create_payment(
     ):
     try:
 
-        file_name = slip.filename
-        slip = await slip.read()
-
-        # print("นับ", len(slip))
-        # print(file_name)
-        
-
         payment_repo = PaymentRepositoryAdapter(db)
-        supabase_instance = SupabaseAdapter()
+        supabase_instance = supabase_adapter
         booking_repo = BookingRepositoryAdapter(db)
 
-        service = PaymentService(payment_repo, supabase_instance, booking_repo)
-
-        return await service.create_payment(
-            amount,
-            slip,
-            file_name,
-
-            booking_id
+        service = PaymentService(payment_repo, supabase_instance, booking_repo, payment_expiry_scheduler, slip_url_index)
+
+        async def booking_owner():
+            booking = await booking_repo.find_by_id(booking_id)
+            return booking.user_id if booking is not None else None
+
+        # ไม่ read() ทั้งไฟล์ ส่ง UploadFile ให้ service stream ต่อเป็น chunk
+        # sha256 ของเนื้อ slip: fingerprint ของ Idempotency-Key + ชื่อไฟล์ใน storage (ซ้ำ = ไม่ upload)
+        slip_digest = await _slip_digest(request, slip)
+        return await run_idempotent(
+            request,
+            response,
+            "payments.create",
+            booking_owner,
+            {"amount": amount, "booking_id": booking_id, "slip": slip_digest},
+            PaymentOut,
+            lambda: service.create_payment(
+                amount,
+                slip,
+                slip.filename,
+                slip.content_type,
+
+                booking_id,
+                slip_size=slip.size,
+                slip_digest=slip_digest
+            )
         )
     
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     
 
-@payment_router.put("/payments/edit")
+@payment_router.put("/payments/edit", response_model=PaymentOut, dependencies=[Depends(require_admin)])
 async def edit_status(request: Request, db=Depends(get_db)):
     try:
         update_data = await request.json()
         payment_id = update_data.get("payment_id")
 
         payment_repo = PaymentRepositoryAdapter(db)
-        supabase_instance = SupabaseAdapter()
+        supabase_instance = supabase_adapter
         booking_repo = BookingRepositoryAdapter(db)
 
         service = PaymentService(payment_repo, supabase_instance, booking_repo)
@@ -110,7 +160,7 @@ async def edit_status(request: Request, db=Depends(get_db)):
         if not payment:
             raise HTTPException(status_code=404, detail="ไม่พบข้อมูลธุรกรรม")
 
-        return payment.to_dict() if hasattr(payment, "to_dict") else payment
+        return payment
 
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
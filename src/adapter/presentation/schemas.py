@@ -0,0 +1,54 @@
+from pydantic import BaseModel, ConfigDict
+from datetime import datetime
+from typing import Optional
+
+# response ของ endpoint ที่คืน object เดี่ยว ใช้เป็น response_model
+# FastAPI จะ validate/serialize ด้วย pydantic-core (อ่าน attribute จาก ORM ได้ตรงๆ) ไม่ผ่าน jsonable_encoder
+# field ต้องตรงกับ to_dict() ของ model เดิม web admin ใช้ shape นี้อยู่
+
+
+class ResponseSchema(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+
+class StoreOut(ResponseSchema):
+    id: str
+    store_name: Optional[str] = None
+    description: Optional[str] = None
+    created_at: Optional[datetime] = None
+    payment_expiry_minutes: Optional[int] = None
+
+
+class ServiceOut(ResponseSchema):
+    id: str
+    title: Optional[str] = None
+    duration_minutes: Optional[int] = None
+    prices: Optional[float] = None
+    description: Optional[str] = None
+    store_id: str
+
+
+class BookingOut(ResponseSchema):
+    id: str
+    booking_time: Optional[datetime] = None
+    status: Optional[str] = None
+    created_at: Optional[datetime] = None
+    note: Optional[str] = None
+    user_id: str
+
+
+class PaymentOut(ResponseSchema):
+    id: str
+    amount: Optional[float] = None
+    payment_status: Optional[str] = None
+    slip: Optional[str] = None
+    created_at: Optional[datetime] = None
+    paid_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = None
+    booking_id: str
+
+
+class UserOut(ResponseSchema):
+    id: str
+    user_name: Optional[str] = None
+    tel: Optional[str] = None
@@ -1,10 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from typing import List, Optional
 
 
 from adapter.external.database.postgres import get_db
 from adapter.external.database.repositories import ServiceRepositoryAdapter, StoreRepositoryAdapter
 
 from application.service_service.service import ServiceService
+from application.availability_service.availability import availability_index
+
+from adapter.presentation.listing import parse_list_params, ndjson_response, json_response
+from adapter.presentation.auth_dependency import require_admin
+from adapter.presentation.schemas import ServiceOut
 
 
 service_router = APIRouter()
@@ -14,16 +20,48 @@ async def get_services(request: Request,db=Depends(get_db)):
     try:
         query_params = dict(request.query_params)
         store_id = query_params.get("store_id")
+        limit, cursor, stream = parse_list_params(query_params)
+
+        if stream:
+            if store_id is None:
+                raise ValueError("store_id must be provided")
+            return ndjson_response(
+                lambda stream_db: ServiceService(
+                    ServiceRepositoryAdapter(stream_db),
+                    StoreRepositoryAdapter(stream_db)
+                ).stream_services(store_id)
+            )
 
         service_repo = ServiceRepositoryAdapter(db)
         store_repo = StoreRepositoryAdapter(db)
 
         service = ServiceService(service_repo, store_repo)
-        return await service.get_services(store_id)
+
+        if limit is not None:
+            return json_response(await service.get_services_page(store_id, limit, cursor))
+
+        return json_response(await service.get_services(store_id))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# หลาย service ใน query เดียว: /services?ids=a,b,c (id ที่ไม่เจอไม่อยู่ในผลลัพธ์)
+@service_router.get("/services")
+async def get_services_by_ids(request: Request, db=Depends(get_db)):
+    try:
+        ids = request.query_params.get("ids")
+        if not ids:
+            raise ValueError("ids must be provided")
+
+        service_repo = ServiceRepositoryAdapter(db)
+        store_repo = StoreRepositoryAdapter(db)
+
+        service = ServiceService(service_repo, store_repo)
+
+        return json_response(await service.get_services_by_ids([service_id for service_id in ids.split(",") if service_id]))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-@service_router.get("/services/from-booking")
+@service_router.get("/services/from-booking", response_model=List[ServiceOut])
 async def get_services_from_booking(request: Request, db=Depends(get_db)):
     try:
         query_params = dict(request.query_params)
@@ -55,7 +93,22 @@ async def get_services_id_by_title(request: Request, db=Depends(get_db)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
-@service_router.get("/service")
+# หลาย title ใน query เดียว: /services/ids-from-titles?titles=a&titles=b -> {title: service_id หรือ null}
+@service_router.get("/services/ids-from-titles")
+async def get_services_id_by_titles(request: Request, db=Depends(get_db)):
+    try:
+        titles = request.query_params.getlist("titles")
+
+        service_repo = ServiceRepositoryAdapter(db)
+        store_repo = StoreRepositoryAdapter(db)
+
+        service = ServiceService(service_repo, store_repo)
+
+        return await service.get_services_id_by_titles(titles)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@service_router.get("/service", response_model=ServiceOut)
 async def get_service(request: Request, db=Depends(get_db)):
     try:
         query_params = dict(request.query_params)
@@ -71,14 +124,15 @@ async def get_service(request: Request, db=Depends(get_db)):
         if not service:
             raise HTTPException(status_code=404, detail="ไม่พบข้อมูลบริการ")
 
-        return service.to_dict() if hasattr(service, "to_dict") else service
+        return service
 
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
     
-@service_router.post("/services/create")
+# ไม่มีร้านตาม store_id service คืน None (ตอบ null เหมือนเดิม)
+@service_router.post("/services/create", response_model=Optional[ServiceOut], dependencies=[Depends(require_admin)])
 async def create_service(request: Request, db=Depends(get_db)):
     try:
         data = await request.json()
@@ -105,7 +159,23 @@ async def create_service(request: Request, db=Depends(get_db)):
         raise HTTPException(status_code=400, detail=str(e))
     
 
-@service_router.put("/services/edit")
+# สร้างหลาย service ใน transaction เดียว body: {"services": [{title, duration_minutes, prices, description, store_id}]}
+@service_router.post("/services/create-many", response_model=List[ServiceOut], dependencies=[Depends(require_admin)])
+async def create_services(request: Request, db=Depends(get_db)):
+    try:
+        data = await request.json()
+
+        service_repo = ServiceRepositoryAdapter(db)
+        store_repo = StoreRepositoryAdapter(db)
+
+        service = ServiceService(service_repo, store_repo)
+
+        return await service.create_services(data.get("services"))
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@service_router.put("/services/edit", response_model=ServiceOut, dependencies=[Depends(require_admin)])
 async def edit_service(request: Request, db=Depends(get_db)):
     try:
         data = await request.json()
@@ -125,21 +195,39 @@ async def edit_service(request: Request, db=Depends(get_db)):
         service_repo = ServiceRepositoryAdapter(db)
         store_repo = StoreRepositoryAdapter(db)
 
-        service = ServiceService(service_repo, store_repo)
+        service = ServiceService(service_repo, store_repo, availability_index)
 
         updated_service = await service.edit_by_id(service_id, update_data)
 
         if not updated_service:
             raise HTTPException(status_code=404, detail="ไม่พบบริการ")
 
-        return updated_service.to_dict()
+        return updated_service
 
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
 
-@service_router.delete("/services/delete")
+# แก้หลาย service ใน transaction เดียว body: {"services": [{"service_id": ..., <field>: ...}]}
+@service_router.put("/services/edit-many", dependencies=[Depends(require_admin)])
+async def edit_services(request: Request, db=Depends(get_db)):
+    try:
+        data = await request.json()
+
+        service_repo = ServiceRepositoryAdapter(db)
+        store_repo = StoreRepositoryAdapter(db)
+
+        service = ServiceService(service_repo, store_repo, availability_index)
+
+        return json_response(await service.edit_many(data.get("services")))
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
+
+@service_router.delete("/services/delete", response_model=ServiceOut, dependencies=[Depends(require_admin)])
 async def remove_service(request: Request, db=Depends(get_db)):
     try:
         data = await request.json()
@@ -151,14 +239,14 @@ async def remove_service(request: Request, db=Depends(get_db)):
         service_repo = ServiceRepositoryAdapter(db)
         store_repo = StoreRepositoryAdapter(db)
 
-        service = ServiceService(service_repo, store_repo)
+        service = ServiceService(service_repo, store_repo, availability_index)
         
         delete_service = await service.remove_by_id(service_id)
 
         if not delete_service:
             raise HTTPException(status_code=404, detail="ไม่พบบริการ")
 
-        return delete_service.to_dict()
+        return delete_service
     
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -3,22 +3,37 @@ from fastapi import APIRouter, Depends, HTTPException, Query, Request
 
 from adapter.external.database.postgres import get_db
 from adapter.external.database.repositories import StoreRepositoryAdapter
+from adapter.external.database.store_stats import StoreStatsRepositoryAdapter
 
 from application.store_service.store import StoreService
+from application.store_service.stats import StoreStatsService
+
+from adapter.presentation.listing import parse_list_params, ndjson_response, json_response
+from adapter.presentation.auth_dependency import require_admin
+from adapter.presentation.schemas import StoreOut
 
 
 store_router = APIRouter()
 
 @store_router.get("/stores/all")
-async def get_stores(db=Depends(get_db)):
+async def get_stores(request: Request, db=Depends(get_db)):
     try:
+        limit, cursor, stream = parse_list_params(dict(request.query_params))
+
+        if stream:
+            return ndjson_response(lambda stream_db: StoreService(StoreRepositoryAdapter(stream_db)).stream_stores())
+
         repo = StoreRepositoryAdapter(db)
         service = StoreService(repo)
-        return await service.get_stores()
+
+        if limit is not None:
+            return json_response(await service.get_stores_page(limit, cursor))
+
+        return json_response(await service.get_stores())
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     
-@store_router.get("/store")
+@store_router.get("/store", response_model=StoreOut)
 async def get_store(request: Request, db=Depends(get_db)):
     try:
         query_params = dict(request.query_params)
@@ -41,14 +56,33 @@ async def get_store(request: Request, db=Depends(get_db)):
         if not store:
             raise HTTPException(status_code=404, detail="ไม่พบข้อมูลร้าน")
 
-        return store.to_dict() if hasattr(store, "to_dict") else store
+        return store
 
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
     
-@store_router.post("/stores/create")
+@store_router.get("/stores/{store_id}/stats", dependencies=[Depends(require_admin)])
+async def get_store_stats(store_id: str, request: Request, db=Depends(get_db)):
+    try:
+        query_params = dict(request.query_params)
+        # ช่วงวัน [from, to) รูปแบบ YYYY-MM-DD ไม่ส่งมา = 30 วันล่าสุด
+        start = query_params.get("from")
+        end = query_params.get("to")
+
+        service = StoreStatsService(StoreStatsRepositoryAdapter(), StoreRepositoryAdapter(db))
+        stats = await service.get_stats(store_id, start, end)
+
+        if stats is None:
+            raise HTTPException(status_code=404, detail="ไม่พบข้อมูลร้าน")
+
+        return stats
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@store_router.post("/stores/create", response_model=StoreOut)
 async def create_store(request: Request, db=Depends(get_db)):
     try:
         data = await request.json()
@@ -63,7 +97,7 @@ async def create_store(request: Request, db=Depends(get_db)):
         raise HTTPException(status_code=400, detail=str(e))
     
 
-@store_router.put("/stores/edit")
+@store_router.put("/stores/edit", response_model=StoreOut, dependencies=[Depends(require_admin)])
 async def edit_store(request: Request, db=Depends(get_db)):
     try:
         data = await request.json()
@@ -87,14 +121,14 @@ async def edit_store(request: Request, db=Depends(get_db)):
         if not updated_store:
             raise HTTPException(status_code=404, detail="ไม่พบร้าน")
 
-        return updated_store.to_dict()
+        return updated_store
 
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
 
-@store_router.delete("/stores/delete")
+@store_router.delete("/stores/delete", response_model=StoreOut, dependencies=[Depends(require_admin)])
 async def remove_store(request: Request, db=Depends(get_db)):
     try:
         data = await request.json()
@@ -110,7 +144,7 @@ async def remove_store(request: Request, db=Depends(get_db)):
         if not delete_store:
             raise HTTPException(status_code=404, detail="ไม่พบร้าน")
 
-        return delete_store.to_dict()
+        return delete_store
     
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -0,0 +1,165 @@
+from fastapi import HTTPException
+from starlette.responses import PlainTextResponse
+import hashlib
+
+from application.payment_service.payment import MAX_SLIP_BYTES
+
+try:
+    import python_multipart as multipart
+    from python_multipart.multipart import parse_options_header
+except ModuleNotFoundError:
+    import multipart
+    from multipart.multipart import parse_options_header
+
+# เผื่อให้ field อื่นใน form (amount, booking_id, boundary)
+FORM_OVERHEAD_BYTES = 64 * 1024
+
+class _FilePartInspector:
+    # อ่าน header ของแต่ละ part ระหว่างที่ body ไหลเข้ามา (ไม่เก็บเนื้อไฟล์ไว้)
+    # เจอ part ของไฟล์ที่ content type ไม่อนุญาต หรือไฟล์ใหญ่เกิน -> error ก่อน starlette จะ spool ไฟล์
+    def __init__(self, boundary: bytes, file_fields: dict, max_file_bytes: int):
+        self.file_fields = file_fields
+        self.max_file_bytes = max_file_bytes
+        self.error = None # (status_code, detail)
+        self._done = False
+        self._headers = {}
+        self._header_field = b""
+        self._header_value = b""
+        self._current = None # ชื่อ field ของไฟล์ที่กำลังนับ byte
+        self._file_bytes = 0
+        self._digest = None
+        self.digests = {} # ชื่อ field -> sha256 ของเนื้อไฟล์ (ใช้ทำ fingerprint โดยไม่ต้องอ่านไฟล์ซ้ำ)
+        self._parser = multipart.MultipartParser(boundary, {
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+            "on_end": self._on_end
+        })
+
+    def feed(self, chunk: bytes):
+        if self._done or self.error is not None or not chunk:
+            return
+        try:
+            self._parser.write(chunk)
+        except Exception:
+            # body ผิดรูปแบบ ปล่อยให้ starlette ตอบ error ของมันเอง
+            self._done = True
+
+    def _on_part_begin(self):
+        self._headers = {}
+        self._current = None
+
+    def _on_header_field(self, data: bytes, start: int, end: int):
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def _on_header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        name = options.get(b"name", b"").decode("latin-1")
+        allowed = self.file_fields.get(name)
+        if allowed is None:
+            return
+
+        content_type, _ = parse_options_header(self._headers.get(b"content-type", b""))
+        content_type = content_type.decode("latin-1").lower()
+        if content_type not in allowed:
+            self.error = (415, f"{name} content type must be one of {sorted(allowed)}")
+            return
+
+        self._current = name
+        self._file_bytes = 0
+        self._digest = hashlib.sha256()
+
+    def _on_part_data(self, data: bytes, start: int, end: int):
+        if self._current is None:
+            return
+        self._file_bytes += end - start
+        if self._file_bytes > self.max_file_bytes:
+            self.error = (413, f"{self._current} must not be larger than {self.max_file_bytes} bytes")
+            return
+        self._digest.update(data[start:end])
+
+    def _on_part_end(self):
+        if self._current is not None:
+            self.digests[self._current] = self._digest.hexdigest()
+        self._current = None
+
+    def _on_end(self):
+        self._done = True
+
+
+class UploadLimitMiddleware:
+    # ตัด request ที่ใหญ่เกินหรือไฟล์ผิดชนิดตั้งแต่ก่อน parse form:
+    # - มี Content-Length เกิน -> ตอบ 413 ทันทีโดยไม่อ่าน body
+    # - ส่งแบบ chunked -> นับ byte ระหว่างอ่าน เกินเมื่อไหร่หยุดเมื่อนั้น
+    # - file_fields {ชื่อ field: content type ที่รับ}: ดู header ของ part ระหว่างอ่าน
+    #   ชนิดไม่ตรง = 415 / ไฟล์เกิน max_file_bytes = 413 ก่อนเนื้อไฟล์ถูก spool
+    #   sha256 ของไฟล์ที่ผ่านการตรวจอยู่ใน request.state.upload_digests[ชื่อ field]
+    def __init__(
+            self,
+            app,
+            paths: set,
+            file_fields: dict = None,
+            max_bytes: int = MAX_SLIP_BYTES + FORM_OVERHEAD_BYTES,
+            max_file_bytes: int = MAX_SLIP_BYTES
+        ):
+        self.app = app
+        self.paths = paths
+        self.file_fields = file_fields or {}
+        self.max_bytes = max_bytes
+        self.max_file_bytes = max_file_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        content_length = headers.get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > self.max_bytes:
+            response = PlainTextResponse("Request body is too large", status_code=413)
+            await response(scope, receive, send)
+            return
+
+        inspector = self._inspector(headers.get(b"content-type", b""))
+        if inspector is not None:
+            scope.setdefault("state", {})["upload_digests"] = inspector.digests
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                body = message.get("body", b"")
+                received += len(body)
+                if received > self.max_bytes:
+                    raise HTTPException(status_code=413, detail="Request body is too large")
+
+                if inspector is not None:
+                    inspector.feed(body)
+                    if inspector.error is not None:
+                        raise HTTPException(status_code=inspector.error[0], detail=inspector.error[1])
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+    def _inspector(self, content_type: bytes):
+        if not self.file_fields:
+            return None
+
+        media_type, options = parse_options_header(content_type)
+        boundary = options.get(b"boundary")
+        if media_type != b"multipart/form-data" or not boundary:
+            return None
+        return _FilePartInspector(boundary, self.file_fields, self.max_file_bytes)
@@ -5,9 +5,14 @@ from adapter.external.database.repositories import UserRepositoryAdapter
 
 from application.user_service.user import UserService
 
+from adapter.presentation.listing import parse_list_params, ndjson_response, json_response
+from adapter.presentation.auth_dependency import require_admin
+from adapter.presentation.schemas import UserOut
+
+
 user_router = APIRouter()
 
-@user_router.post("/users/register")
+@user_router.post("/users/register", response_model=UserOut)
 async def create_user(request: Request, db=Depends(get_db)):
     try:
         data = await request.json()
@@ -25,17 +30,26 @@ async def create_user(request: Request, db=Depends(get_db)):
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     
-@user_router.get("/users/all")
-async def get_stores(db=Depends(get_db)):
+@user_router.get("/users/all", dependencies=[Depends(require_admin)])
+async def get_stores(request: Request, db=Depends(get_db)):
     try:
+        limit, cursor, stream = parse_list_params(dict(request.query_params))
+
+        if stream:
+            return ndjson_response(lambda stream_db: UserService(UserRepositoryAdapter(stream_db)).stream_users())
+
         repo = UserRepositoryAdapter(db)
         service = UserService(repo)
-        return await service.get_users()
+
+        if limit is not None:
+            return json_response(await service.get_users_page(limit, cursor))
+
+        return json_response(await service.get_users())
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     
 
-@user_router.get("/user")
+@user_router.get("/user", response_model=UserOut)
 async def get_user(request: Request, db=Depends(get_db)):
     try:
         query_params = dict(request.query_params)
@@ -49,7 +63,7 @@ async def get_user(request: Request, db=Depends(get_db)):
         if not user:
             raise HTTPException(status_code=404, detail="ไม่พบข้อมูลผู้ใช้")
 
-        return user.to_dict() if hasattr(user, "to_dict") else user
+        return user
     
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
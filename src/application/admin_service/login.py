@@ -5,15 +5,22 @@ from domain.interfaces.database import AdminRepositoryInterface
 from domain.model_entities.database import Admin
 
 from domain.interfaces.auth import AuthInterface
+from domain.interfaces.password_hasher import PasswordHasherInterface
 
 from typing import Optional
-from passlib.context import CryptContext
+from uuid import uuid4
 import os
 
 class LoginService:
-    def __init__(self, admin_repo: AdminRepositoryInterface, jwt_secret: AuthInterface, jwt_algorithm: str = "HS256"):
+    def __init__(
+            self,
+            admin_repo: AdminRepositoryInterface,
+            jwt_secret: AuthInterface,
+            password_hasher: PasswordHasherInterface,
+            jwt_algorithm: str = "HS256"
+        ):
         self.admin_repo = admin_repo
-        self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+        self.password_hasher = password_hasher # bcrypt รันนอก event loop
         self.jwt_secret = jwt_secret # secret key ENV.
         self.jwt_algorithm = jwt_algorithm
 
@@ -23,7 +30,7 @@ class LoginService:
             print("ไม่พบชื่อ Admin")
             raise ValueError("Admin not found")
         
-        if not self.pwd_context.verify(admin_password, admin.admin_password):###
+        if not await self.password_hasher.verify(admin_password, admin.admin_password):
             print("รหัสผ่านไม่ถูกต้อง")
             raise ValueError("Incorrect Admin_name or Password")
         
@@ -31,13 +38,16 @@ class LoginService:
         payload = {
             "sub": admin.id,  
             "name": admin.admin_name,
+            "store_id": admin.store_id,
+            "jti": uuid4().hex, # ใช้อ้างอิงตอน revoke (logout)
             "exp": datetime.now(timezone.utc) + timedelta(hours=1), # เวลาหมดอายุ
             "iat": datetime.now(timezone.utc), #  เวลาที่สร้าง
         }
 
-        store_id = await self.admin_repo.find_store_id_of_admin(admin_name)
+        # store_id มากับ admin แถวเดียวกันแล้ว ไม่ต้อง query ซ้ำ
+        store_id = admin.store_id
         # encode เป็น JWT token
-        jwt_secret_str = str(self.jwt_secret.get_jwt_secret())
-        token = jwt.encode(payload, jwt_secret_str, algorithm=self.jwt_algorithm)
+        kid, jwt_secret_str = self.jwt_secret.get_signing_key()
+        token = jwt.encode(payload, str(jwt_secret_str), algorithm=self.jwt_algorithm, headers={"kid": kid})
         return token, store_id # login สำเร็จส่ง token 
 
@@ -9,19 +9,28 @@ from domain.model_entities.database import (
 
 from typing import Optional, List
 
+from domain.interfaces.password_hasher import PasswordHasherInterface
+
 from uuid import uuid4
-from passlib.context import CryptContext
 
 class RegisterService:
     def __init__(
             self,
             admin_repo: AdminRepositoryInterface,
-            store_repo: StoreRepositoryInterface
+            store_repo: StoreRepositoryInterface,
+            password_hasher: PasswordHasherInterface
         ):
         self.admin_repo = admin_repo
         self.store_repo = store_repo
+        self.password_hasher = password_hasher
+
+    async def create_admin(self,email: str, admin_name: str, admin_password: str, store_id: str, caller: Optional[dict] = None) -> Optional[Admin]:
+        # admin คนแรกของร้านสมัครเองได้ (หน้า register ของ web_admin สร้างร้านแล้วสมัครต่อทันที)
+        # ร้านที่มี admin แล้ว ต้องเป็น admin ของร้านนั้นเพิ่มให้เท่านั้น
+        if caller is None or caller.get("store_id") != store_id:
+            if await self.admin_repo.has_admin_for_store(store_id):
+                raise PermissionError("Only an admin of this store can add another admin.")
 
-    async def create_admin(self,email: str, admin_name: str, admin_password: str, store_id: str) -> Optional[Admin]:
         if await self.admin_repo.find_by_name(admin_name):
             # print("Admin ซ้ำข้ามขั้นตอนนี้")
             raise ValueError("Admin name already exists.") 
@@ -31,8 +40,7 @@ class RegisterService:
             raise ValueError("Admin must be associated with a store. Please create a store first before creating an admin.")
         
         id = str(uuid4())
-        pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-        hashed_password = pwd_context.hash(admin_password)
+        hashed_password = await self.password_hasher.hash(admin_password)
         new_admin = Admin(id=id, email=email, admin_name=admin_name, admin_password=hashed_password, store_id=store_id)
         return await self.admin_repo.save(new_admin)
 
@@ -0,0 +1,123 @@
+import jwt
+from collections import OrderedDict
+from hashlib import sha256
+import asyncio
+import time
+
+from domain.interfaces.auth import AuthInterface
+from domain.interfaces.database import RevokedTokenRepositoryInterface
+
+import os
+
+TOKEN_CACHE_SIZE = int(os.getenv('TOKEN_CACHE_SIZE', '4096'))
+# worker อื่น logout แล้วจะมีผลกับ worker นี้ช้าสุดเท่านี้ (worker ที่ logout เองมีผลทันที)
+REVOCATION_REFRESH_SECONDS = float(os.getenv('REVOCATION_REFRESH_SECONDS', '5'))
+
+class TokenVerifier:
+    # token ที่เคย verify แล้วเก็บ claims ไว้ใน LRU (key = hash ของ token) จนถึง exp
+    # request ถัดไปของ token เดิมจึงเหลือแค่ hash + dict lookup ไม่ต้อง decode/เช็ค HMAC ใหม่
+    # การ revoke เก็บใน revocations (ตาราง revoked_tokens) ให้ทุก worker เห็น
+    # _revoked คือสำเนาของตารางใน process (jti -> exp) เช็คแค่ dict lookup
+    # แตะ DB เฉพาะตอน refresh ทุก refresh_seconds ไม่ใช่ทุก request
+    def __init__(
+            self,
+            auth: AuthInterface,
+            revocations: RevokedTokenRepositoryInterface = None,
+            algorithms: list = None,
+            cache_size: int = TOKEN_CACHE_SIZE,
+            refresh_seconds: float = REVOCATION_REFRESH_SECONDS
+        ):
+        self.auth = auth
+        self.revocations = revocations
+        self.algorithms = algorithms or ["HS256"]
+        self.cache_size = cache_size
+        self.refresh_seconds = refresh_seconds
+        self._cache = OrderedDict() # token hash -> (kid, claims)
+        self._revoked = {} # jti -> exp
+        self._refreshed_at = None # time.monotonic() ของ refresh ล่าสุด
+        self._refresh_lock = asyncio.Lock()
+
+    def verify(self, token: str) -> dict:
+        token_hash = sha256(token.encode()).digest()
+        now = time.time()
+
+        cached = self._cache.get(token_hash)
+        # key ที่ถูกถอดออกจาก JWT_KEYS แล้ว ต้องใช้ไม่ได้ทันทีแม้อยู่ใน cache
+        if cached is not None and cached[1]["exp"] > now and self.auth.get_verification_key(cached[0]):
+            self._cache.move_to_end(token_hash)
+            claims = cached[1]
+        else:
+            self._cache.pop(token_hash, None)
+            kid, claims = self._decode(token)
+            self._cache[token_hash] = (kid, claims)
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+        if claims.get("jti") in self._revoked:
+            raise ValueError("Token has been revoked")
+
+        return claims
+
+    async def verify_active(self, token: str) -> dict:
+        # verify + เช็คว่ายังไม่ถูก revoke จาก worker ไหนเลย (ชุด jti อายุไม่เกิน refresh_seconds)
+        if self._refresh_due():
+            await self.refresh_revocations()
+        return self.verify(token)
+
+    async def refresh_revocations(self):
+        if self.revocations is None:
+            return
+
+        # request ที่มาพร้อมกันตอนครบรอบรอ refresh เดียวกัน ไม่ยิง query ซ้ำ
+        async with self._refresh_lock:
+            if not self._refresh_due():
+                return
+
+            now = time.time()
+            active = await self.revocations.find_active(int(now))
+            # revoke ไม่มีการยกเลิก รวมกับของเดิมได้เลย กัน revoke ที่ commit ระหว่าง query หาย
+            active.update((jti, exp) for jti, exp in self._revoked.items() if exp > now)
+            self._revoked = active
+            self._refreshed_at = time.monotonic()
+
+    def _refresh_due(self) -> bool:
+        return (
+            self.revocations is not None
+            and (self._refreshed_at is None or time.monotonic() - self._refreshed_at >= self.refresh_seconds)
+        )
+
+    async def revoke(self, claims: dict):
+        jti = claims.get("jti")
+        if not jti:
+            raise ValueError("Token cannot be revoked")
+
+        if self.revocations is not None:
+            await self.revocations.revoke(jti, claims["exp"])
+        self._remember_revoked(jti, claims["exp"])
+
+    def _remember_revoked(self, jti: str, exp):
+        self._revoked[jti] = exp
+
+        # token ที่หมดอายุเองแล้วไม่ต้องจำว่า revoke
+        now = time.time()
+        if len(self._revoked) > self.cache_size:
+            self._revoked = {key: exp for key, exp in self._revoked.items() if exp > now}
+
+    def _decode(self, token: str) -> tuple:
+        try:
+            kid = jwt.get_unverified_header(token).get("kid", "default")
+            secret = self.auth.get_verification_key(kid)
+            if secret is None:
+                raise ValueError("Unknown signing key")
+
+            claims = jwt.decode(
+                token,
+                secret,
+                algorithms=self.algorithms,
+                options={"require": ["exp", "sub"]}
+            )
+            return kid, claims
+        except jwt.ExpiredSignatureError:
+            raise ValueError("Token has expired")
+        except jwt.PyJWTError:
+            raise ValueError("Invalid token")
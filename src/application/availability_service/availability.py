@@ -0,0 +1,260 @@
+from domain.interfaces.database import (
+    BookingRepositoryInterface,
+    StoreBusinessHourRepositoryInterface,
+    ServiceRepositoryInterface
+)
+
+from domain.model_entities.database import (
+    StoreBusinessHour
+)
+
+from typing import Optional, List
+
+from datetime import datetime, date, time, timedelta
+import asyncio
+import os
+from time import monotonic
+
+from utils.interval_index import IntervalIndex
+from utils.get_currecnt_date import my_date_now
+
+DEFAULT_OPEN_TIME = time.fromisoformat(os.getenv('DEFAULT_OPEN_TIME', '09:00'))
+DEFAULT_CLOSE_TIME = time.fromisoformat(os.getenv('DEFAULT_CLOSE_TIME', '18:00'))
+DEFAULT_SLOT_MINUTES = int(os.getenv('DEFAULT_SLOT_MINUTES', '30'))
+AVAILABILITY_INDEX_TTL_SECONDS = float(os.getenv('AVAILABILITY_INDEX_TTL_SECONDS', '60'))
+
+# booking ที่ยกเลิกแล้วไม่กินเวลาในตาราง
+INACTIVE_BOOKING_STATUSES = {"cancel"}
+
+
+class StoreAvailabilityIndex:
+    # index ช่วงเวลาที่ถูกจองแยกตามร้าน อยู่ใน memory ของ worker
+    # โหลดเต็มครั้งแรกที่ถูกถาม แล้วอัปเดตทีละ booking ตอน create/edit/remove
+    # TTL มีไว้ให้ข้อมูลที่ worker อื่นเขียนตามมาทันในที่สุด
+    def __init__(self, ttl_seconds: float = AVAILABILITY_INDEX_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._stores = {} # store_id -> IntervalIndex
+        self._loaded_at = {} # store_id -> monotonic time
+        self._stores_of_booking = {} # booking_id -> set ของ store_id
+        self._locks = {}
+
+    def is_fresh(self, store_id: str) -> bool:
+        loaded_at = self._loaded_at.get(store_id)
+        if loaded_at is None:
+            return False
+        return monotonic() - loaded_at < self.ttl_seconds
+
+    def invalidate(self, store_id: str):
+        # ให้โหลดใหม่ทั้งร้านตอนถูกถามครั้งถัดไป
+        self._loaded_at.pop(store_id, None)
+
+    def lock(self, store_id: str) -> asyncio.Lock:
+        if store_id not in self._locks:
+            self._locks[store_id] = asyncio.Lock()
+        return self._locks[store_id]
+
+    def load(self, store_id: str, rows: list):
+        old_index = self._stores.get(store_id)
+        if old_index is not None:
+            for booking_id in old_index.keys():
+                self._forget(booking_id, store_id)
+
+        index = IntervalIndex()
+        for booking_id, booking_time, total_minutes, status in rows:
+            if booking_time is None or status in INACTIVE_BOOKING_STATUSES:
+                continue
+            index.add(booking_id, booking_time, booking_time + timedelta(minutes=total_minutes or 0))
+            self._stores_of_booking.setdefault(booking_id, set()).add(store_id)
+
+        self._stores[store_id] = index
+        self._loaded_at[store_id] = monotonic()
+
+    def apply(self, booking_id: str, rows: list):
+        # rows มาจาก find_intervals_by_id: (store_id, booking_time, total_minutes, status)
+        self.discard(booking_id)
+
+        for store_id, booking_time, total_minutes, status in rows:
+            index = self._stores.get(store_id)
+            # ร้านที่ยังไม่เคยโหลด ไม่ต้องทำอะไร เดี๋ยวโหลดเต็มตอนถูกถาม
+            if index is None or booking_time is None or status in INACTIVE_BOOKING_STATUSES:
+                continue
+            index.add(booking_id, booking_time, booking_time + timedelta(minutes=total_minutes or 0))
+            self._stores_of_booking.setdefault(booking_id, set()).add(store_id)
+
+    def discard(self, booking_id: str):
+        for store_id in self._stores_of_booking.pop(booking_id, set()):
+            index = self._stores.get(store_id)
+            if index is not None:
+                index.discard(booking_id)
+
+    def overlapping(self, store_id: str, lo: datetime, hi: datetime) -> list:
+        index = self._stores.get(store_id)
+        if index is None:
+            return []
+        return index.overlapping(lo, hi)
+
+    def _forget(self, booking_id: str, store_id: str):
+        stores = self._stores_of_booking.get(booking_id)
+        if stores is None:
+            return
+        stores.discard(store_id)
+        if not stores:
+            del self._stores_of_booking[booking_id]
+
+
+availability_index = StoreAvailabilityIndex()
+
+
+class AvailabilityService:
+    def __init__(
+            self,
+            booking_repo: BookingRepositoryInterface,
+            business_hour_repo: StoreBusinessHourRepositoryInterface,
+            service_repo: ServiceRepositoryInterface,
+            index: StoreAvailabilityIndex = availability_index
+        ):
+        self.booking_repo = booking_repo
+        self.business_hour_repo = business_hour_repo
+        self.service_repo = service_repo
+        self.index = index
+
+    async def get_available_slots(
+            self,
+            store_id: str,
+            day: str,
+            service_id: Optional[str] = None,
+            slot_minutes: Optional[int] = None
+        ) -> dict:
+
+        if store_id is None:
+            raise ValueError("store_id must be provided")
+
+        try:
+            day = date.fromisoformat(day)
+        except (TypeError, ValueError):
+            raise ValueError("date must be in YYYY-MM-DD format")
+
+        if service_id is not None:
+            service = await self.service_repo.find_by_id(service_id)
+            if service is None or service["store_id"] != store_id:
+                raise ValueError("service_id is incorrect for this store")
+            slot_minutes = service["duration_minutes"]
+
+        slot_minutes = int(slot_minutes or DEFAULT_SLOT_MINUTES)
+        if slot_minutes <= 0:
+            raise ValueError("slot_minutes must be greater than 0")
+
+        open_time, close_time, is_closed = await self._get_hours_of_day(store_id, day.weekday())
+
+        response = {
+            "store_id": store_id,
+            "date": day.isoformat(),
+            "open_time": open_time,
+            "close_time": close_time,
+            "slot_minutes": slot_minutes,
+            "free": [],
+            "slots": []
+        }
+
+        if is_closed:
+            return response
+
+        day_start = datetime.combine(day, open_time)
+        day_end = datetime.combine(day, close_time)
+
+        # ห้ามจองตอน อดีต
+        now = my_date_now()
+        if now > day_start:
+            day_start = now.replace(second=0, microsecond=0)
+        if day_start >= day_end:
+            return response
+
+        await self._ensure_loaded(store_id)
+        busy = self.index.overlapping(store_id, day_start, day_end)
+
+        free = self._free_ranges(day_start, day_end, busy)
+        duration = timedelta(minutes=slot_minutes)
+
+        for start, end in free:
+            response["free"].append({"start": start, "end": end})
+
+            slot_start = start
+            while slot_start + duration <= end:
+                response["slots"].append({"start": slot_start, "end": slot_start + duration})
+                slot_start += duration
+
+        return response
+
+    async def get_business_hours(self, store_id: str) -> List[dict]:
+        if store_id is None:
+            raise ValueError("store_id must be provided")
+
+        business_hours = await self.business_hour_repo.find_by_store_id(store_id)
+        return [business_hour.to_dict() for business_hour in business_hours]
+
+    async def set_business_hours(self, store_id: str, business_hours: List[dict]) -> List[dict]:
+        if store_id is None:
+            raise ValueError("store_id must be provided")
+
+        new_business_hours = []
+        for item in business_hours:
+            weekday = item.get("weekday")
+            if weekday not in range(7):
+                raise ValueError("weekday must be between 0 (Monday) and 6 (Sunday)")
+
+            is_closed = bool(item.get("is_closed", False))
+            try:
+                open_time = time.fromisoformat(item["open_time"]) if item.get("open_time") else None
+                close_time = time.fromisoformat(item["close_time"]) if item.get("close_time") else None
+            except ValueError:
+                raise ValueError("open_time and close_time must be in HH:MM format")
+
+            if not is_closed and (open_time is None or close_time is None or open_time >= close_time):
+                raise ValueError("open_time must be before close_time")
+
+            new_business_hours.append(StoreBusinessHour(
+                store_id=store_id,
+                weekday=weekday,
+                open_time=open_time,
+                close_time=close_time,
+                is_closed=is_closed
+            ))
+
+        response = [business_hour.to_dict() for business_hour in new_business_hours]
+        await self.business_hour_repo.replace_all(store_id, new_business_hours)
+        return response
+
+    async def _get_hours_of_day(self, store_id: str, weekday: int) -> tuple:
+        business_hour = await self.business_hour_repo.find_by_weekday(store_id, weekday)
+        if business_hour is None:
+            return DEFAULT_OPEN_TIME, DEFAULT_CLOSE_TIME, False
+        return business_hour.open_time, business_hour.close_time, bool(business_hour.is_closed)
+
+    async def _ensure_loaded(self, store_id: str):
+        if self.index.is_fresh(store_id):
+            return
+
+        async with self.index.lock(store_id):
+            # request อื่นอาจโหลดให้แล้วระหว่างรอ lock
+            if self.index.is_fresh(store_id):
+                return
+            rows = await self.booking_repo.find_intervals_by_store_id(store_id)
+            self.index.load(store_id, rows)
+
+    @staticmethod
+    def _free_ranges(lo: datetime, hi: datetime, busy: list) -> list:
+        free = []
+        cursor = lo
+
+        for start, end in sorted(busy):
+            if start > cursor:
+                free.append((cursor, min(start, hi)))
+            if end > cursor:
+                cursor = end
+            if cursor >= hi:
+                break
+
+        if cursor < hi:
+            free.append((cursor, hi))
+
+        return free
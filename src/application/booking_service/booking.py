@@ -6,8 +6,7 @@ from domain.interfaces.database import (
 )
 
 from domain.model_entities.database import (
-    Booking,
-    BookingService as BS
+    Booking
 )
 
 from typing import Optional, List
@@ -16,17 +15,20 @@ from uuid import uuid4
 
 from utils.convert_str_2_date import str_2_date
 from utils.get_currecnt_date import my_date_now
+from utils.batch import unique_ids, batch_items
 
 class BookingService:
     def __init__(
             self,
             booking_repo,
             user_rero,
-            booking_service_repo
+            booking_service_repo,
+            availability_index=None
         ):
         self.booking_repo = booking_repo
         self.user_repo = user_rero
         self.booking_service_repo = booking_service_repo
+        self.availability_index = availability_index # index ช่วงเวลาว่างของร้าน (ถ้ามี)
 
     async def create_booking(
             self,
@@ -35,18 +37,23 @@ class BookingService:
             note: str,
 
             user_id: str,
-            service_id: str
+            service_ids: List[str]
 
         ) -> Optional[Booking]:
-        
 
-        if await self.user_repo.find_by_id(user_id) is None:
-            print("ไม่สามารถสร้าง booking หากไม่มี user หรือกรอก user_id ผิด")
-            return None
+        if isinstance(service_ids, str):
+            service_ids = [service_ids]
 
+        # ตัด service_id ซ้ำออกแต่คงลำดับเดิม
+        service_ids = list(dict.fromkeys(service_ids or []))
+        if not service_ids:
+            raise ValueError("service_id must be provided")
 
         id = str(uuid4())
-        booking_time = str_2_date(booking_time)
+        booking_time = str_2_date(booking_time) if booking_time else None
+
+        if booking_time is None:
+            raise ValueError("booking_time must be in ISO format")
 
         # ห้ามจองตอน อดีต
         if booking_time < my_date_now():
@@ -63,45 +70,117 @@ class BookingService:
 
         )
 
-        await self.booking_repo.save(new_booking)
-
-        new_booking_service = BS(
-            booking_id=id,
-            service_id=service_id
-        )
-
-        await self.booking_service_repo.save(new_booking_service)
+        # insert booking (เช็ค user ใน statement เดียวกัน) + insert bookings_services ใน transaction เดียว
+        # ไม่มี user ตาม user_id ได้ None เหมือนเดิม
+        saved_booking = await self.booking_repo.save_with_services(new_booking, service_ids)
+        if saved_booking is None:
+            return None
 
-        fetched_booking = await self.booking_repo.find_by_id(id)
+        await self._refresh_availability(id)
         
-        return fetched_booking
+        return saved_booking
 
-    async def get_bookings(self, user_id: str) -> List[Booking]:
+    async def get_bookings(self, user_id: str) -> List[dict]:
         if user_id is None:
             raise ValueError("user_id must be provided")
         
-        bookings = await self.booking_repo.get_all(user_id)
+        return await self.booking_repo.get_all(user_id)
 
-        return [booking.to_dict() for booking in bookings]
+    async def get_bookings_page(self, user_id: str, limit: int, cursor: Optional[str] = None) -> dict:
+        if user_id is None:
+            raise ValueError("user_id must be provided")
+
+        bookings, next_cursor = await self.booking_repo.get_page(user_id, limit, cursor)
+
+        return {
+            "items": bookings,
+            "next_cursor": next_cursor
+        }
+
+    async def stream_bookings(self, user_id: str):
+        async for booking in self.booking_repo.stream_all(user_id):
+            yield booking
     
     async def get_booking_by_id(self, id: str) -> Optional[Booking]:
         booking = await self.booking_repo.find_by_id(id)
         return booking
     
-    async def get_booking_by_store_id(self, store_id: str) -> list:
-        appointments = await self.booking_repo.find_by_store_id(store_id)
-        return appointments
+    async def get_booking_by_store_id(self, store_id: str, start: str = None, end: str = None) -> list:
+        if store_id is None:
+            raise ValueError("store_id must be provided")
+
+        start_time = str_2_date(start) if start else None
+        end_time = str_2_date(end) if end else None
+        if (start and start_time is None) or (end and end_time is None):
+            raise ValueError("from/to must be in ISO format")
+
+        appointments = await self.booking_repo.find_appointments_by_store_id(store_id, start_time, end_time)
+        return [appointment.to_dict() for appointment in appointments]
         
     async def edit_by_id(self, booking_id:str, update_data:dict) -> Optional[Booking]:
+        if isinstance(update_data.get("booking_time"), str):
+            booking_time = str_2_date(update_data["booking_time"])
+            if booking_time is None:
+                raise ValueError("booking_time must be in ISO format")
+            update_data = {**update_data, "booking_time": booking_time}
+
         booking = await self.booking_repo.update_by_id(booking_id, update_data)
+        await self._refresh_availability(booking_id)
         return booking
     
+    async def edit_status_by_ids(self, items: List[dict]) -> List[dict]:
+        # items: [{"booking_id": ..., "status": ...}]
+        statuses = {}
+        for item in batch_items(items, "bookings"):
+            booking_id = item.get("booking_id")
+            status = item.get("status")
+            if not isinstance(booking_id, str) or not booking_id or not isinstance(status, str) or not status:
+                raise ValueError("booking_id and status must be provided")
+            if booking_id in statuses:
+                raise ValueError("booking_id must not be repeated")
+            statuses[booking_id] = status
+
+        bookings = await self.booking_repo.update_status_by_ids(statuses)
+        await self._refresh_availability_many(list(statuses))
+
+        position = {booking_id: index for index, booking_id in enumerate(statuses)}
+        return sorted(bookings, key=lambda booking: position[booking["id"]])
+
     async def remove_by_id(self, booking_id: str):
-        try:
-            # ลบ BookingService ก่อน
-            await self.booking_service_repo.delete_by_booking_id(booking_id)
-
-            # ลบ Booking หลัก
-            return await self.booking_repo.delete_by_id(booking_id)
-        except Exception as e:
-            raise e
\ No newline at end of file
+        # BookingService ลบตามด้วย ON DELETE CASCADE (statement เดียวกับ Booking หลัก)
+        booking = await self.booking_repo.delete_by_id(booking_id)
+
+        if self.availability_index is not None:
+            self.availability_index.discard(booking_id)
+
+        return booking
+
+    async def remove_by_ids(self, booking_ids: List[str]) -> List[Booking]:
+        booking_ids = unique_ids(booking_ids, "booking_ids")
+
+        # id ที่ไม่มีอยู่จะไม่อยู่ในผลลัพธ์
+        bookings = await self.booking_repo.delete_by_ids(booking_ids)
+
+        if self.availability_index is not None:
+            for booking in bookings:
+                self.availability_index.discard(booking.id)
+
+        return bookings
+
+    async def _refresh_availability(self, booking_id: str):
+        if self.availability_index is None:
+            return
+
+        rows = await self.booking_repo.find_intervals_by_id(booking_id)
+        self.availability_index.apply(booking_id, rows)
+
+    async def _refresh_availability_many(self, booking_ids: List[str]):
+        if self.availability_index is None:
+            return
+
+        rows_of_booking = {booking_id: [] for booking_id in booking_ids}
+        for booking_id, *row in await self.booking_repo.find_intervals_by_ids(booking_ids):
+            rows_of_booking[booking_id].append(tuple(row))
+
+        for booking_id, rows in rows_of_booking.items():
+            self.availability_index.apply(booking_id, rows)
\ No newline at end of file
@@ -0,0 +1,108 @@
+from domain.interfaces.database import (
+    BulkImportRepositoryInterface
+)
+
+from datetime import datetime
+from uuid import uuid4
+import os
+
+IMPORT_BATCH_SIZE = int(os.getenv('IMPORT_BATCH_SIZE', '5000'))
+DEFAULT_BOOKING_STATUS = "not confirm"
+
+
+def _text(value):
+    # xlsx ให้ cell ตัวเลขมาเป็น int/float แต่ COPY ลงคอลัมน์ text รับแค่ str
+    return None if value is None else str(value)
+
+
+class ImportService:
+    def __init__(
+            self,
+            import_repo: BulkImportRepositoryInterface,
+            availability_index=None
+        ):
+        self.import_repo = import_repo
+        self.availability_index = availability_index
+
+    async def import_users(self, rows) -> dict:
+        # rows มาจาก utils.tabular_reader.read_rows_async (async iterator)
+        report = {"total": 0, "imported": 0, "errors": []}
+
+        def to_record(row_no: int, row: dict):
+            user_id = str(row.get("user_id") or row.get("id") or "").strip()
+            if not user_id:
+                raise ValueError("user_id is required")
+            return (row_no, user_id, _text(row.get("user_name")), _text(row.get("tel")))
+
+        result = await self.import_repo.import_users(self._batches(rows, to_record, report))
+        return self._finish(report, result)
+
+    async def import_bookings(self, store_id: str, rows) -> dict:
+        if not store_id:
+            raise ValueError("store_id must be provided")
+
+        report = {"total": 0, "imported": 0, "errors": []}
+
+        def to_record(row_no: int, row: dict):
+            user_id = str(row.get("user_id") or "").strip()
+            if not user_id:
+                raise ValueError("user_id is required")
+
+            try:
+                booking_time = datetime.fromisoformat(str(row.get("booking_time") or ""))
+            except ValueError:
+                raise ValueError("booking_time must be in ISO format")
+
+            service_ids = row.get("service_ids") or row.get("service_id") or []
+            if isinstance(service_ids, str):
+                service_ids = service_ids.split("|")
+            service_ids = [str(service_id).strip() for service_id in service_ids if str(service_id).strip()]
+            if not service_ids:
+                raise ValueError("service_id is required")
+
+            # ข้อมูลย้อนหลังจากระบบเก่า จึงไม่บังคับว่า booking_time ต้องเป็นอนาคต
+            return (
+                row_no,
+                str(row.get("booking_id") or row.get("id") or uuid4()),
+                user_id,
+                booking_time,
+                _text(row.get("status")) or DEFAULT_BOOKING_STATUS,
+                _text(row.get("note")),
+                service_ids
+            )
+
+        result = await self.import_repo.import_bookings(store_id, self._batches(rows, to_record, report))
+
+        if self.availability_index is not None:
+            self.availability_index.invalidate(store_id)
+
+        return self._finish(report, result)
+
+    @staticmethod
+    async def _batches(rows, to_record, report: dict):
+        batch = []
+        async for row_no, row, error in rows:
+            report["total"] += 1
+
+            if error is None:
+                try:
+                    batch.append(to_record(row_no, row))
+                except ValueError as e:
+                    error = str(e)
+
+            if error is not None:
+                report["errors"].append({"row": row_no, "error": error})
+
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                yield batch
+                batch = []
+
+        if batch:
+            yield batch
+
+    @staticmethod
+    def _finish(report: dict, result: dict) -> dict:
+        report["imported"] = result["imported"]
+        report["errors"].extend(result["errors"])
+        report["errors"].sort(key=lambda error: error["row"])
+        return report
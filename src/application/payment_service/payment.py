@@ -12,77 +12,193 @@ from domain.model_entities.database import (
 from typing import Optional, List
 
 from uuid import uuid4
+from datetime import timedelta
+from hashlib import sha256
+import logging
+import mimetypes
+import os
+import time
 
 from utils.get_currecnt_date import my_date_now
+from utils.lru import LRUCache
+
+MAX_SLIP_BYTES = int(os.getenv('MAX_SLIP_BYTES', str(10 * 1024 * 1024)))
+SLIP_CHUNK_SIZE = int(os.getenv('SLIP_CHUNK_SIZE', str(64 * 1024)))
+ALLOWED_SLIP_CONTENT_TYPES = {"image/jpeg", "image/png", "image/webp", "image/heic"}
+SLIP_INDEX_SIZE = int(os.getenv('SLIP_INDEX_SIZE', '10000'))
+# upload ลงชื่อชั่วคราวใต้ prefix นี้ก่อน รู้ hash แล้วค่อย move เป็นชื่อจริง
+SLIP_PENDING_PREFIX = os.getenv('SLIP_PENDING_PREFIX', 'pending/')
+
+# sha256 ของสลิป -> URL ใน storage (ต่อ worker)
+slip_url_index = LRUCache(SLIP_INDEX_SIZE)
+
+logger = logging.getLogger(__name__)
 
 class PaymentService:
     def __init__(
             self,
             payment_repo: PaymentRepositoryInterface,
             supabase_instance: SupabaseInterface,
-            booking_repo: BookingRepositoryInterface
+            booking_repo: BookingRepositoryInterface,
+            expiry_scheduler=None,
+            slip_index: Optional[LRUCache] = None
         ):
         self.payment_repo = payment_repo
         self.supabase_instance = supabase_instance
         self.booking_repo = booking_repo
+        self.expiry_scheduler = expiry_scheduler # ตัวจับเวลา payment หมดอายุ (ถ้ามี)
+        self.slip_index = slip_index # hash -> URL ของสลิปที่เคยเก็บแล้ว (ถ้ามี)
 
     async def create_payment(
             self,
             amount: float,
-            slip: bytes, # เป็น base64 จากนั้นจะกลายเป็น supabase url
+            slip, # ไฟล์ที่มี async read(size)/seek(0) เช่น UploadFile จะถูก stream ขึ้น supabase
             file_name: str, # ต้องรับมาเพิ่ม
-            booking_id: str
+            content_type: str,
+            booking_id: str,
+            slip_size: Optional[int] = None,
+            slip_digest: Optional[str] = None # sha256 ของเนื้อสลิป ถ้ารู้แล้ว (UploadLimitMiddleware hash ระหว่างรับ body)
 
         ) -> Optional[Payment]:
 
+        # request ผ่าน HTTP ถูก UploadLimitMiddleware ตัดไปแล้วตั้งแต่ header ของ part (ก่อน spool)
+        # ตรงนี้กันกรณีเรียก service จากที่อื่น
+        if content_type not in ALLOWED_SLIP_CONTENT_TYPES:
+            raise ValueError(f"slip content type must be one of {sorted(ALLOWED_SLIP_CONTENT_TYPES)}")
+        if slip_size is not None and slip_size > MAX_SLIP_BYTES:
+            raise ValueError(f"slip must not be larger than {MAX_SLIP_BYTES} bytes")
+
         id = str(uuid4())
 
         if await self.booking_repo.find_by_id(booking_id) is None:
             raise ValueError("booking_id is None or incorrect")
 
-        #base64 to supabase here
-        supabase_env_dict = await self.supabase_instance.get_all_env()
-        supabase_url = supabase_env_dict["SUPABASE_URL"]
-        supabase_anon_key = supabase_env_dict["SUPABASE_ANON_KEY"]
-        bucket_name = supabase_env_dict["BUCKET_NAME"]
-        storage_path = supabase_env_dict["STORAGE_PATH"]
-        
-        file_ext = file_name.split(".")[1]
-        file_name = f"{uuid4()}.{file_ext}"
+        image_url = await self._store_slip(slip, file_name, content_type, slip_size, slip_digest)
 
-
-        await self.supabase_instance.upload_image(
-            supabase_url,
-            supabase_anon_key,
-            bucket_name,
-            storage_path,
-            slip, # คือ file_data
-            file_name
-        )
-
-        image_url = await self.supabase_instance.get_image_url(
-            supabase_url,
-            supabase_anon_key,
-            bucket_name,
-            storage_path,
-            file_name
-        )
+        expiry_minutes = await self.payment_repo.find_expiry_minutes_by_booking_id(booking_id)
+        expires_at = my_date_now() + timedelta(minutes=expiry_minutes)
 
         new_payment = Payment(
             id=id,
             amount=amount,
             slip=image_url,
+            expires_at=expires_at,
 
             booking_id = booking_id
 
         )
         
-        return await self.payment_repo.save(new_payment)
+        payment = await self.payment_repo.save(new_payment)
 
-    async def get_payments(self) -> List[Payment]:
-        payments = await self.payment_repo.get_all()
+        if self.expiry_scheduler is not None:
+            self.expiry_scheduler.schedule(id, expires_at)
 
-        return [payment.to_dict() for payment in payments]
+        return payment
+
+    async def _store_slip(self, slip, file_name: str, content_type: str, slip_size: Optional[int], digest: Optional[str] = None) -> str:
+        supabase_env_dict = await self.supabase_instance.get_all_env()
+        env = (
+            supabase_env_dict["SUPABASE_URL"],
+            supabase_env_dict["SUPABASE_ANON_KEY"],
+            supabase_env_dict["BUCKET_NAME"],
+            supabase_env_dict["STORAGE_PATH"]
+        )
+
+        # ชื่อไฟล์ใน storage = sha256 ของเนื้อไฟล์ สลิปเดิมที่ลูกค้าส่งซ้ำจึงได้ key เดิมเสมอ
+        file_ext = mimetypes.guess_extension(content_type) or os.path.splitext(file_name or "")[1]
+
+        if digest is None:
+            # ไม่รู้ hash ล่วงหน้า (เรียกจากนอก HTTP): upload ใต้ชื่อชั่วคราวแล้วค่อย move
+            return await self._store_slip_unhashed(slip, file_ext, content_type, slip_size, env)
+
+        file_name = f"{digest}{file_ext}"
+        image_url = await self._find_stored_slip(digest, file_name, env)
+        if image_url is not None:
+            # สลิปซ้ำ ไม่ต้อง upload
+            logger.debug("Slip %s already stored, skip upload", file_name)
+            return image_url
+
+        await self._upload(slip, file_name, content_type, slip_size, env, None)
+        return await self._remember_slip(digest, file_name, env)
+
+    async def _store_slip_unhashed(self, slip, file_ext: str, content_type: str, slip_size: Optional[int], env: tuple) -> str:
+        pending_name = f"{SLIP_PENDING_PREFIX}{uuid4()}{file_ext}"
+        digest = sha256()
+        await self._upload(slip, pending_name, content_type, slip_size, env, digest)
+
+        digest = digest.hexdigest()
+        file_name = f"{digest}{file_ext}"
+
+        # move คืน False เฉพาะเมื่อปลายทางมีอยู่แล้ว (สลิปซ้ำ / อีก request ย้ายไปก่อน) error อื่น raise
+        if await self._find_stored_slip(digest, file_name, env) is not None \
+                or not await self.supabase_instance.move_object(*env, pending_name, file_name):
+            logger.debug("Slip %s already stored, drop %s", file_name, pending_name)
+            await self.supabase_instance.delete_object(*env, pending_name)
+
+        return await self._remember_slip(digest, file_name, env)
+
+    async def _find_stored_slip(self, digest: str, file_name: str, env: tuple) -> Optional[str]:
+        image_url = self.slip_index.get(digest) if self.slip_index is not None else None
+        if image_url is None and await self.supabase_instance.object_exists(*env, file_name):
+            image_url = await self._remember_slip(digest, file_name, env)
+        return image_url
+
+    async def _remember_slip(self, digest: str, file_name: str, env: tuple) -> str:
+        image_url = await self.supabase_instance.get_image_url(*env, file_name)
+        if self.slip_index is not None:
+            self.slip_index.put(digest, image_url)
+        return image_url
+
+    async def _upload(self, slip, file_name: str, content_type: str, slip_size: Optional[int], env: tuple, digest):
+        stats = {"bytes": 0}
+        started = time.perf_counter()
+
+        await self.supabase_instance.upload_stream(
+            *env,
+            self._read_chunks(slip, stats, digest),
+            file_name,
+            content_type,
+            slip_size
+        )
+
+        elapsed = time.perf_counter() - started
+        # memory ต่อ upload วัดด้วย benchmarks.slip_upload (tracemalloc) ไม่ได้ประมาณจากขนาด chunk
+        logger.info(
+            "Slip upload %s: %d bytes in %.3fs (%.1f KiB/s)",
+            file_name, stats["bytes"], elapsed, stats["bytes"] / elapsed / 1024 if elapsed else 0.0
+        )
+
+    @staticmethod
+    async def _read_chunks(slip, stats: dict, digest):
+        # อ่านจาก spool ทีละ chunk ส่งต่อเลย ไม่มีทั้งไฟล์อยู่ใน memory พร้อมกัน
+        # digest (ถ้ามี) hash ไปพร้อมกันระหว่างส่ง ไม่ต้องอ่านไฟล์รอบสอง
+        while True:
+            chunk = await slip.read(SLIP_CHUNK_SIZE)
+            if not chunk:
+                break
+
+            stats["bytes"] += len(chunk)
+            if stats["bytes"] > MAX_SLIP_BYTES:
+                raise ValueError(f"slip must not be larger than {MAX_SLIP_BYTES} bytes")
+
+            if digest is not None:
+                digest.update(chunk)
+            yield chunk
+
+    async def get_payments(self) -> List[dict]:
+        return await self.payment_repo.get_all()
+
+    async def get_payments_page(self, limit: int, cursor: Optional[str] = None) -> dict:
+        payments, next_cursor = await self.payment_repo.get_page(limit, cursor)
+
+        return {
+            "items": payments,
+            "next_cursor": next_cursor
+        }
+
+    async def stream_payments(self):
+        async for payment in self.payment_repo.stream_all():
+            yield payment
     
     async def get_payment_by_id(self, id: str) -> Optional[Payment]:
         payment = await self.payment_repo.find_by_id(id)
@@ -90,19 +206,16 @@ class PaymentService:
     
     async def edit_status_by_id(self, payment_id:str, update_data:dict) -> Optional[Payment]:
 
-        print("หมดอายุยัง", await self.payment_repo.is_expired(payment_id))
-
-        if await self.payment_repo.is_expired(payment_id):
-            raise ValueError("Payment has expired and cannot be processed.")
-
         all_key = update_data.keys()
         if set(all_key) != {"payment_id", "payment_status"}:
             raise ValueError("You must update only payment_status")
-        
-        # ปรับ pait_at อัตโนมัติ
-        update_data["paid_at"] = my_date_now()
 
-        payment = await self.payment_repo.update_status_by_id(payment_id, update_data)
+        # เช็คหมดอายุอยู่ใน UPDATE ของ repository แล้ว (หมดอายุ = ValueError)
+        # ปรับ pait_at อัตโนมัติ
+        payment = await self.payment_repo.update_status_by_id(
+            payment_id,
+            {"payment_status": update_data["payment_status"], "paid_at": my_date_now()}
+        )
 
         return payment
     
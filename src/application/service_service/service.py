@@ -12,14 +12,18 @@ from typing import Optional, List
 
 from uuid import uuid4
 
+from utils.batch import unique_ids, batch_items
+
 class ServiceService:
     def __init__(
             self,
             service_repo: ServiceRepositoryInterface,
-            store_repo: StoreRepositoryInterface
+            store_repo: StoreRepositoryInterface,
+            availability_index=None
         ):
         self.service_repo = service_repo
         self.store_repo = store_repo
+        self.availability_index = availability_index # duration ของ service กำหนดช่วงเวลาของ booking ใน index
 
     async def create_service(
             self,
@@ -52,15 +56,28 @@ class ServiceService:
         
         return await self.service_repo.save(new_service)
 
-    async def get_services(self, store_id: str) -> List[Service]:
+    async def get_services(self, store_id: str) -> List[dict]:
         if store_id is None:
             raise ValueError("store_id must be provided")
         
-        services = await self.service_repo.get_all(store_id)
+        return await self.service_repo.get_all(store_id)
 
-        return [service.to_dict() for service in services]
+    async def get_services_page(self, store_id: str, limit: int, cursor: Optional[str] = None) -> dict:
+        if store_id is None:
+            raise ValueError("store_id must be provided")
+
+        services, next_cursor = await self.service_repo.get_page(store_id, limit, cursor)
+
+        return {
+            "items": services,
+            "next_cursor": next_cursor
+        }
+
+    async def stream_services(self, store_id: str):
+        async for service in self.service_repo.stream_all(store_id):
+            yield service
     
-    async def get_service_by_id(self, id: str) -> Optional[Service]:
+    async def get_service_by_id(self, id: str) -> Optional[dict]:
         service = await self.service_repo.find_by_id(id)
         return service
     
@@ -79,10 +96,74 @@ class ServiceService:
         return [service_id for service_id in service_ids]
 
 
+    async def get_services_by_ids(self, service_ids: List[str]) -> List[dict]:
+        service_ids = unique_ids(service_ids, "ids")
+        services = await self.service_repo.find_by_ids(service_ids)
+
+        # เรียงตามลำดับที่ขอมา id ที่ไม่เจอไม่อยู่ในผลลัพธ์
+        position = {service_id: index for index, service_id in enumerate(service_ids)}
+        return sorted(services, key=lambda service: position[service["id"]])
+
+    async def get_services_id_by_titles(self, titles: List[str]) -> dict:
+        titles = unique_ids(titles, "titles")
+        return await self.service_repo.find_services_id_by_titles(titles)
+
+    async def create_services(self, items: List[dict]) -> List[Service]:
+        items = batch_items(items, "services")
+
+        new_services = [
+            Service(
+                id=str(uuid4()),
+                title=item.get("title"),
+                duration_minutes=item.get("duration_minutes"),
+                prices=item.get("prices"),
+                description=item.get("description"),
+
+                store_id=item.get("store_id")
+            )
+            for item in items
+        ]
+        if any(not service.store_id for service in new_services):
+            raise ValueError("store_id must be provided")
+
+        return await self.service_repo.save_many(new_services)
+
+    async def edit_many(self, items: List[dict]) -> List[dict]:
+        items = batch_items(items, "services")
+
+        service_ids = [item.get("service_id") for item in items]
+        if unique_ids(service_ids, "service_id") != service_ids:
+            raise ValueError("service_id must not be repeated")
+
+        moved_from = await self._store_ids_before_move(items)
+        services = await self.service_repo.update_many(items)
+        self._invalidate_availability(*moved_from, *(service["store_id"] for service in services))
+
+        position = {service_id: index for index, service_id in enumerate(service_ids)}
+        return sorted(services, key=lambda service: position[service["id"]])
+
     async def edit_by_id(self, service_id:str, update_data:dict) -> Optional[Service]:
+        moved_from = await self._store_ids_before_move([{**update_data, "service_id": service_id}])
         service = await self.service_repo.update_by_id(service_id, update_data)
+        if service is not None:
+            self._invalidate_availability(*moved_from, service.store_id)
         return service
     
     async def remove_by_id(self, service_id: str) -> Optional[Service]:
         service = await self.service_repo.delete_by_id(service_id)
-        return service
\ No newline at end of file
+        if service is not None:
+            self._invalidate_availability(service.store_id)
+        return service
+
+    async def _store_ids_before_move(self, items: List[dict]) -> set:
+        # ย้าย service ไปร้านอื่น booking ที่ใช้ service นี้หายไปจากตารางของร้านเดิมด้วย
+        service_ids = [item["service_id"] for item in items if "store_id" in item]
+        if self.availability_index is None or not service_ids:
+            return set()
+        return {service["store_id"] for service in await self.service_repo.find_by_ids(service_ids)}
+
+    def _invalidate_availability(self, *store_ids):
+        if self.availability_index is None:
+            return
+        for store_id in set(store_ids):
+            self.availability_index.invalidate(store_id)
\ No newline at end of file
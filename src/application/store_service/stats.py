@@ -0,0 +1,109 @@
+from domain.interfaces.database import (
+    StoreRepositoryInterface,
+    StoreStatsRepositoryInterface
+)
+
+from application.availability_service.availability import INACTIVE_BOOKING_STATUSES
+
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+
+DEFAULT_STATS_DAYS = 30
+MAX_STATS_DAYS = 366
+
+class StoreStatsService:
+    def __init__(
+            self,
+            stats_repo: StoreStatsRepositoryInterface,
+            store_repo: StoreRepositoryInterface
+        ):
+        self.stats_repo = stats_repo
+        self.store_repo = store_repo
+
+    async def get_stats(self, store_id: str, start: str = None, end: str = None) -> Optional[dict]:
+        start_day, end_day = self._parse_range(start, end)
+
+        if await self.store_repo.find_by_id(store_id) is None:
+            return None
+
+        # ช่วงเวลาปัดเป็นวันเต็ม [start_day, end_day) เพื่อให้ request ในวันเดียวกันใช้ cache ก้อนเดียวกัน
+        stats = await self.stats_repo.get_stats(
+            store_id,
+            datetime.combine(start_day, time.min),
+            datetime.combine(end_day, time.min),
+            INACTIVE_BOOKING_STATUSES
+        )
+
+        revenue_per_day = [
+            {"date": day, "revenue": revenue or 0.0, "payments": count}
+            for day, revenue, count in stats["revenue_per_day"]
+        ]
+
+        return {
+            "store_id": store_id,
+            "from": start_day,
+            "to": end_day,
+            "revenue": {
+                "total": sum(item["revenue"] for item in revenue_per_day),
+                "per_day": revenue_per_day
+            },
+            "bookings_per_status": {status: count for status, count in stats["bookings_per_status"]},
+            "popular_services": [
+                {"service_id": service_id, "title": title, "bookings": count, "revenue": revenue or 0.0}
+                for service_id, title, count, revenue in stats["popular_services"]
+            ],
+            "utilization": self._utilization(
+                start_day,
+                end_day,
+                dict(stats["booked_minutes_per_day"]),
+                stats["business_hours"]
+            )
+        }
+
+    @staticmethod
+    def _parse_range(start: str, end: str) -> tuple:
+        try:
+            end_day = date.fromisoformat(end) if end else date.today() + timedelta(days=1)
+            start_day = date.fromisoformat(start) if start else end_day - timedelta(days=DEFAULT_STATS_DAYS)
+        except ValueError:
+            raise ValueError("from/to must be dates in YYYY-MM-DD format")
+
+        if start_day >= end_day:
+            raise ValueError("from must be before to")
+        if (end_day - start_day).days > MAX_STATS_DAYS:
+            raise ValueError(f"range must not exceed {MAX_STATS_DAYS} days")
+
+        return start_day, end_day
+
+    @staticmethod
+    def _utilization(start_day: date, end_day: date, booked_minutes: dict, business_hours: list) -> dict:
+        # นาทีที่ถูกจอง / นาทีที่ร้านเปิด ต่อวัน (ร้านที่ยังไม่ตั้งเวลาเปิดปิด ratio = None)
+        open_minutes_by_weekday = {}
+        for weekday, open_time, close_time, is_closed in business_hours:
+            if is_closed or open_time is None or close_time is None:
+                open_minutes_by_weekday[weekday] = 0
+                continue
+            opened = datetime.combine(date.min, close_time) - datetime.combine(date.min, open_time)
+            open_minutes_by_weekday[weekday] = max(opened.total_seconds() // 60, 0)
+
+        per_day = []
+        day = start_day
+        while day < end_day:
+            booked = booked_minutes.get(day) or 0
+            opened = open_minutes_by_weekday.get(day.weekday()) if business_hours else None
+            per_day.append({
+                "date": day,
+                "booked_minutes": booked,
+                "open_minutes": opened,
+                "ratio": booked / opened if opened else None
+            })
+            day += timedelta(days=1)
+
+        total_booked = sum(item["booked_minutes"] for item in per_day)
+        total_open = sum(item["open_minutes"] or 0 for item in per_day)
+        return {
+            "booked_minutes": total_booked,
+            "open_minutes": total_open if business_hours else None,
+            "ratio": total_booked / total_open if total_open else None,
+            "per_day": per_day
+        }
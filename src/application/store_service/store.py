@@ -23,10 +23,20 @@ class StoreService:
         new_store = Store(id=id, store_name=store_name, description=description)
         return await self.store_repo.save(new_store)
 
-    async def get_stores(self) -> List[Store]:
-        stores = await self.store_repo.get_all()
+    async def get_stores(self) -> List[dict]:
+        return await self.store_repo.get_all()
 
-        return [store.to_dict() for store in stores]
+    async def get_stores_page(self, limit: int, cursor: Optional[str] = None) -> dict:
+        stores, next_cursor = await self.store_repo.get_page(limit, cursor)
+
+        return {
+            "items": stores,
+            "next_cursor": next_cursor
+        }
+
+    async def stream_stores(self):
+        async for store in self.store_repo.stream_all():
+            yield store
     
     async def get_store_by_id(self, id: str) -> Optional[Store]:
         store = await self.store_repo.find_by_id(id)
@@ -28,7 +28,17 @@ class UserService:
         user = await self.user_repo.find_by_id(user_id)
         return user
     
-    async def get_users(self) -> List[User]:
-        users = await self.user_repo.get_all()
+    async def get_users(self) -> List[dict]:
+        return await self.user_repo.get_all()
 
-        return [user.to_dict() for user in users]
\ No newline at end of file
+    async def get_users_page(self, limit: int, cursor: Optional[str] = None) -> dict:
+        users, next_cursor = await self.user_repo.get_page(limit, cursor)
+
+        return {
+            "items": users,
+            "next_cursor": next_cursor
+        }
+
+    async def stream_users(self):
+        async for user in self.user_repo.stream_all():
+            yield user
@@ -0,0 +1,105 @@
+# seed ข้อมูลขนาดใกล้ของจริงลง DB ของ benchmark (ใช้ร่วมกันระหว่าง query_plans กับ api_load)
+# schema สร้างด้วย migration ตัวเดียวกับ production ไม่ใช่ create_all
+
+import random
+from datetime import datetime, time, timedelta
+from time import perf_counter
+from uuid import uuid4
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from adapter.external.database.appointment_projection import refresh_appointments
+from adapter.external.database.migrations.runner import upgrade
+from domain.model_entities.database import Base
+
+BOOKING_STATUSES = ["not confirm", "confirm", "done", "cancel"]
+PAYMENT_STATUSES = ["Paid"] * 7 + ["Pending"] + ["Expired"] * 2
+COPY_BATCH_SIZE = 50_000
+
+def add_seed_arguments(parser, stores: int, services_per_store: int, users: int, bookings: int):
+    parser.add_argument("--stores", type=int, default=stores)
+    parser.add_argument("--services-per-store", type=int, default=services_per_store)
+    parser.add_argument("--users", type=int, default=users)
+    parser.add_argument("--bookings", type=int, default=bookings)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip-seed", action="store_true", help="ใช้ข้อมูลที่ seed ไว้แล้ว")
+
+def new_id() -> str:
+    return str(uuid4())
+
+async def reset_schema(engine: AsyncEngine) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.execute(text("DROP TABLE IF EXISTS schema_version"))
+    await upgrade(engine)
+
+async def seed(engine: AsyncEngine, args) -> None:
+    rng = random.Random(args.seed)
+    now = datetime.now()
+
+    stores, admins, business_hours, services = [], [], [], []
+    services_of_store = {}
+    for i in range(args.stores):
+        store_id = new_id()
+        stores.append((store_id, f"store-{i}", "benchmark store", now - timedelta(days=rng.randint(0, 720)), None))
+        admins.append((new_id(), f"admin-{i}@example.com", f"admin-{i}", "x", store_id))
+        for weekday in range(7):
+            business_hours.append((store_id, weekday, time(9), time(20), weekday == 6))
+
+        services_of_store[store_id] = []
+        for j in range(args.services_per_store):
+            service_id = new_id()
+            services.append((service_id, f"service-{i}-{j}", rng.choice([30, 45, 60, 90]), float(rng.randint(200, 3000)), "", store_id))
+            services_of_store[store_id].append(service_id)
+
+    users = [(new_id(), f"user-{i}", f"08{i:08d}") for i in range(args.users)]
+    user_ids = [user[0] for user in users]
+    store_ids = [store[0] for store in stores]
+
+    bookings, booking_services, payments = [], [], []
+    for _ in range(args.bookings):
+        booking_id = new_id()
+        created_at = now - timedelta(minutes=rng.randint(0, 60 * 24 * 365))
+        booking_time = created_at + timedelta(days=rng.randint(0, 30), hours=rng.randint(0, 10))
+        bookings.append((booking_id, booking_time, rng.choice(BOOKING_STATUSES), created_at, "", rng.choice(user_ids)))
+
+        store_services = services_of_store[rng.choice(store_ids)]
+        for service_id in rng.sample(store_services, k=min(len(store_services), rng.randint(1, 2))):
+            booking_services.append((booking_id, service_id))
+
+        if rng.random() < 0.8:
+            status = rng.choice(PAYMENT_STATUSES)
+            payments.append((
+                new_id(), float(rng.randint(200, 3000)), status, "",
+                created_at, created_at if status == "Paid" else None,
+                created_at + timedelta(minutes=2), booking_id
+            ))
+
+    await reset_schema(engine)
+
+    async with engine.begin() as conn:
+        raw = await conn.get_raw_connection()
+        copy_conn = raw.driver_connection
+        for table, columns, records in [
+            ("stores", ["id", "store_name", "description", "created_at", "payment_expiry_minutes"], stores),
+            ("admins", ["id", "email", "admin_name", "admin_password", "store_id"], admins),
+            ("store_business_hours", ["store_id", "weekday", "open_time", "close_time", "is_closed"], business_hours),
+            ("services", ["id", "title", "duration_minutes", "prices", "description", "store_id"], services),
+            ("users", ["id", "user_name", "tel"], users),
+            ("bookings", ["id", "booking_time", "status", "created_at", "note", "user_id"], bookings),
+            ("bookings_services", ["booking_id", "service_id"], booking_services),
+            ("payments", ["id", "amount", "payment_status", "slip", "created_at", "paid_at", "expires_at", "booking_id"], payments),
+        ]:
+            started = perf_counter()
+            for offset in range(0, len(records), COPY_BATCH_SIZE):
+                await copy_conn.copy_records_to_table(table, records=records[offset:offset + COPY_BATCH_SIZE], columns=columns)
+            print(f"seed {table}: {len(records)} rows in {perf_counter() - started:.1f}s")
+
+        started = perf_counter()
+        await refresh_appointments(conn, "IN (SELECT id FROM bookings)", {})
+        print(f"seed store_appointments in {perf_counter() - started:.1f}s")
+
+    async with engine.connect() as conn:
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("VACUUM ANALYZE"))
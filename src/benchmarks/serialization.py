@@ -0,0 +1,94 @@
+# เทียบ CPU ที่ใช้ serialize response ขนาดเท่า /payments/all
+# - jsonable_encoder + JSONResponse: ทางเดิมของ FastAPI เมื่อ handler คืน list ของ dict
+# - ORJSONResponse:                  ทางใหม่ของ list endpoint (json_response) ข้าม jsonable_encoder
+# - response_model (pydantic):       ทางของ endpoint ที่คืน object เดี่ยว วัดไว้ดูเทียบ
+# ไม่ต้องใช้ DB; speedup ของ ORJSONResponse ต่ำกว่า --min-speedup exit code = 1
+#
+# รัน (จาก src):
+#   python -m benchmarks.serialization --rows 50000
+
+import argparse
+import random
+import sys
+from datetime import datetime, timedelta
+from time import process_time
+from typing import List
+from uuid import uuid4
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter
+
+from adapter.presentation.schemas import PaymentOut
+from domain.model_entities.database import Payment
+
+def build_payments(rows: int) -> list:
+    rng = random.Random(42)
+    now = datetime.now()
+    payments = []
+    for _ in range(rows):
+        created_at = now - timedelta(minutes=rng.randint(0, 60 * 24 * 365), microseconds=rng.randint(0, 999_999))
+        paid = rng.random() < 0.7
+        payments.append(Payment(
+            id=str(uuid4()),
+            amount=float(rng.randint(200, 3000)),
+            payment_status="Paid" if paid else "Pending",
+            slip=f"https://example.supabase.co/storage/v1/object/public/slips/{uuid4().hex}.png",
+            created_at=created_at,
+            paid_at=created_at + timedelta(minutes=1) if paid else None,
+            expires_at=created_at + timedelta(minutes=2),
+            booking_id=str(uuid4())
+        ))
+    return payments
+
+def measure(render, iterations: int) -> float:
+    # CPU ต่อรอบ (วินาที) เอาค่าต่ำสุด ตัด noise จาก GC/process อื่น
+    best = None
+    for _ in range(iterations):
+        started = process_time()
+        render()
+        elapsed = process_time() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main(args) -> int:
+    payments = build_payments(args.rows)
+    items = [payment.to_dict() for payment in payments]
+    payments_adapter = TypeAdapter(List[PaymentOut])
+
+    # ทุกทางต้องได้ JSON ที่มีค่าเดียวกัน
+    reference = JSONResponse(jsonable_encoder(items)).body
+    assert ORJSONResponse(items).body == ORJSONResponse(jsonable_encoder(items)).body
+    assert len(payments_adapter.dump_json(payments_adapter.validate_python(payments))) > 0
+
+    results = [
+        ("jsonable_encoder + JSONResponse", measure(lambda: JSONResponse(jsonable_encoder(items)).body, args.iterations)),
+        ("ORJSONResponse", measure(lambda: ORJSONResponse(items).body, args.iterations)),
+        ("response_model List[PaymentOut]", measure(
+            lambda: payments_adapter.dump_json(payments_adapter.validate_python(payments)), args.iterations
+        )),
+    ]
+
+    baseline = results[0][1]
+    print(f"{args.rows} payments, {len(reference) / 1024:.0f} KiB of JSON, best of {args.iterations}")
+    for name, seconds in results:
+        print(
+            f"{name:<34} {seconds * 1000:8.1f}ms  {seconds / args.rows * 1e6:6.2f}us/row"
+            f"  {baseline / seconds:5.1f}x"
+        )
+
+    speedup = baseline / results[1][1]
+    if speedup < args.min_speedup:
+        print(f"\nFAIL: ORJSONResponse only {speedup:.1f}x faster (need {args.min_speedup:.1f}x)")
+        return 1
+    return 0
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Response serialization CPU benchmark")
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--min-speedup", type=float, default=3.0)
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args()))
@@ -0,0 +1,122 @@
+# วัด memory จริงต่อการอัปโหลดสลิป (tracemalloc peak) ตั้งแต่ spool form ไปจนส่งขึ้น storage เสร็จ
+# - streamed: ทางปัจจุบัน PaymentService อ่านจาก spool ทีละ chunk ส่งต่อ
+# - read_all: ทางเดิม await slip.read() ทั้งไฟล์แล้วส่งเป็น bytes
+# storage เป็น stub ใน process ที่อ่าน stream จนหมด (แทน httpx -> Supabase) ไม่ต้องใช้ DB/network
+#
+# รัน (จาก src):
+#   python -m benchmarks.slip_upload --sizes 256K,1M,5M,10M
+
+import argparse
+import asyncio
+import gc
+import os
+import sys
+import tempfile
+import tracemalloc
+from time import perf_counter
+from uuid import uuid4
+
+from starlette.datastructures import Headers, UploadFile
+
+from application.payment_service.payment import PaymentService, SLIP_CHUNK_SIZE
+
+# ค่า default ของ starlette: ไฟล์ใหญ่กว่านี้ spool ลง disk
+SPOOL_MAX_SIZE = 1024 * 1024
+
+class DrainingStorage:
+    # stub ของ SupabaseInterface: อ่าน stream ทิ้งเหมือน httpx ส่งออก network
+    def __init__(self):
+        self.received = 0
+
+    async def get_all_env(self) -> dict:
+        return {
+            "SUPABASE_URL": "http://storage.invalid",
+            "SUPABASE_ANON_KEY": "anon",
+            "BUCKET_NAME": "slips",
+            "STORAGE_PATH": "bench/"
+        }
+
+    async def get_image_url(self, supabase_url, supabase_anon_key, bucket_name, storage_path, file_name) -> str:
+        return f"{supabase_url}/storage/v1/object/public/{bucket_name}/{storage_path}{file_name}"
+
+    async def object_exists(self, supabase_url, supabase_anon_key, bucket_name, storage_path, file_name) -> bool:
+        return False
+
+    async def upload_stream(self, supabase_url, supabase_anon_key, bucket_name, storage_path, chunks, file_name, content_type, content_length=None) -> dict:
+        async for chunk in chunks:
+            self.received += len(chunk)
+        return {"Key": storage_path + file_name}
+
+    async def upload_image(self, supabase_url, supabase_anon_key, bucket_name, storage_path, file_data, file_name) -> dict:
+        self.received += len(file_data)
+        return {"Key": storage_path + file_name}
+
+    async def move_object(self, supabase_url, supabase_anon_key, bucket_name, storage_path, source_name, file_name) -> bool:
+        return True
+
+    async def delete_object(self, supabase_url, supabase_anon_key, bucket_name, storage_path, file_name):
+        pass
+
+def spool(size: int) -> UploadFile:
+    # เขียน body ลง SpooledTemporaryFile ทีละ chunk แบบเดียวกับ MultiPartParser ของ starlette
+    file = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    remaining = size
+    while remaining:
+        chunk = os.urandom(min(SLIP_CHUNK_SIZE, remaining))
+        file.write(chunk)
+        remaining -= len(chunk)
+    file.seek(0)
+    return UploadFile(file=file, size=size, filename="slip.png", headers=Headers({"content-type": "image/png"}))
+
+async def streamed(size: int):
+    service = PaymentService(None, DrainingStorage(), None)
+    slip = spool(size)
+    # digest มาจาก UploadLimitMiddleware ในทางจริง ที่นี่ใช้ค่าสุ่มให้ไม่เจอสลิปซ้ำ (วัดทาง upload เต็ม)
+    await service._store_slip(slip, slip.filename, "image/png", slip.size, uuid4().hex)
+    await slip.close()
+
+async def read_all(size: int):
+    storage = DrainingStorage()
+    env = await storage.get_all_env()
+    slip = spool(size)
+    data = await slip.read()
+    await storage.upload_image(env["SUPABASE_URL"], env["SUPABASE_ANON_KEY"], env["BUCKET_NAME"], env["STORAGE_PATH"], data, "slip.png")
+    await slip.close()
+
+async def measure(run, size: int) -> tuple:
+    gc.collect()
+    tracemalloc.start()
+    started = perf_counter()
+    try:
+        await run(size)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return peak, perf_counter() - started
+
+def parse_size(value: str) -> int:
+    units = {"K": 1024, "M": 1024 * 1024}
+    value = value.strip().upper()
+    if value[-1] in units:
+        return int(float(value[:-1]) * units[value[-1]])
+    return int(value)
+
+async def main(args) -> int:
+    print(f"chunk {SLIP_CHUNK_SIZE} bytes, spool in memory up to {SPOOL_MAX_SIZE} bytes")
+    print(f"{'size':>10}{'streamed KiB':>15}{'read_all KiB':>15}{'saved':>8}")
+    for size in args.sizes:
+        streamed_peak, _ = await measure(streamed, size)
+        read_all_peak, _ = await measure(read_all, size)
+        print(
+            f"{size:>10}{streamed_peak / 1024:>15.0f}{read_all_peak / 1024:>15.0f}"
+            f"{read_all_peak / streamed_peak if streamed_peak else 0:>7.1f}x"
+        )
+    return 0
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Slip upload memory benchmark (tracemalloc peak)")
+    parser.add_argument("--sizes", default="256K,1M,5M,10M", type=lambda value: [parse_size(item) for item in value.split(",")])
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
@@ -1,6 +1,15 @@
 from abc import ABC, abstractmethod
+from typing import Optional
 
 class AuthInterface(ABC):
     @abstractmethod
     async def get_jwt_secret(self) -> str:
-        pass
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    def get_signing_key(self) -> tuple: # (kid, secret) ของ key ที่ใช้ออก token ใหม่
+        pass
+
+    @abstractmethod
+    def get_verification_key(self, kid: str) -> Optional[str]:
+        pass
@@ -1,13 +1,16 @@
 from abc import ABC, abstractmethod
 from typing import List, Optional
+from datetime import datetime
 from domain.model_entities.database import (
     Admin,
     Store,
+    StoreBusinessHour,
     Service,
     Payment,
     User,
     Booking,
-    BookingService
+    BookingService,
+    StoreAppointment
 )
 
 class AdminRepositoryInterface(ABC):
@@ -27,6 +30,10 @@ class AdminRepositoryInterface(ABC):
     async def get_all(self) -> List[Admin]:
         pass
 
+    @abstractmethod
+    async def has_admin_for_store(self, store_id: str) -> bool:
+        pass
+
     # @abstractmethod
     # async def get_by_id(self, id: str) -> Admin:
     #     pass
@@ -45,7 +52,15 @@ class StoreRepositoryInterface(ABC):
         pass
 
     @abstractmethod
-    async def get_all(self) -> List[Store]:
+    async def get_all(self) -> List[dict]: # row ของ projection shape เดียวกับ to_dict()
+        pass
+
+    @abstractmethod
+    async def get_page(self, limit: int, cursor: Optional[str] = None) -> tuple: # (list ของ dict, next_cursor)
+        pass
+
+    @abstractmethod
+    def stream_all(self): # async generator
         pass
     
     @abstractmethod
@@ -56,6 +71,19 @@ class StoreRepositoryInterface(ABC):
     async def delete_by_name(self, store_name: str) -> Optional[Store]:
         pass
 
+class StoreBusinessHourRepositoryInterface(ABC):
+    @abstractmethod
+    async def find_by_store_id(self, store_id: str) -> List[StoreBusinessHour]:
+        pass
+
+    @abstractmethod
+    async def find_by_weekday(self, store_id: str, weekday: int) -> Optional[StoreBusinessHour]:
+        pass
+
+    @abstractmethod
+    async def replace_all(self, store_id: str, business_hours: List[StoreBusinessHour]) -> List[StoreBusinessHour]:
+        pass
+
 
 class ServiceRepositoryInterface(ABC):
     @abstractmethod
@@ -67,7 +95,7 @@ class ServiceRepositoryInterface(ABC):
     #     pass
 
     @abstractmethod 
-    async def find_by_id(self, service_id: str) -> Service:
+    async def find_by_id(self, service_id: str) -> Optional[dict]: # row ของ projection shape เดียวกับ to_dict()
         pass
 
     @abstractmethod
@@ -75,7 +103,15 @@ class ServiceRepositoryInterface(ABC):
         pass
 
     @abstractmethod
-    async def get_all(self, store_id: str) -> List[Service]:
+    async def get_all(self, store_id: str) -> List[dict]:
+        pass
+
+    @abstractmethod
+    async def get_page(self, store_id: str, limit: int, cursor: Optional[str] = None) -> tuple:
+        pass
+
+    @abstractmethod
+    def stream_all(self, store_id: str):
         pass
 
     @abstractmethod
@@ -86,6 +122,22 @@ class ServiceRepositoryInterface(ABC):
     async def update_by_id(self, service_id: str, update_data: dict) -> Service:
         pass
 
+    @abstractmethod
+    async def find_by_ids(self, service_ids: List[str]) -> List[dict]:
+        pass
+
+    @abstractmethod
+    async def find_services_id_by_titles(self, titles: List[str]) -> dict:
+        pass
+
+    @abstractmethod
+    async def save_many(self, services: List[Service]) -> List[Service]:
+        pass
+
+    @abstractmethod
+    async def update_many(self, update_items: List[dict]) -> List[dict]:
+        pass
+
     # @abstractmethod
     # async def delete_by_name(self, service_name: str) -> Optional[Service]:
     #     pass
@@ -104,7 +156,15 @@ class PaymentRepositoryInterface(ABC):
         pass
 
     @abstractmethod
-    async def get_all(self) -> List[Payment]:
+    async def get_all(self) -> List[dict]:
+        pass
+
+    @abstractmethod
+    async def get_page(self, limit: int, cursor: Optional[str] = None) -> tuple:
+        pass
+
+    @abstractmethod
+    def stream_all(self):
         pass
     
     @abstractmethod
@@ -115,6 +175,18 @@ class PaymentRepositoryInterface(ABC):
     async def is_expired(self, payment_id: str) -> bool:
         pass
 
+    @abstractmethod
+    async def find_expiry_minutes_by_booking_id(self, booking_id: str) -> float:
+        pass
+
+    @abstractmethod
+    async def find_pending_deadlines(self) -> list: # (payment_id, expires_at)
+        pass
+
+    @abstractmethod
+    async def expire_due(self, now, batch_size: int) -> int:
+        pass
+
     #หมายเหตุ: คิดว่าไม่ควร มี Delete เพราะมันต้องเก็บหลักฐานจ่ายเงิน
 
 class UserRepositoryInterface(ABC):
@@ -127,7 +199,15 @@ class UserRepositoryInterface(ABC):
         pass
 
     @abstractmethod 
-    async def get_all(self) -> User:
+    async def get_all(self) -> List[dict]:
+        pass
+
+    @abstractmethod
+    async def get_page(self, limit: int, cursor: Optional[str] = None) -> tuple:
+        pass
+
+    @abstractmethod
+    def stream_all(self):
         pass
 
 
@@ -136,6 +216,10 @@ class BookingRepositoryInterface(ABC):
     async def save(self, booking: Booking) -> Booking:
         pass
 
+    @abstractmethod
+    async def save_with_services(self, booking: Booking, service_ids: List[str]) -> Optional[Booking]: # ไม่มี user = None
+        pass
+
     @abstractmethod 
     async def find_by_id(self, booking_id: str) -> Booking:
         pass
@@ -145,17 +229,54 @@ class BookingRepositoryInterface(ABC):
         pass
 
     @abstractmethod
-    async def get_all(self, user_id) -> List[Booking]:
+    async def find_appointments_by_store_id(
+            self,
+            store_id: str,
+            start: Optional[datetime] = None,
+            end: Optional[datetime] = None
+        ) -> List[StoreAppointment]:
+        pass
+
+    @abstractmethod
+    async def get_all(self, user_id) -> List[dict]:
+        pass
+
+    @abstractmethod
+    async def get_page(self, user_id: str, limit: int, cursor: Optional[str] = None) -> tuple:
+        pass
+
+    @abstractmethod
+    def stream_all(self, user_id: str):
+        pass
+
+    @abstractmethod
+    async def find_intervals_by_store_id(self, store_id: str) -> list:
+        pass
+
+    @abstractmethod
+    async def find_intervals_by_id(self, booking_id: str) -> list:
+        pass
+
+    @abstractmethod
+    async def find_intervals_by_ids(self, booking_ids: List[str]) -> list:
         pass
     
     @abstractmethod
     async def update_by_id(self, booking_id: str, update_data: dict) -> Booking:
         pass
 
+    @abstractmethod
+    async def update_status_by_ids(self, statuses: dict) -> List[dict]:
+        pass
+
     @abstractmethod
     async def delete_by_id(self, booking_id: str) -> Optional[Booking]:
         pass
 
+    @abstractmethod
+    async def delete_by_ids(self, booking_ids: List[str]) -> List[Booking]:
+        pass
+
 class BookingServiceRepositoryInterface(ABC):
     @abstractmethod
     async def save(self, bookings_services: BookingService) -> BookingService:
@@ -167,4 +288,51 @@ class BookingServiceRepositoryInterface(ABC):
 
     @abstractmethod
     async def get_all(self) -> List[BookingService]:
-        pass
\ No newline at end of file
+        pass
+
+class StoreStatsRepositoryInterface(ABC):
+    # {"revenue_per_day", "bookings_per_status", "popular_services", "booked_minutes_per_day", "business_hours"}
+    # แต่ละตัวเป็น list ของ tuple ที่ aggregate แล้ว
+    @abstractmethod
+    async def get_stats(self, store_id: str, start: datetime, end: datetime, inactive_statuses: set) -> dict:
+        pass
+
+class BulkImportRepositoryInterface(ABC):
+    # batches คือ async iterable ของ list ของ tuple ที่พร้อม COPY ลง staging table
+    @abstractmethod
+    async def import_users(self, batches) -> dict: # {"imported": int, "errors": [{"row", "error"}]}
+        pass
+
+    @abstractmethod
+    async def import_bookings(self, store_id: str, batches) -> dict:
+        pass
+
+class IdempotencyKeyRepositoryInterface(ABC):
+    @abstractmethod
+    async def claim(self, scope: str, idempotency_key: str, request_hash: str) -> bool:
+        pass
+
+    @abstractmethod
+    async def find(self, scope: str, idempotency_key: str) -> Optional[tuple]:
+        pass
+
+    @abstractmethod
+    async def complete(self, scope: str, idempotency_key: str, response: dict):
+        pass
+
+    @abstractmethod
+    async def release(self, scope: str, idempotency_key: str):
+        pass
+
+    @abstractmethod
+    async def purge_expired(self, limit: int) -> int:
+        pass
+
+class RevokedTokenRepositoryInterface(ABC):
+    @abstractmethod
+    async def revoke(self, jti: str, exp: int):
+        pass
+
+    @abstractmethod
+    async def find_active(self, now: int) -> dict:
+        pass
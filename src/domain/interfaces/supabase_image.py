@@ -27,4 +27,52 @@ class SupabaseInterface(ABC):
         file_name: str
         ) -> str:
 
-        pass
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    async def upload_stream(
+        self,
+        supabase_url: str,
+        supabase_anon_key: str,
+        bucket_name: str,
+        storage_path: str,
+        chunks, # async iterator ของ bytes ไม่ต้องมีทั้งไฟล์ใน memory
+        file_name: str,
+        content_type: str,
+        content_length: int = None
+        ) -> dict:
+        pass
+
+    @abstractmethod
+    async def object_exists(
+        self,
+        supabase_url: str,
+        supabase_anon_key: str,
+        bucket_name: str,
+        storage_path: str,
+        file_name: str
+        ) -> bool:
+        pass
+
+    @abstractmethod
+    async def move_object(
+        self,
+        supabase_url: str,
+        supabase_anon_key: str,
+        bucket_name: str,
+        storage_path: str,
+        source_name: str,
+        file_name: str
+        ) -> bool:
+        pass
+
+    @abstractmethod
+    async def delete_object(
+        self,
+        supabase_url: str,
+        supabase_anon_key: str,
+        bucket_name: str,
+        storage_path: str,
+        file_name: str
+        ):
+        pass
@@ -1,12 +1,17 @@
 from sqlalchemy import (
+    BigInteger,
     Float,
     Integer,
     String,
     DateTime,
+    Time,
     Boolean,
     ForeignKey,
-    Column
+    Column,
+    Index,
+    UniqueConstraint
 )
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -23,6 +28,12 @@ class Admin(Base):
     store_id = Column(String, ForeignKey("stores.id"), nullable=False)
     
     stores = relationship("Store", back_populates="admins")
+
+    __table_args__ = (
+        # login/register ค้นด้วย admin_name ต้องไม่ซ้ำ
+        UniqueConstraint("admin_name", name="uq_admins_admin_name"),
+        Index("ix_admins_store_id", "store_id"),
+    )
     
     def to_dict(self):
         return {
@@ -38,19 +49,49 @@ class Store(Base):
     store_name = Column(String)
     description = Column(String)
     created_at = Column(DateTime, default=func.now())
+    payment_expiry_minutes = Column(Integer, nullable=True) # None = ใช้ค่า default ของระบบ
 
     services = relationship("Service", back_populates="stores")
     admins = relationship("Admin", back_populates="stores")
+    # แถวลูกลบด้วย ON DELETE CASCADE ใน DB ORM ไม่ต้องโหลดมาลบเอง
+    business_hours = relationship("StoreBusinessHour", back_populates="stores", passive_deletes=True)
+
+    __table_args__ = (
+        UniqueConstraint("store_name", name="uq_stores_store_name"),
+        # keyset pagination ของ /stores/all
+        Index("ix_stores_created_at_id", "created_at", "id"),
+    )
 
     def to_dict(self):
         return {
             "id": self.id,
             "store_name": self.store_name,
             "description": self.description,
-            "created_at": self.created_at
+            "created_at": self.created_at,
+            "payment_expiry_minutes": self.payment_expiry_minutes
         }
     
 
+class StoreBusinessHour(Base):
+    __tablename__ = "store_business_hours"
+    store_id = Column(String, ForeignKey("stores.id", ondelete="CASCADE"), primary_key=True)
+    weekday = Column(Integer, primary_key=True) # 0 = จันทร์ ... 6 = อาทิตย์ (ตาม datetime.weekday())
+    open_time = Column(Time)
+    close_time = Column(Time)
+    is_closed = Column(Boolean, default=False)
+
+    stores = relationship("Store", back_populates="business_hours")
+
+    def to_dict(self):
+        return {
+            "store_id": self.store_id,
+            "weekday": self.weekday,
+            "open_time": self.open_time,
+            "close_time": self.close_time,
+            "is_closed": self.is_closed
+        }
+
+
 class Service(Base):
     __tablename__ = "services"
     id = Column(String, primary_key=True, index=True)
@@ -64,6 +105,12 @@ class Service(Base):
     stores = relationship("Store", back_populates="services")
     booking_services = relationship("BookingService", back_populates="service")
 
+    __table_args__ = (
+        # services ของร้าน (และหา title ภายในร้าน) ใช้ index นี้ได้ทั้งคู่
+        Index("ix_services_store_id_title", "store_id", "title"),
+        Index("ix_services_title", "title"),
+    )
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -77,7 +124,7 @@ class Service(Base):
 class Booking(Base):
     __tablename__ = "bookings"
     id = Column(String, primary_key=True, index=True)
-    booking_time = Column(DateTime) #logic ห้าม จองวันที่ผ่านมาแล้ว
+    booking_time = Column(DateTime, index=True) #logic ห้าม จองวันที่ผ่านมาแล้ว
     status = Column(String)
     created_at = Column(DateTime, default=func.now())
     note = Column(String)
@@ -85,9 +132,14 @@ class Booking(Base):
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
 
     users = relationship("User", back_populates="bookings")
-    booking_services = relationship("BookingService", back_populates="booking")
+    booking_services = relationship("BookingService", back_populates="booking", passive_deletes=True)
     payments = relationship("Payment", back_populates="bookings")
 
+    __table_args__ = (
+        # booking ของ user เรียงตาม created_at (keyset pagination)
+        Index("ix_bookings_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -101,12 +153,18 @@ class Booking(Base):
 # Association Table
 class BookingService(Base):
     __tablename__ = 'bookings_services'
-    booking_id = Column(String, ForeignKey('bookings.id'), primary_key=True)
+    booking_id = Column(String, ForeignKey('bookings.id', ondelete="CASCADE"), primary_key=True)
     service_id = Column(String, ForeignKey('services.id'), primary_key=True)
 
     booking = relationship("Booking", back_populates="booking_services")
     service = relationship("Service", back_populates="booking_services")
 
+    __table_args__ = (
+        # PK (booking_id, service_id) ใช้ค้นจาก booking_id ได้อยู่แล้ว
+        # ส่วนฝั่ง service -> booking (นับคิวของร้าน) ต้องมี index กลับด้าน
+        Index("ix_bookings_services_service_id_booking_id", "service_id", "booking_id"),
+    )
+
 class Payment(Base):
     __tablename__ = "payments"
     id = Column(String, primary_key=True, index=True)
@@ -116,11 +174,18 @@ class Payment(Base):
     slip = Column(String) # url รูป
     created_at = Column(DateTime, default=func.now())
     paid_at = Column(DateTime, nullable=True, default=None) # บันทึกเวลาที่ payment_status เปลี่ยน
+    expires_at = Column(DateTime, nullable=True) # เลยเวลานี้แล้วยัง Pending = Expired
 
     booking_id = Column(String, ForeignKey("bookings.id"), nullable=False)
 
     bookings = relationship("Booking", back_populates="payments")
 
+    __table_args__ = (
+        # ให้ sweeper หา payment ที่ Pending และเลยกำหนดได้ด้วย index
+        Index("ix_payments_status_expires_at", "payment_status", "expires_at"),
+        Index("ix_payments_booking_id", "booking_id"),
+        Index("ix_payments_created_at_id", "created_at", "id"),
+    )
 
     # relationship
 
@@ -132,6 +197,7 @@ class Payment(Base):
             "slip": self.slip,
             "created_at":self.created_at,
             "paid_at": self.paid_at,
+            "expires_at": self.expires_at,
             "booking_id": self.booking_id
         }
     
@@ -148,4 +214,78 @@ class User(Base):
             "id": self.id,
             "user_name": self.user_name,
             "tel": self.tel
-        }
\ No newline at end of file
+        }
+
+class StoreAppointment(Base):
+    # read model ของหน้า dashboard/appointments: 1 แถวต่อ (ร้าน, booking) รวม user/service ไว้แล้ว
+    # เขียนโดย adapter.external.database.appointment_projection พร้อมกับการเขียน booking/service
+    __tablename__ = "store_appointments"
+    store_id = Column(String, primary_key=True)
+    booking_id = Column(String, primary_key=True)
+    booking_time = Column(DateTime)
+    status = Column(String)
+    note = Column(String)
+    created_at = Column(DateTime)
+    user_id = Column(String)
+    user_name = Column(String)
+    tel = Column(String)
+    store_name = Column(String)
+    services = Column(JSONB) # [{id, title, duration_minutes, prices, description, store_id, store_name}] ทุก service ของ booking
+
+    __table_args__ = (
+        # dashboard ดึงเป็นช่วงวันของร้าน = index range scan เดียว
+        Index("ix_store_appointments_store_id_booking_time", "store_id", "booking_time"),
+        Index("ix_store_appointments_booking_id", "booking_id"),
+    )
+
+    def to_dict(self):
+        # คง shape เดิมของ /booking-appointments (Booking + users + booking_services[].service.stores)
+        # booking ที่มี service หลายร้าน booking_services มีครบทุก service พร้อมร้านของ service นั้น
+        return {
+            "id": self.booking_id,
+            "booking_time": self.booking_time,
+            "status": self.status,
+            "created_at": self.created_at,
+            "note": self.note,
+            "user_id": self.user_id,
+            "users": {
+                "id": self.user_id,
+                "user_name": self.user_name,
+                "tel": self.tel
+            },
+            "booking_services": [
+                {
+                    "booking_id": self.booking_id,
+                    "service_id": service["id"],
+                    "service": {
+                        **{key: value for key, value in service.items() if key != "store_name"},
+                        "stores": {"id": service["store_id"], "store_name": service.get("store_name")}
+                    }
+                }
+                for service in self.services or []
+            ]
+        }
+
+class IdempotencyKey(Base):
+    # response ของ request ที่ส่ง Idempotency-Key มา (เฉพาะที่สำเร็จ) response = NULL คือกำลังทำอยู่
+    # ใช้โดย adapter.external.database.idempotency
+    __tablename__ = "idempotency_keys"
+    scope = Column(String, primary_key=True) # endpoint:ผู้เรียก เช่น "bookings.create:user:<user_id>"
+    idempotency_key = Column(String, primary_key=True)
+    request_hash = Column(String, nullable=False) # key เดิมแต่ body ต่าง = ใช้ key ผิด
+    response = Column(JSONB, nullable=True)
+    created_at = Column(DateTime, default=func.now())
+
+    __table_args__ = (
+        Index("ix_idempotency_keys_created_at", "created_at"),
+    )
+
+class RevokedToken(Base):
+    # jti ของ admin token ที่ logout แล้ว ทุก worker เช็คตารางนี้ (เก็บถึง exp ของ token เท่านั้น)
+    __tablename__ = "revoked_tokens"
+    jti = Column(String, primary_key=True)
+    exp = Column(BigInteger, nullable=False) # epoch seconds เหมือน claim exp
+
+    __table_args__ = (
+        Index("ix_revoked_tokens_exp", "exp"),
+    )
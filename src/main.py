@@ -1,4 +1,5 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
 from adapter.presentation.admin_controllers import admin_router
 from adapter.presentation.store_controller import store_router
@@ -6,23 +7,55 @@ from adapter.presentation.service_controller import service_router
 from adapter.presentation.payment_controller import payment_router
 from adapter.presentation.user_controller import user_router
 from adapter.presentation.booking_controller import booking_router
+from adapter.presentation.availability_controller import availability_router
+from adapter.presentation.import_controller import import_router
 
-from adapter.external.database.postgres import engine
-from domain.model_entities.database import Base
+from adapter.external.database.postgres import engine, replica_engines, replica_router
+from adapter.external.database.migrations.runner import check_version
+from adapter.external.payment_expiry import payment_expiry_scheduler
+from adapter.external.password_hasher import password_hasher
+from adapter.external.supabase_image import supabase_adapter
 from fastapi.middleware.cors import CORSMiddleware
+from adapter.presentation.upload_limit import UploadLimitMiddleware
+from application.payment_service.payment import ALLOWED_SLIP_CONTENT_TYPES
+from adapter.presentation.metrics_middleware import MetricsMiddleware, metrics_router
 
 # from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 
+import logging
+import os
+
+# logger ของแอป (logging.getLogger(__name__)) ออก stderr ข้างๆ log ของ uvicorn
+logging.basicConfig(
+    level=os.getenv('LOG_LEVEL', 'INFO'),
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Code to run on startup
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    # schema migrate แยกด้วย migrate_cli ตรงนี้แค่เช็ค version
+    await check_version(engine)
+    await replica_router.start()
+    await payment_expiry_scheduler.start()
     yield
     # Code to run on shutdown
+    await payment_expiry_scheduler.stop()
+    password_hasher.shutdown()
+    await supabase_adapter.close()
+    await replica_router.stop()
+    for replica_engine in replica_engines:
+        await replica_engine.dispose()
     await engine.dispose()
 
-app = FastAPI(lifespan=lifespan)
+# orjson render datetime/float เองใน C เร็วกว่า json.dumps ของ stdlib มาก
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
+
+app.add_middleware(
+    UploadLimitMiddleware,
+    paths={"/payments/create"},
+    file_fields={"slip": ALLOWED_SLIP_CONTENT_TYPES}
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -32,9 +65,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# เพิ่มทีหลังสุด = ชั้นนอกสุด จับเวลาครอบ middleware ตัวอื่นด้วย
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(admin_router)
 app.include_router(store_router)
 app.include_router(service_router)
 app.include_router(payment_router)
 app.include_router(user_router)
-app.include_router(booking_router)
\ No newline at end of file
+app.include_router(booking_router)
+app.include_router(availability_router)
+app.include_router(import_router)
+app.include_router(metrics_router)
\ No newline at end of file
@@ -0,0 +1,99 @@
+import asyncio
+import logging
+from time import monotonic
+
+from utils.lru import LRUCache
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncTTLCache:
+    # read-through cache ใน process
+    # - อายุไม่เกิน ttl: ตอบจาก cache
+    # - เกิน ttl แต่ยังไม่เกิน ttl + stale_ttl: ตอบค่าเก่าไปก่อน แล้วโหลดใหม่เบื้องหลัง (stale-while-revalidate)
+    # - key เดียวกันโหลดพร้อมกันกี่ request ก็ยิง loader แค่ครั้งเดียว (single-flight)
+    # - loader คืน None (ไม่เจอ) ไม่เก็บ ของที่เพิ่งสร้างทีหลังจะเห็นทันทีไม่ต้องรอ ttl
+    def __init__(self, maxsize: int, ttl: float, stale_ttl: float = 0):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._entries = LRUCache(maxsize) # key -> (value, loaded_at)
+        self._inflight = {} # key -> asyncio.Task ของโหลดที่ยังใช้ผลได้
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.invalidations = 0
+
+    async def get_or_load(self, key, loader):
+        # loader ต้องเป็น coroutine function ที่ไม่ผูกกับ session ของ request
+        # เพราะอาจวิ่งต่อหลัง request นั้นจบไปแล้ว
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, loaded_at = entry
+            age = monotonic() - loaded_at
+            if age < self.ttl:
+                self.hits += 1
+                return value
+            if age < self.ttl + self.stale_ttl:
+                self.stale_hits += 1
+                self._start_load(key, loader)
+                return value
+
+        self.misses += 1
+        return await asyncio.shield(self._start_load(key, loader))
+
+    def invalidate(self, *keys):
+        for key in keys:
+            self.invalidations += 1
+            self._entries.pop(key)
+            # โหลดที่ค้างอยู่เป็นข้อมูลก่อนเขียน เอาออกจาก _inflight แล้วผลของมันจะไม่ถูกเก็บ
+            self._inflight.pop(key, None)
+
+    def invalidate_where(self, predicate):
+        # invalidate ทุก key ที่ predicate(key) เป็นจริง เช่นทุกช่วงเวลาของร้านเดียวกัน
+        keys = {key for key in self._entries.keys() if predicate(key)}
+        keys |= {key for key in self._inflight if predicate(key)}
+        self.invalidate(*keys)
+
+    def clear(self):
+        self._entries.clear()
+        self._inflight.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "loads": self.loads,
+            "invalidations": self.invalidations,
+            "hit_ratio": (self.hits + self.stale_hits) / lookups if lookups else 0.0
+        }
+
+    def _start_load(self, key, loader) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is None:
+            self.loads += 1
+            task = asyncio.create_task(self._load(key, loader))
+            task.add_done_callback(self._report_failure)
+            self._inflight[key] = task
+        return task
+
+    async def _load(self, key, loader):
+        task = asyncio.current_task()
+        try:
+            value = await loader()
+            # ถ้าระหว่างโหลดมีการเขียน (invalidate/clear) task นี้ถูกเอาออกจาก _inflight แล้ว ค่านี้เก่า ไม่เก็บ
+            if value is not None and self._inflight.get(key) is task:
+                self._entries.put(key, (value, monotonic()))
+            return value
+        finally:
+            if self._inflight.get(key) is task:
+                del self._inflight[key]
+
+    @staticmethod
+    def _report_failure(task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Cache load failed", exc_info=task.exception())
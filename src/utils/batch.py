@@ -0,0 +1,24 @@
+import os
+
+MAX_BATCH_SIZE = int(os.getenv('MAX_BATCH_SIZE', '500'))
+
+
+def unique_ids(values, name: str) -> list:
+    # id จาก request ของ batch endpoint: list ของ str ที่ไม่ว่าง ตัดตัวซ้ำ (คงลำดับเดิม)
+    if not isinstance(values, list) or not values or not all(isinstance(value, str) and value for value in values):
+        raise ValueError(f"{name} must be a non-empty list of string")
+
+    values = list(dict.fromkeys(values))
+    if len(values) > MAX_BATCH_SIZE:
+        raise ValueError(f"{name} must not contain more than {MAX_BATCH_SIZE} items")
+    return values
+
+
+def batch_items(items, name: str) -> list:
+    # body ของ batch write: list ของ object ไม่เกิน MAX_BATCH_SIZE ตัว
+    if not isinstance(items, list) or not items or not all(isinstance(item, dict) for item in items):
+        raise ValueError(f"{name} must be a non-empty list of object")
+
+    if len(items) > MAX_BATCH_SIZE:
+        raise ValueError(f"{name} must not contain more than {MAX_BATCH_SIZE} items")
+    return items
@@ -0,0 +1,67 @@
+from bisect import bisect_left, insort
+from collections import Counter
+from datetime import datetime, timedelta
+
+
+class IntervalIndex:
+    # เก็บช่วงเวลา [start, end) เรียงตาม start เพื่อให้หา overlap ได้ด้วย bisect
+    def __init__(self):
+        self._starts = [] # list ของ (start, key) เรียงจากน้อยไปมาก
+        self._by_key = {} # key -> (start, end)
+        self._spans = Counter() # ความยาวช่วง -> จำนวนช่วงที่ยาวเท่านี้ (ปกติมีไม่กี่ค่าตาม duration ของ service)
+        self._max_span = timedelta(0)
+
+    def __len__(self):
+        return len(self._by_key)
+
+    def __contains__(self, key):
+        return key in self._by_key
+
+    def keys(self) -> list:
+        return list(self._by_key)
+
+    def add(self, key: str, start: datetime, end: datetime):
+        if key in self._by_key:
+            self.discard(key)
+
+        insort(self._starts, (start, key))
+        self._by_key[key] = (start, end)
+
+        span = end - start
+        self._spans[span] += 1
+        if span > self._max_span:
+            self._max_span = span
+
+    def discard(self, key: str):
+        interval = self._by_key.pop(key, None)
+        if interval is None:
+            return
+
+        i = bisect_left(self._starts, (interval[0], key))
+        if i < len(self._starts) and self._starts[i] == (interval[0], key):
+            del self._starts[i]
+
+        # ช่วงที่ยาวที่สุดหายไป ให้ max_span หดตาม ไม่งั้น overlapping ต้องไล่ย้อนไกลเกินจำเป็นตลอดไป
+        span = interval[1] - interval[0]
+        self._spans[span] -= 1
+        if not self._spans[span]:
+            del self._spans[span]
+            if span == self._max_span:
+                self._max_span = max(self._spans, default=timedelta(0))
+
+    def overlapping(self, lo: datetime, hi: datetime) -> list:
+        # ช่วงที่เริ่มก่อน lo ได้ไม่เกิน max_span เท่านั้นที่ยังทับ lo ได้
+        i = bisect_left(self._starts, (lo - self._max_span,))
+        found = []
+
+        while i < len(self._starts):
+            start, key = self._starts[i]
+            if start >= hi:
+                break
+
+            end = self._by_key[key][1]
+            if end > lo:
+                found.append((start, end))
+            i += 1
+
+        return found
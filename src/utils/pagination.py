@@ -0,0 +1,27 @@
+import base64
+import json
+from datetime import datetime, date
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not cursor serializable")
+
+
+def encode_cursor(values: list) -> str:
+    # cursor คือค่าของ sort key ของแถวสุดท้ายในหน้า เข้ารหัสเป็น base64 ให้ client ส่งกลับมาเฉยๆ
+    raw = json.dumps(values, default=_default, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise ValueError("cursor is invalid")
+
+    if not isinstance(values, list):
+        raise ValueError("cursor is invalid")
+    return values
@@ -0,0 +1,71 @@
+import asyncio
+import csv
+import io
+import json
+import os
+
+# อ่าน/parse ใน thread ทีละกี่แถวต่อการกระโดดเข้า thread หนึ่งครั้ง
+READ_ROWS_CHUNK = int(os.getenv('READ_ROWS_CHUNK', '1000'))
+
+
+def detect_format(file_name: str, fmt: str = None) -> str:
+    if fmt:
+        fmt = fmt.lower()
+    elif file_name and file_name.lower().endswith((".ndjson", ".jsonl")):
+        fmt = "ndjson"
+    else:
+        fmt = "csv"
+
+    if fmt not in ("csv", "ndjson"):
+        raise ValueError("format must be csv or ndjson")
+    return fmt
+
+
+def read_rows(binary_file, fmt: str):
+    # อ่านทีละบรรทัดจากไฟล์ (ไม่โหลดทั้งไฟล์) คืน (row_no, dict หรือ None, error หรือ None)
+    text_file = io.TextIOWrapper(binary_file, encoding="utf-8-sig", newline="")
+    try:
+        if fmt == "csv":
+            for row_no, row in enumerate(csv.DictReader(text_file), start=1):
+                yield row_no, row, None
+        else:
+            for row_no, line in enumerate(text_file, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    yield row_no, None, "invalid JSON"
+                    continue
+                if not isinstance(row, dict):
+                    yield row_no, None, "each line must be a JSON object"
+                    continue
+                yield row_no, row, None
+    finally:
+        # ไม่ให้ wrapper ปิดไฟล์ของคนเรียก
+        text_file.detach()
+
+
+async def read_rows_async(binary_file, fmt: str, chunk_rows: int = READ_ROWS_CHUNK):
+    # read_rows แบบไม่บล็อก event loop: อ่านไฟล์ (อาจ spool อยู่บน disk) และ parse csv/json ใน thread
+    # ดึงมาทีละ chunk_rows แถว ระหว่าง COPY ของ batch ก่อนหน้า request อื่นยังได้ทำงาน
+    rows = read_rows(binary_file, fmt)
+
+    def next_chunk() -> list:
+        chunk = []
+        for item in rows:
+            chunk.append(item)
+            if len(chunk) >= chunk_rows:
+                break
+        return chunk
+
+    try:
+        while True:
+            chunk = await asyncio.to_thread(next_chunk)
+            if not chunk:
+                return
+            for item in chunk:
+                yield item
+    finally:
+        # ปิด generator ใน thread เหมือนตอนอ่าน (finally ของ read_rows ต้อง detach wrapper)
+        await asyncio.to_thread(rows.close)
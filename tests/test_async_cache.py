@@ -0,0 +1,45 @@
+import asyncio
+
+from utils.async_cache import AsyncTTLCache
+
+
+def test_invalidate_during_load_drops_stale_value():
+    cache = AsyncTTLCache(maxsize=8, ttl=60)
+
+    async def scenario():
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def slow_loader():
+            started.set()
+            await release.wait()
+            return "before-write"
+
+        pending = asyncio.create_task(cache.get_or_load("store:1", slow_loader))
+        await started.wait()
+        cache.invalidate("store:1") # มีการเขียนระหว่างโหลด
+        release.set()
+        assert await pending == "before-write"
+
+        async def fresh_loader():
+            return "after-write"
+
+        return await cache.get_or_load("store:1", fresh_loader)
+
+    assert asyncio.run(scenario()) == "after-write"
+    assert cache.stats()["loads"] == 2
+
+
+def test_invalidated_keys_leave_no_state_behind():
+    cache = AsyncTTLCache(maxsize=8, ttl=60)
+
+    async def scenario():
+        for key in range(1000):
+            async def loader():
+                return key
+            await cache.get_or_load(key, loader)
+            cache.invalidate(key)
+
+    asyncio.run(scenario())
+    assert len(cache._entries) == 0
+    assert cache._inflight == {}
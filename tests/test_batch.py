@@ -0,0 +1,40 @@
+import pytest
+
+from utils import batch
+from utils.batch import batch_items, unique_ids
+
+
+def test_unique_ids_removes_duplicates_and_keeps_order():
+    assert unique_ids(["b", "a", "b", "c", "a"], "ids") == ["b", "a", "c"]
+
+
+@pytest.mark.parametrize("values", [None, "a", [], ["a", ""], ["a", 1], [None]])
+def test_unique_ids_rejects_invalid_values(values):
+    with pytest.raises(ValueError, match="ids must be a non-empty list of string"):
+        unique_ids(values, "ids")
+
+
+def test_unique_ids_limit_counts_unique_values(monkeypatch):
+    monkeypatch.setattr(batch, "MAX_BATCH_SIZE", 2)
+
+    assert unique_ids(["a", "b", "a", "b"], "ids") == ["a", "b"]
+    with pytest.raises(ValueError, match="ids must not contain more than 2 items"):
+        unique_ids(["a", "b", "c"], "ids")
+
+
+def test_batch_items_returns_items_unchanged():
+    items = [{"title": "cut"}, {"title": "cut"}]
+    assert batch_items(items, "services") is items
+
+
+@pytest.mark.parametrize("items", [None, {}, [], [{"a": 1}, "x"]])
+def test_batch_items_rejects_invalid_items(items):
+    with pytest.raises(ValueError, match="services must be a non-empty list of object"):
+        batch_items(items, "services")
+
+
+def test_batch_items_limit(monkeypatch):
+    monkeypatch.setattr(batch, "MAX_BATCH_SIZE", 2)
+
+    with pytest.raises(ValueError, match="services must not contain more than 2 items"):
+        batch_items([{}, {}, {}], "services")
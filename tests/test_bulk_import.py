@@ -0,0 +1,85 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+asyncpg = pytest.importorskip("asyncpg")
+
+from adapter.external.database import bulk_import
+from adapter.external.database.bulk_import import BulkImportRepositoryAdapter
+
+
+class RejectingConnection:
+    # แทน connection ที่ Postgres ปฏิเสธค่าตอน COPY
+    async def execute(self, statement, parameters=None):
+        return None
+
+    async def get_raw_connection(self):
+        return self
+
+    @property
+    def driver_connection(self):
+        return self
+
+    async def copy_records_to_table(self, table, records, columns):
+        raise asyncpg.DataError("invalid input for query argument $3: 123 (expected str, got int)")
+
+
+class FakeEngine:
+    def __init__(self):
+        self.rolled_back = False
+
+    @asynccontextmanager
+    async def begin(self):
+        try:
+            yield RejectingConnection()
+        except BaseException:
+            self.rolled_back = True
+            raise
+
+
+async def one_batch(records):
+    yield records
+
+
+def test_rejected_value_is_reported_as_bad_input():
+    engine = FakeEngine()
+    repo = BulkImportRepositoryAdapter(engine)
+
+    with pytest.raises(ValueError, match="cannot store"):
+        asyncio.run(repo.import_users(one_batch([(2, "u1", "name", 123)])))
+    assert engine.rolled_back
+
+
+def test_booking_import_invalidates_stats_of_the_store(monkeypatch):
+    invalidated = []
+    monkeypatch.setattr(bulk_import, "invalidate_store_stats", invalidated.extend)
+
+    async def refresh(conn, condition, parameters):
+        pass
+    monkeypatch.setattr(bulk_import, "refresh_appointments", refresh)
+
+    class Result:
+        rowcount = 1
+
+        def all(self):
+            return []
+
+    class AcceptingConnection(RejectingConnection):
+        async def execute(self, statement, parameters=None):
+            return Result()
+
+        async def copy_records_to_table(self, table, records, columns):
+            pass
+
+    class Engine:
+        @asynccontextmanager
+        async def begin(self):
+            yield AcceptingConnection()
+
+    repo = BulkImportRepositoryAdapter(Engine())
+    result = asyncio.run(repo.import_bookings("store-1", one_batch([])))
+
+    assert result["imported"] == 1
+    assert invalidated == ["store-1"]
@@ -0,0 +1,187 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("asyncpg")
+pytest.importorskip("orjson")
+
+from adapter.external.database.idempotency import (
+    IdempotencyKeyConflict,
+    IdempotencyStore,
+    request_fingerprint
+)
+
+
+class InMemoryIdempotencyRepo:
+    # แทนตาราง idempotency_keys (ไม่มีหมดอายุ / lease)
+    def __init__(self):
+        self.rows = {} # (scope, key) -> [request_hash, response]
+        self.claims = 0
+        self.releases = 0
+
+    async def claim(self, scope, idempotency_key, request_hash):
+        self.claims += 1
+        if (scope, idempotency_key) in self.rows:
+            return False
+        self.rows[(scope, idempotency_key)] = [request_hash, None]
+        return True
+
+    async def find(self, scope, idempotency_key):
+        row = self.rows.get((scope, idempotency_key))
+        return tuple(row) if row is not None else None
+
+    async def complete(self, scope, idempotency_key, response):
+        self.rows[(scope, idempotency_key)][1] = response
+
+    async def release(self, scope, idempotency_key):
+        self.releases += 1
+        row = self.rows.get((scope, idempotency_key))
+        if row is not None and row[1] is None:
+            del self.rows[(scope, idempotency_key)]
+
+    async def purge_expired(self, limit):
+        return 0
+
+
+class Creator:
+    def __init__(self, delay: float = 0):
+        self.calls = 0
+        self.delay = delay
+
+    async def __call__(self):
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return {"id": f"created-{self.calls}"}
+
+
+def new_store(repo=None, **kwargs) -> IdempotencyStore:
+    return IdempotencyStore(repo or InMemoryIdempotencyRepo(), maxsize=16, **kwargs)
+
+
+def test_fingerprint_ignores_key_order():
+    assert request_fingerprint({"a": 1, "b": [1, 2]}) == request_fingerprint({"b": [1, 2], "a": 1})
+    assert request_fingerprint({"a": 1}) != request_fingerprint({"a": 2})
+
+
+def test_same_key_replays_first_response():
+    async def scenario():
+        store = new_store()
+        create = Creator()
+        first = await store.run("bookings.create:user:u1", "k1", "h1", create)
+        second = await store.run("bookings.create:user:u1", "k1", "h1", create)
+        return first, second, create.calls, store.replays
+
+    first, second, calls, replays = asyncio.run(scenario())
+    assert first == ({"id": "created-1"}, False)
+    assert second == ({"id": "created-1"}, True)
+    assert calls == 1
+    assert replays == 1
+
+
+def test_same_key_in_another_scope_is_independent():
+    async def scenario():
+        store = new_store()
+        create = Creator()
+        await store.run("bookings.create:user:u1", "k1", "h1", create)
+        return await store.run("bookings.create:user:u2", "k1", "h1", create), create.calls
+
+    (response, replayed), calls = asyncio.run(scenario())
+    assert response == {"id": "created-2"}
+    assert replayed is False
+    assert calls == 2
+
+
+def test_same_key_with_different_request_is_rejected():
+    async def scenario():
+        store = new_store()
+        await store.run("payments.create:user:u1", "k1", "h1", Creator())
+        await store.run("payments.create:user:u1", "k1", "h2", Creator())
+
+    with pytest.raises(IdempotencyKeyConflict) as error:
+        asyncio.run(scenario())
+    assert error.value.status_code == 422
+
+
+def test_concurrent_requests_run_create_once():
+    async def scenario():
+        store = new_store()
+        create = Creator(delay=0.05)
+        results = await asyncio.gather(*(store.run("s", "k1", "h1", create) for _ in range(5)))
+        return results, create.calls
+
+    results, calls = asyncio.run(scenario())
+    assert calls == 1
+    assert {response["id"] for response, _ in results} == {"created-1"}
+    assert sorted(replayed for _, replayed in results) == [False, True, True, True, True]
+
+
+def test_failed_create_releases_key_for_retry():
+    async def scenario():
+        repo = InMemoryIdempotencyRepo()
+        store = new_store(repo)
+
+        async def fail():
+            raise ValueError("booking_id is None or incorrect")
+
+        with pytest.raises(ValueError):
+            await store.run("s", "k1", "h1", fail)
+
+        create = Creator()
+        return await store.run("s", "k1", "h1", create), create.calls, repo.releases
+
+    (response, replayed), calls, releases = asyncio.run(scenario())
+    assert releases == 1
+    assert calls == 1
+    assert replayed is False
+
+
+def test_cancelled_first_request_lets_waiters_run_create():
+    async def scenario():
+        repo = InMemoryIdempotencyRepo()
+        store = new_store(repo)
+        first = asyncio.create_task(store.run("s", "k1", "h1", Creator(delay=1)))
+        await asyncio.sleep(0)
+
+        create = Creator(delay=0.01)
+        waiters = [asyncio.create_task(store.run("s", "k1", "h1", create)) for _ in range(3)]
+        await asyncio.sleep(0)
+        first.cancel() # client ตัดสายระหว่าง create
+
+        results = await asyncio.gather(*waiters)
+        return first, results, create.calls, repo.releases
+
+    first, results, calls, releases = asyncio.run(scenario())
+    assert first.cancelled()
+    assert releases == 1
+    assert calls == 1
+    assert sorted(replayed for _, replayed in results) == [False, True, True]
+
+
+def test_response_from_another_worker_is_replayed():
+    async def scenario():
+        repo = InMemoryIdempotencyRepo()
+        await new_store(repo).run("s", "k1", "h1", Creator())
+
+        # worker อื่น: LRU ว่าง ต้องอ่านจาก repo
+        other = new_store(repo)
+        create = Creator()
+        return await other.run("s", "k1", "h1", create), create.calls
+
+    (response, replayed), calls = asyncio.run(scenario())
+    assert response == {"id": "created-1"}
+    assert replayed is True
+    assert calls == 0
+
+
+def test_key_in_progress_elsewhere_times_out_with_conflict():
+    async def scenario():
+        repo = InMemoryIdempotencyRepo()
+        repo.rows[("s", "k1")] = ["h1", None] # worker อื่น claim ไว้แล้วยังไม่เสร็จ
+        store = new_store(repo, wait_seconds=0.05, poll_interval=0.01)
+        await store.run("s", "k1", "h1", Creator())
+
+    with pytest.raises(IdempotencyKeyConflict) as error:
+        asyncio.run(scenario())
+    assert error.value.status_code == 409
@@ -0,0 +1,94 @@
+import random
+from datetime import datetime, timedelta
+
+from utils.interval_index import IntervalIndex
+
+T0 = datetime(2026, 1, 5, 9, 0)
+
+
+def minutes(value: int) -> datetime:
+    return T0 + timedelta(minutes=value)
+
+
+def test_overlapping_is_half_open():
+    index = IntervalIndex()
+    index.add("a", minutes(0), minutes(30))
+    index.add("b", minutes(30), minutes(60))
+
+    assert index.overlapping(minutes(30), minutes(45)) == [(minutes(30), minutes(60))]
+    assert index.overlapping(minutes(60), minutes(90)) == []
+    assert index.overlapping(minutes(29), minutes(31)) == [(minutes(0), minutes(30)), (minutes(30), minutes(60))]
+
+
+def test_long_interval_starting_before_window_is_found():
+    index = IntervalIndex()
+    index.add("long", minutes(0), minutes(240))
+    index.add("short", minutes(200), minutes(210))
+
+    assert index.overlapping(minutes(180), minutes(190)) == [(minutes(0), minutes(240))]
+
+
+def test_add_same_key_replaces_interval():
+    index = IntervalIndex()
+    index.add("a", minutes(0), minutes(30))
+    index.add("a", minutes(120), minutes(150))
+
+    assert len(index) == 1
+    assert index.overlapping(minutes(0), minutes(30)) == []
+    assert index.overlapping(minutes(120), minutes(121)) == [(minutes(120), minutes(150))]
+
+
+def test_discard_unknown_key_is_noop():
+    index = IntervalIndex()
+    index.discard("missing")
+    assert len(index) == 0
+
+
+def test_max_span_shrinks_after_longest_is_discarded():
+    index = IntervalIndex()
+    index.add("long", minutes(0), minutes(300))
+    index.add("short", minutes(0), minutes(30))
+    index.add("short-2", minutes(60), minutes(90))
+    assert index._max_span == timedelta(minutes=300)
+
+    index.discard("long")
+    assert index._max_span == timedelta(minutes=30)
+
+    index.discard("short")
+    assert index._max_span == timedelta(minutes=30)
+
+    index.discard("short-2")
+    assert index._max_span == timedelta(0)
+
+
+def test_max_span_shrinks_when_key_is_replaced():
+    index = IntervalIndex()
+    index.add("a", minutes(0), minutes(300))
+    index.add("a", minutes(0), minutes(45))
+
+    assert index._max_span == timedelta(minutes=45)
+
+
+def test_matches_brute_force():
+    rng = random.Random(7)
+    index = IntervalIndex()
+    intervals = {}
+
+    for step in range(2000):
+        key = f"b{rng.randrange(200)}"
+        if key in intervals and rng.random() < 0.3:
+            index.discard(key)
+            del intervals[key]
+        else:
+            start = minutes(rng.randrange(0, 24 * 60, 15))
+            end = start + timedelta(minutes=rng.choice([15, 30, 60, 90, 480]))
+            index.add(key, start, end)
+            intervals[key] = (start, end)
+
+        if step % 50 == 0:
+            lo = minutes(rng.randrange(0, 24 * 60))
+            hi = lo + timedelta(minutes=rng.randrange(1, 180))
+            expected = sorted(interval for interval in intervals.values() if interval[0] < hi and interval[1] > lo)
+            assert sorted(index.overlapping(lo, hi)) == expected
+
+    assert sorted(index.keys()) == sorted(intervals)
@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from sqlalchemy.dialects import postgresql
+
+from adapter.external.database.partial_update import PartialUpdate
+from domain.model_entities.database import Service
+
+SERVICE_UPDATE = PartialUpdate(
+    Service,
+    {"title", "duration_minutes", "prices", "description", "store_id"},
+    previous=("store_id",)
+)
+
+
+class FakeResult:
+    def __init__(self, row):
+        self.row = row
+
+    def first(self):
+        return self.row
+
+
+class FakeRow:
+    def __init__(self, mapping: dict):
+        self._mapping = mapping
+
+
+class FakeSession:
+    # เก็บ statement ที่ถูกส่งมา ตอบแถวที่กำหนดไว้ (ไม่ต่อ DB)
+    def __init__(self, row=None):
+        self.row = row
+        self.statements = []
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+        return FakeResult(self.row)
+
+
+def compile_sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def test_values_keeps_only_updatable_fields():
+    values = SERVICE_UPDATE.values({"service_id": "s1", "title": "cut", "prices": 100}, ignore=("service_id",))
+    assert values == {"title": "cut", "prices": 100}
+
+
+def test_values_rejects_unknown_fields():
+    with pytest.raises(ValueError, match="Cannot update field\\(s\\): id, store"):
+        SERVICE_UPDATE.values({"title": "cut", "id": "x", "store": "y"})
+
+
+def test_values_rejects_empty_update():
+    with pytest.raises(ValueError, match="No fields to update"):
+        SERVICE_UPDATE.values({"service_id": "s1"}, ignore=("service_id",))
+
+
+def test_execute_returns_none_when_no_row_matches():
+    db = FakeSession(row=None)
+
+    assert asyncio.run(SERVICE_UPDATE.execute(db, "missing", {"title": "cut"})) == (None, None)
+    assert len(db.statements) == 1
+
+
+def test_execute_is_single_update_returning_previous_values():
+    table = Service.__table__
+    mapping = {column: f"new-{column.key}" for column in table.c}
+    mapping["previous_store_id"] = "old-store"
+    db = FakeSession(row=FakeRow(mapping))
+
+    service, previous = asyncio.run(SERVICE_UPDATE.execute(db, "s1", {"store_id": "new-store"}))
+
+    sql = compile_sql(db.statements[0])
+    assert sql.startswith("UPDATE services SET store_id=")
+    assert "FROM services AS previous" in sql
+    assert "RETURNING" in sql and "previous.store_id AS previous_store_id" in sql
+    assert isinstance(service, Service)
+    assert service.id == "new-id"
+    assert previous == {"store_id": "old-store"}
+
+
+def test_execute_without_previous_has_no_self_join():
+    update = PartialUpdate(Service, {"title"})
+    db = FakeSession(row=None)
+
+    asyncio.run(update.execute(db, "s1", {"title": "cut"}, conditions=(Service.store_id == "st1",)))
+
+    sql = compile_sql(db.statements[0])
+    assert "previous" not in sql
+    assert "services.store_id = " in sql
+
+
+def test_execute_validates_before_touching_the_database():
+    db = FakeSession()
+
+    with pytest.raises(ValueError):
+        asyncio.run(SERVICE_UPDATE.execute(db, "s1", {"id": "other"}))
+    assert db.statements == []
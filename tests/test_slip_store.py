@@ -0,0 +1,118 @@
+import asyncio
+import hashlib
+import io
+
+import pytest
+
+pytest.importorskip("starlette")
+
+from starlette.datastructures import Headers, UploadFile
+
+from application.payment_service.payment import PaymentService
+from utils.lru import LRUCache
+
+
+class InMemoryStorage:
+    # แทน SupabaseAdapter: เก็บไฟล์ใน dict บันทึกว่าถูกเรียกอะไรบ้าง
+    def __init__(self, move_error: bool = False):
+        self.objects = {}
+        self.calls = []
+        self.move_error = move_error
+
+    async def get_all_env(self) -> dict:
+        return {"SUPABASE_URL": "http://storage", "SUPABASE_ANON_KEY": "anon", "BUCKET_NAME": "slips", "STORAGE_PATH": "slips/"}
+
+    async def get_image_url(self, supabase_url, supabase_anon_key, bucket_name, storage_path, file_name) -> str:
+        return f"{supabase_url}/{bucket_name}/{storage_path}{file_name}"
+
+    async def object_exists(self, supabase_url, supabase_anon_key, bucket_name, storage_path, file_name) -> bool:
+        self.calls.append("exists")
+        return storage_path + file_name in self.objects
+
+    async def upload_stream(self, supabase_url, supabase_anon_key, bucket_name, storage_path, chunks, file_name, content_type, content_length=None) -> dict:
+        self.calls.append("upload")
+        self.objects[storage_path + file_name] = b"".join([chunk async for chunk in chunks])
+        return {"Key": storage_path + file_name}
+
+    async def move_object(self, supabase_url, supabase_anon_key, bucket_name, storage_path, source_name, file_name) -> bool:
+        self.calls.append("move")
+        if self.move_error:
+            raise ValueError("Move failed: 403")
+        if storage_path + file_name in self.objects:
+            return False
+        self.objects[storage_path + file_name] = self.objects.pop(storage_path + source_name)
+        return True
+
+    async def delete_object(self, supabase_url, supabase_anon_key, bucket_name, storage_path, file_name):
+        self.calls.append("delete")
+        self.objects.pop(storage_path + file_name, None)
+
+
+def slip(data: bytes) -> UploadFile:
+    return UploadFile(file=io.BytesIO(data), size=len(data), filename="slip.png", headers=Headers({"content-type": "image/png"}))
+
+
+def store(service: PaymentService, data: bytes, digest: str = None) -> str:
+    return asyncio.run(service._store_slip(slip(data), "slip.png", "image/png", len(data), digest))
+
+
+def test_known_digest_uploads_once_under_content_name():
+    storage = InMemoryStorage()
+    service = PaymentService(None, storage, None, slip_index=LRUCache(8))
+    digest = hashlib.sha256(b"slip-1").hexdigest()
+
+    url = store(service, b"slip-1", digest)
+
+    assert url.endswith(f"slips/{digest}.png")
+    assert storage.calls == ["exists", "upload"]
+    assert storage.objects == {f"slips/{digest}.png": b"slip-1"}
+
+
+def test_duplicate_slip_is_not_uploaded_again():
+    storage = InMemoryStorage()
+    digest = hashlib.sha256(b"slip-1").hexdigest()
+    first = store(PaymentService(None, storage, None, slip_index=LRUCache(8)), b"slip-1", digest)
+    storage.calls.clear()
+
+    # worker อื่น (slip_index ว่าง) เจอไฟล์ใน storage ก็ไม่ upload
+    other = PaymentService(None, storage, None, slip_index=LRUCache(8))
+    assert store(other, b"slip-1", digest) == first
+    assert storage.calls == ["exists"]
+
+    storage.calls.clear()
+    assert store(other, b"slip-1", digest) == first
+    assert storage.calls == []
+
+
+def test_unknown_digest_is_hashed_while_uploading_then_moved():
+    storage = InMemoryStorage()
+    service = PaymentService(None, storage, None)
+
+    url = store(service, b"slip-2")
+
+    digest = hashlib.sha256(b"slip-2").hexdigest()
+    assert url.endswith(f"slips/{digest}.png")
+    assert storage.calls == ["upload", "exists", "move"]
+    assert list(storage.objects) == [f"slips/{digest}.png"]
+
+
+def test_unknown_digest_duplicate_drops_pending_copy():
+    storage = InMemoryStorage()
+    service = PaymentService(None, storage, None)
+    store(service, b"slip-2")
+    storage.calls.clear()
+
+    store(service, b"slip-2")
+
+    assert storage.calls == ["upload", "exists", "delete"]
+    assert len(storage.objects) == 1
+
+
+def test_move_error_is_not_treated_as_duplicate():
+    storage = InMemoryStorage(move_error=True)
+    service = PaymentService(None, storage, None, slip_index=LRUCache(8))
+
+    with pytest.raises(ValueError):
+        store(service, b"slip-3")
+    assert "delete" not in storage.calls
+    assert len(service.slip_index) == 0
@@ -0,0 +1,84 @@
+import asyncio
+import time
+
+import jwt
+
+from application.admin_service.token_verifier import TokenVerifier
+
+SECRET = "test-secret-with-enough-length-for-hs256"
+
+
+class FixedKeyAuth:
+    def get_verification_key(self, kid: str):
+        return SECRET
+
+
+class InMemoryRevocations:
+    # แทนตาราง revoked_tokens นับจำนวน query ที่ verifier ยิงมา
+    def __init__(self):
+        self.rows = {}
+        self.queries = 0
+
+    async def revoke(self, jti: str, exp: int):
+        self.rows[jti] = exp
+
+    async def find_active(self, now: int) -> dict:
+        self.queries += 1
+        return {jti: exp for jti, exp in self.rows.items() if exp > now}
+
+
+def issue(jti: str) -> tuple:
+    exp = int(time.time()) + 3600
+    return jwt.encode({"sub": "1", "jti": jti, "exp": exp}, SECRET, algorithm="HS256"), exp
+
+
+def test_active_tokens_only_touch_db_on_refresh():
+    revocations = InMemoryRevocations()
+    verifier = TokenVerifier(FixedKeyAuth(), revocations, refresh_seconds=60)
+    token, _ = issue("a")
+
+    async def scenario():
+        for _ in range(50):
+            await verifier.verify_active(token)
+
+    asyncio.run(scenario())
+    assert revocations.queries == 1
+
+
+def test_revoke_from_other_worker_applies_after_refresh():
+    revocations = InMemoryRevocations()
+    verifier = TokenVerifier(FixedKeyAuth(), revocations, refresh_seconds=60)
+    token, exp = issue("a")
+
+    async def scenario():
+        assert (await verifier.verify_active(token))["jti"] == "a"
+        await revocations.revoke("a", exp) # worker อื่น logout
+
+        # ยังไม่ครบรอบ refresh ใช้ได้ต่อ
+        await verifier.verify_active(token)
+
+        verifier._refreshed_at -= 60
+        try:
+            await verifier.verify_active(token)
+        except ValueError as e:
+            return str(e)
+
+    assert asyncio.run(scenario()) == "Token has been revoked"
+    assert revocations.queries == 2
+
+
+def test_local_revoke_applies_immediately():
+    revocations = InMemoryRevocations()
+    verifier = TokenVerifier(FixedKeyAuth(), revocations, refresh_seconds=60)
+    token, _ = issue("a")
+
+    async def scenario():
+        claims = await verifier.verify_active(token)
+        await verifier.revoke(claims)
+        try:
+            await verifier.verify_active(token)
+        except ValueError as e:
+            return str(e)
+
+    assert asyncio.run(scenario()) == "Token has been revoked"
+    assert revocations.queries == 1
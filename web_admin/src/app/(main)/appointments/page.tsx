@@ -9,6 +9,7 @@ import { Input } from '@/app/components/ui/input';
 import { Label } from '@/app/components/ui/label';
 import { useRouter } from 'next/navigation';
 import { useBooking } from '@/context/BookingContext';
+import { addDays, authHeaders, monthRange } from '@/app/lib/utils';
 
 import {
   Select,
@@ -148,11 +149,21 @@ const AppointmentsPage: NextPage = () => {
   const appointmentsPerPage = 7;
   const context = useBooking();
   const { store_id, setStore_id } = context;
+  // ช่วงวันที่แสดง (รวมวันสุดท้าย) ค่าเริ่มต้น = เดือนนี้ ดึงจาก API เฉพาะช่วงนี้
+  const [dateFrom, setDateFrom] = useState<string>(() => monthRange().from);
+  const [dateTo, setDateTo] = useState<string>(() => addDays(monthRange().to, -1));
 
   const fetchAppointmentsFromAPI = async () => {
     try {
-
-      const response = await fetch(`${API_BASE_URL}/booking-appointments?store_id=${store_id}`);
+      const params = new URLSearchParams({
+        store_id: String(store_id),
+        from: dateFrom,
+        to: addDays(dateTo, 1), // API รับ to แบบไม่รวมวันนั้น
+      });
+
+      const response = await fetch(`${API_BASE_URL}/booking-appointments?${params}`, {
+        headers: authHeaders(),
+      });
       if (!response.ok) throw new Error('Failed to fetch');
       const data: RawBooking | RawBooking[] = await response.json();
 
@@ -193,7 +204,7 @@ const AppointmentsPage: NextPage = () => {
       setAppointments(results);
     };
     loadAppointments();
-  }, []);
+  }, [store_id, dateFrom, dateTo]);
 
 
 
@@ -247,6 +258,18 @@ const AppointmentsPage: NextPage = () => {
     setCurrentPage(1); // Reset to first page when filter changes
   }, []);
 
+  const handleDateFromChange = useCallback((event: React.ChangeEvent<HTMLInputElement>): void => {
+    if (!event.target.value) return;
+    setDateFrom(event.target.value);
+    setCurrentPage(1);
+  }, []);
+
+  const handleDateToChange = useCallback((event: React.ChangeEvent<HTMLInputElement>): void => {
+    if (!event.target.value) return;
+    setDateTo(event.target.value);
+    setCurrentPage(1);
+  }, []);
+
   const handleDeleteClick = useCallback((appointmentId: string): void => {
     const appointment = appointments.find(a => a.id === appointmentId);
     if (appointment) {
@@ -262,6 +285,7 @@ const AppointmentsPage: NextPage = () => {
           method: 'DELETE',
           headers: {
             'Content-Type': 'application/json',
+            ...authHeaders(),
           },
           body: JSON.stringify({ booking_id: currentAppointment.id }),
         });
@@ -333,7 +357,7 @@ const AppointmentsPage: NextPage = () => {
         <CardHeader>
           <CardTitle>Filters</CardTitle>
           <CardDescription>
-            Filter appointments by status or search by customer name
+            Filter appointments by date, status or search by customer name
           </CardDescription>
         </CardHeader>
         <CardContent>
@@ -351,6 +375,26 @@ const AppointmentsPage: NextPage = () => {
                 />
               </div>
             </div>
+            <div className="w-full md:w-44">
+              <Label htmlFor="date-from">From</Label>
+              <Input
+                id="date-from"
+                type="date"
+                value={dateFrom}
+                max={dateTo}
+                onChange={handleDateFromChange}
+              />
+            </div>
+            <div className="w-full md:w-44">
+              <Label htmlFor="date-to">To</Label>
+              <Input
+                id="date-to"
+                type="date"
+                value={dateTo}
+                min={dateFrom}
+                onChange={handleDateToChange}
+              />
+            </div>
             <div className="w-full md:w-48">
               <Label htmlFor="status">Status</Label>
               <Select value={filterStatus} onValueChange={handleFilterChange}>
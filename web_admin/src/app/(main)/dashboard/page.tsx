@@ -3,6 +3,7 @@ import { useState, useEffect, ReactNode } from 'react';
 import { Calendar, Users, Scissors, TrendingUp } from 'lucide-react';
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '@/app/components/Card';
 import { useBooking } from '@/context/BookingContext';
+import { authHeaders, monthRange, toLocalDate } from '@/app/lib/utils';
 
 // Interface สำหรับ Component Props
 interface ComponentProps {
@@ -215,7 +216,7 @@ const DashboardPage: React.FC = () => {
                 serviceName: booking.booking_services?.[0]?.service?.title || '',
                 customerName: booking.users?.user_name || '',
                 notes: booking.note || '',
-                date:booking.created_at.split('T')[0],
+                date: booking.booking_time.split('T')[0], // วันที่นัด (ช่วงที่ดึงมากรองตาม booking_time)
             });
 
             // Customers
@@ -255,10 +256,14 @@ const DashboardPage: React.FC = () => {
     const fetchBooking = async (): Promise<void> => {
         setIsLoadingAppointments(true);
         try {
-            const response = await fetch(`${API_BASE_URL}/booking-appointments?store_id=${store_id}`, {
+            // dashboard แสดงข้อมูลของเดือนนี้ ไม่ดึง booking ทั้งหมดของร้าน
+            const { from, to } = monthRange();
+            const params = new URLSearchParams({ store_id: String(store_id), from, to });
+            const response = await fetch(`${API_BASE_URL}/booking-appointments?${params}`, {
                 method: 'GET',
                 headers: {
                     'Content-Type': 'application/json',
+                    ...authHeaders(),
                 }
             });
 
@@ -298,7 +303,7 @@ const DashboardPage: React.FC = () => {
     //     ? [] // TODO: Transform real appointments to display format
     //     : mockAppointments.filter((apt) => apt.date === '2025-01-24');
 
-    const today = new Date().toISOString().split('T')[0]; // ได้ "2025-06-25" แบบ YYYY-MM-DD
+    const today = toLocalDate(new Date()); // ได้ "2025-06-25" แบบ YYYY-MM-DD ตามเวลาเครื่อง
     const todayAppointments = appointments.filter((apt) => apt.date === today);
     const todayRevenue: number = todayAppointments.reduce((sum, apt) => sum + apt.prices, 0);
 
@@ -1,5 +1,6 @@
 
 import { Service } from '../../types'; 
+import { authHeaders } from '../utils';
 
 const BASE_URL = 'http://localhost:8000'; 
 
@@ -26,6 +27,7 @@ export async function createService(payload: CreateServicePayload): Promise<Serv
       method: 'POST',
       headers: {
         'Content-Type': 'application/json',
+        ...authHeaders(),
       },
       body: JSON.stringify(payload),
     });
@@ -95,6 +97,7 @@ export async function updateService(payload: UpdateServicePayload): Promise<Serv
       method: 'PUT',
       headers: {
         'Content-Type': 'application/json',
+        ...authHeaders(),
       },
       body: JSON.stringify(payload),
     });
@@ -119,6 +122,7 @@ export async function deleteService(serviceId: string): Promise<Service> {
       method: 'DELETE',
       headers: {
         'Content-Type': 'application/json',
+        ...authHeaders(),
       },
       body: JSON.stringify({ service_id: serviceId }),
     });
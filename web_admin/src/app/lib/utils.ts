@@ -4,3 +4,27 @@ import { twMerge } from 'tailwind-merge';
 export function cn(...inputs: ClassValue[]) {
   return twMerge(clsx(inputs));
 }
+
+export function authHeaders(): Record<string, string> {
+  const token = typeof window !== 'undefined' ? localStorage.getItem('access_token') : null;
+  return token ? { Authorization: `Bearer ${token}` } : {};
+}
+
+// วันที่แบบ YYYY-MM-DD ตามเวลาเครื่อง (booking_time ใน API เป็นเวลา local ไม่มี timezone)
+export function toLocalDate(date: Date): string {
+  const pad = (value: number) => String(value).padStart(2, '0');
+  return `${date.getFullYear()}-${pad(date.getMonth() + 1)}-${pad(date.getDate())}`;
+}
+
+export function addDays(day: string, days: number): string {
+  const [year, month, date] = day.split('-').map(Number);
+  return toLocalDate(new Date(year, month - 1, date + days));
+}
+
+// ช่วง [from, to) ของเดือนที่มีวันนี้ สำหรับ query /booking-appointments
+export function monthRange(date: Date = new Date()): { from: string; to: string } {
+  return {
+    from: toLocalDate(new Date(date.getFullYear(), date.getMonth(), 1)),
+    to: toLocalDate(new Date(date.getFullYear(), date.getMonth() + 1, 1)),
+  };
+}